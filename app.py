@@ -10,19 +10,38 @@ import warnings
 warnings.filterwarnings('ignore', message='.*builtin type SwigPyPacked has no __module__ attribute.*')
 
 import flet as ft
+import importlib
 import logging
+import logging.handlers
+import time
 from dotenv import load_dotenv
-from logger import SnackBarHandler
-from views import (
-    HomeView, AboutView, SettingsView, ExitView,
-    FilePickerSelectorView, CSVSelectorView,
-    DerivativesView, StorageView, LogView, InstructionsView, UpdateCSVView
-)
+from logger import SnackBarHandler, LOG_FILE, start_queue_logging
+from log_store import IndexedRotatingFileHandler
 import utils
+import session_store
+import settings_store
+import temp_gc
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Route -> (module, class) of the view shown there. Views are imported and
+# constructed on first navigation, so startup only pays for the home view and
+# the heavy modules (pandas, Pillow, PyMuPDF) load when a view first needs them.
+# /file_selector is resolved per navigation by get_file_selector_view().
+VIEW_ROUTES = {
+    "/": ("views.home_view", "HomeView"),
+    "/home": ("views.home_view", "HomeView"),
+    "/about": ("views.about_view", "AboutView"),
+    "/settings": ("views.settings_view", "SettingsView"),
+    "/exit": ("views.exit_view", "ExitView"),
+    "/create_derivatives": ("views.derivatives_view", "DerivativesView"),
+    "/csv_generator": ("views.storage_view", "StorageView"),
+    "/show_instructions": ("views.instructions_view", "InstructionsView"),
+    "/update_csv": ("views.update_csv_view", "UpdateCSVView"),
+    "/show_logs": ("views.log_view", "LogView"),
+}
+
 
 class MDIApplication:
     """
@@ -50,13 +69,21 @@ class MDIApplication:
         self._snack_handler.setLevel(logging.INFO)
         root_logger.addHandler(self._snack_handler)
         
-        # File logging: write messages to mdi.log in the repo root
-        _file_handler = logging.FileHandler("mdi.log")
+        # File logging: write messages to mdi.log in the repo root, rotated
+        # and gzipped into logs/ with an offset index for the log viewer
+        _file_handler = IndexedRotatingFileHandler(LOG_FILE)
         _file_handler.setLevel(logging.INFO)
         _file_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
         _file_handler.setFormatter(_file_formatter)
         root_logger.addHandler(_file_handler)
         
+        # Console, snackbar and file output run on a QueueListener thread so
+        # logging calls in hot loops only enqueue their records
+        self._log_listener = start_queue_logging(root_logger, [
+            handler for handler in root_logger.handlers
+            if not isinstance(handler, logging.handlers.QueueHandler)
+        ])
+        
         # Write an initial log entry
         self.logger.info("Logger initialized - writing to mdi.log and SnackBarHandler attached")
     
@@ -71,25 +98,15 @@ class MDIApplication:
             The appropriate file selector view instance
         """
         # Load persistent settings to get the selected file option
-        try:
-            import json
-            import os
-            persistent_path = os.path.join("_data", "persistent.json")
-            if os.path.exists(persistent_path):
-                with open(persistent_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    selected_option = data.get("selected_file_option", "")
-            else:
-                selected_option = ""
-        except Exception as e:
-            self.logger.warning(f"Failed to load file option from persistent settings: {e}")
-            selected_option = ""
+        selected_option = settings_store.get_settings().get("selected_file_option", "")
         
         # Also check session for current selection
         session_option = page.session.get("selected_file_option")
         if session_option:
             selected_option = session_option
         
+        from views.file_selector_view import FilePickerSelectorView, CSVSelectorView
+        
         # Return the appropriate view based on selection
         if selected_option == "FilePicker":
             return FilePickerSelectorView(page)
@@ -100,20 +117,31 @@ class MDIApplication:
             return FilePickerSelectorView(page)
     
     def initialize_views(self, page: ft.Page):
-        """Initialize all view instances."""
-        self.views = {
-            "/": HomeView(page),
-            "/home": HomeView(page),
-            "/about": AboutView(page),
-            "/settings": SettingsView(page),
-            "/exit": ExitView(page),
-            "/file_selector": None,  # Will be dynamically created
-            "/create_derivatives": DerivativesView(page),
-            "/csv_generator": StorageView(page),
-            "/show_instructions": InstructionsView(page),
-            "/update_csv": UpdateCSVView(page),
-            "/show_logs": LogView(page),
-        }
+        """Reset the view cache; views are built by get_view() on first navigation."""
+        self.views = {}
+    
+    def get_view(self, page: ft.Page, route: str):
+        """
+        Get the view for a route, importing and constructing it on first use.
+        
+        Args:
+            page: The Flet page object
+            route: The route path
+            
+        Returns:
+            The view instance, or None if the route is unknown
+        """
+        view = self.views.get(route)
+        if view is not None or route not in VIEW_ROUTES:
+            return view
+        
+        module_name, class_name = VIEW_ROUTES[route]
+        start = time.perf_counter()
+        view_class = getattr(importlib.import_module(module_name), class_name)
+        view = view_class(page)
+        self.views[route] = view
+        self.logger.debug(f"Built {class_name} for {route} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return view
     
     def build_appbar(self, page: ft.Page) -> ft.AppBar:
         """Build the application's app bar with navigation."""
@@ -185,14 +213,15 @@ class MDIApplication:
     def route_change(self, route):
         """Handle route changes."""
         self.logger.info(f"Route changed to: {route.route}")
+        settings_io_before = settings_store.get_settings().counters()
         
         # Special handling for file_selector route - dynamically create based on settings
         if route.route == "/file_selector":
             view = self.get_file_selector_view(route.page)
             self.views["/file_selector"] = view
         else:
-            # Get the view for the current route
-            view = self.views.get(route.route)
+            # Get the view for the current route, building it on first visit
+            view = self.get_view(route.page, route.route)
         
         if view:
             self.current_view = view
@@ -200,6 +229,16 @@ class MDIApplication:
             route.page.controls.clear()
             route.page.controls.append(view.render())
             route.page.update()
+            
+            # Settings file I/O caused by this navigation (writes are debounced,
+            # so they are counted against the navigation that flushes them)
+            settings_io = settings_store.get_settings().counters()
+            self.logger.debug(
+                f"Settings I/O for {route.route}: "
+                f"{settings_io['disk_reads'] - settings_io_before['disk_reads']} disk reads, "
+                f"{settings_io['disk_writes'] - settings_io_before['disk_writes']} disk writes, "
+                f"{settings_io['gets'] - settings_io_before['gets']} cached reads"
+            )
         else:
             self.logger.warning(f"No view found for route: {route.route}")
             # Redirect to home if route not found
@@ -219,16 +258,9 @@ class MDIApplication:
         page.title = "Manage Digital Ingest: Alma Edition"
         
         # Load persistent settings from persistent storage
-        window_height = 800  # Default value
-        theme_mode = "Light"  # Default theme
-        persistent_data = {}
-        try:
-            with open("_data/persistent.json", "r", encoding="utf-8") as f:
-                persistent_data = utils.json.load(f)
-                window_height = persistent_data.get("window-height", 800)
-                theme_mode = persistent_data.get("selected_theme", "Light")
-        except Exception as e:
-            self.logger.warning(f"Failed to load persistent settings from persistent.json: {e}")
+        persistent_data = settings_store.get_settings().all()
+        window_height = persistent_data.get("window-height", 800)
+        theme_mode = persistent_data.get("selected_theme", "Light")
         
         # Initialize page.session variables with values from persistent.json
         session_keys = [
@@ -246,11 +278,16 @@ class MDIApplication:
                 page.session.set(key, value)
                 self.logger.info(f"Initialized session '{key}' = '{value}' from persistent.json")
         
-        # Restore preserved session data if available
+        # Restore preserved session data if available; large collections
+        # stay on disk until a view first reads them
+        session_store.install(page)
         from views.about_view import AboutView
         if AboutView.restore_session(page):
             self.logger.info("Restored preserved session data")
         
+        # Write any debounced settings changes when the window goes away
+        page.on_disconnect = lambda e: settings_store.get_settings().flush()
+        
         # Set window dimensions
         page.window.width = 1000
         page.window.height = window_height
@@ -275,6 +312,9 @@ class MDIApplication:
             bgcolor=ft.Colors.GREEN_600
         )
         
+        # Cache verified CSV headings so CSV validation never re-reads them
+        utils.preload_verified_headings()
+        
         # Initialize views
         self.initialize_views(page)
         
@@ -288,6 +328,10 @@ class MDIApplication:
         # Store page reference for logging handler
         self._snack_handler.page = page
         
+        # Delete old storage/temp run directories in the background, never
+        # this session's own temp directory
+        self._temp_gc_stop = temp_gc.start_background_gc(lambda: page.session.get("temp_directory"))
+        
         # Log configuration info
         config = utils.read_config()
         self.logger.info(f"Application started with Python {config['python_version']} and Flet {config['flet_version']}")
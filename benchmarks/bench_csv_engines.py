@@ -0,0 +1,107 @@
+"""
+Benchmark: CSV parse time and memory for each csv_io engine
+
+Generates a synthetic Alma CSV (100,000 rows by default) using the verified
+Alma-D headings, then parses it with every available engine in a fresh
+subprocess so peak memory is measured independently per engine.
+
+Usage (from the repository root):
+    python benchmarks/bench_csv_engines.py [--rows 100000] [--repeat 3]
+"""
+
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+HEADINGS_FILE = os.path.join(REPO_ROOT, "_data", "verified_CSV_headings_for_Alma-D.csv")
+
+
+def write_synthetic_csv(path, rows):
+    """Write a CSV with the Alma headings and mostly-empty, string-only rows."""
+    with open(HEADINGS_FILE, 'r', encoding='utf-8', newline='') as f:
+        headings = next(csv.reader(f))
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(headings)
+        writer.writerow(['# comment row'] + [''] * (len(headings) - 1))
+        for i in range(rows):
+            row = {h: '' for h in headings}
+            row['originating_system_id'] = f"dg_{1700000000 + i}"
+            row['mms_id'] = f"00{991000000000000 + i}"  # leading zeros must survive
+            row['file_name_1'] = f"Grinnell_Archives_{i:06d}.tif"
+            row['dc:title'] = f"Photograph {i}, Grinnell College, 1950s"
+            row['dc:description'] = "Line one\nline two, with a comma" if i % 50 == 0 else ''
+            row['dc:date'] = f"19{50 + i % 50}"
+            writer.writerow([row[h] for h in headings])
+    return headings
+
+
+def max_rss_mb():
+    """Peak resident set size of this process in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux and bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_child(engine, path, repeat):
+    """Parse the CSV with one engine and print a tab-separated result line."""
+    import csv_io
+    import pandas  # noqa: F401  (import cost excluded from the measurement)
+
+    baseline = max_rss_mb()
+    times = []
+    df = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = csv_io.read_csv_strings(path, engine=engine)
+        times.append(time.perf_counter() - start)
+
+    frame_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
+    dtype = str(df.dtypes.iloc[0])
+    leading_zero_ok = str(df['mms_id'].iloc[1]).startswith('00')
+    print(f"{min(times):.3f}\t{frame_mb:.1f}\t{max_rss_mb() - baseline:.1f}\t{dtype}\t{leading_zero_ok}\t{len(df)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--child', nargs=2, metavar=('ENGINE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.repeat)
+        return
+
+    import csv_io
+
+    engines = ['c'] + (['pyarrow'] if csv_io.pyarrow_available() else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic_alma.csv')
+        headings = write_synthetic_csv(path, args.rows)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"Synthetic CSV: {args.rows} rows x {len(headings)} columns, {size_mb:.1f} MB")
+        if 'pyarrow' not in engines:
+            print("pyarrow not installed - only the C engine is measured")
+        print(f"{'engine':<8} {'parse s':>8} {'frame MB':>9} {'peak RSS +MB':>13}  dtype            zeros  rows")
+
+        for engine in engines:
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', engine, path, '--repeat', str(args.repeat)],
+                capture_output=True, text=True, check=True, cwd=REPO_ROOT
+            ).stdout.strip().splitlines()[-1]
+            seconds, frame_mb, rss_mb, dtype, zeros_ok, rows = out.split('\t')
+            print(f"{engine:<8} {float(seconds):>8.3f} {float(frame_mb):>9.1f} {float(rss_mb):>13.1f}  {dtype:<16} {zeros_ok:<6} {rows}")
+
+
+if __name__ == '__main__':
+    main()
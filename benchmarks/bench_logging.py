@@ -0,0 +1,128 @@
+"""
+Benchmark: hot-loop throughput with logging off, synchronous and queued
+
+Runs a loop shaped like the app's per-file loops (a little string matching
+per item, one INFO record per item, a WARNING every --warn-every items) with:
+- "off":    logging disabled
+- "sync":   the previous setup, file and SnackBar handlers on the root logger
+            (every warning updates the page immediately)
+- "queued": logger.start_queue_logging(), as app.py now does; the loop only
+            enqueues records and warnings are coalesced into one SnackBar per
+            second. "drained" includes waiting for the listener to finish.
+
+The page is a stand-in whose update() sleeps --update-ms to model the
+round-trip to the Flet client. Logs are written to a temporary directory.
+
+Usage (from the repository root):
+    python benchmarks/bench_logging.py [--items 50000] [--warn-every 50] [--update-ms 2]
+"""
+
+import argparse
+import difflib
+import logging
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from logger import SnackBarHandler, start_queue_logging, stop_queue_logging  # noqa: E402
+from log_store import IndexedRotatingFileHandler  # noqa: E402
+
+FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+
+class FakePage:
+    """Just enough of ft.Page for SnackBarHandler."""
+
+    def __init__(self, update_seconds):
+        self.update_seconds = update_seconds
+        self.snack_bar = SimpleNamespace(content=SimpleNamespace(value=""), bgcolor=None)
+        self.updates = 0
+
+    def open(self, control):
+        pass
+
+    def update(self):
+        self.updates += 1
+        time.sleep(self.update_seconds)
+
+
+def hot_loop(log, items, warn_every):
+    """Per-item work plus logging, like a fuzzy search or derivative loop."""
+    target = "grinnell_college_archives_photograph"
+    for i in range(items):
+        candidate = f"grinnell_archives_photo_{i:06d}"
+        ratio = difflib.SequenceMatcher(None, target, candidate).quick_ratio()
+        log.info(f"Compared {candidate} (ratio {ratio:.3f})")
+        if i % warn_every == 0:
+            log.warning(f"No metadata match for {candidate}")
+
+
+def make_handlers(log_dir, page, min_interval):
+    file_handler = IndexedRotatingFileHandler(os.path.join(log_dir, "mdi.log"),
+                                              archive_dir=os.path.join(log_dir, "logs"))
+    file_handler.setFormatter(logging.Formatter(FORMAT))
+    snack_handler = SnackBarHandler(min_interval=min_interval)
+    snack_handler.page = page
+    return [file_handler, snack_handler]
+
+
+def run(mode, args):
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    root.handlers = []
+    root.setLevel(logging.INFO)
+    page = FakePage(args.update_ms / 1000)
+    log = logging.getLogger("bench")
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        listener = None
+        handlers = []
+        if mode == "off":
+            logging.disable(logging.CRITICAL)
+        elif mode == "sync":
+            # Previous behavior: a SnackBar for every warning
+            handlers = make_handlers(log_dir, page, min_interval=0)
+            for handler in handlers:
+                root.addHandler(handler)
+        else:
+            handlers = make_handlers(log_dir, page, min_interval=1.0)
+            for handler in handlers:
+                root.addHandler(handler)
+            listener = start_queue_logging(root, handlers)
+
+        start = time.perf_counter()
+        hot_loop(log, args.items, args.warn_every)
+        loop_time = time.perf_counter() - start
+        if listener is not None:
+            stop_queue_logging(listener)
+        drained = time.perf_counter() - start
+
+        logging.disable(logging.NOTSET)
+        for handler in handlers:
+            handler.close()
+        root.handlers = saved_handlers
+        root.setLevel(saved_level)
+
+    print(f"{mode:<8} {loop_time:>9.3f}s {args.items / loop_time:>12,.0f}/s {drained:>10.3f}s {page.updates:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50000, help="Loop iterations")
+    parser.add_argument("--warn-every", type=int, default=50, help="Log a warning every N items")
+    parser.add_argument("--update-ms", type=float, default=2.0, help="Simulated page.update() latency")
+    args = parser.parse_args()
+
+    print(f"{args.items} items, a warning every {args.warn_every}, page.update() {args.update_ms} ms")
+    print(f"{'mode':<8} {'loop':>10} {'throughput':>14} {'drained':>11} {'updates':>9}")
+    for mode in ("off", "sync", "queued"):
+        run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark: application startup time
+
+Reports two numbers for the app's cold start:
+- Import time of app.py, from "python -X importtime -c 'import app'", with the
+  modules that cost the most (cumulative microseconds) listed.
+- Wall-clock time to first frame: MDIApplication().main() plus rendering the
+  home route, on a headless Flet page whose connection discards all commands.
+
+Both are measured in fresh interpreters so earlier imports do not hide costs.
+The heavy modules (pandas, numpy, Pillow, PyMuPDF) are also checked: none of
+them should be loaded once the home view is on screen.
+
+Usage (from the repository root):
+    python benchmarks/bench_startup.py [--runs 5] [--top 15] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "numpy", "PIL", "fitz"]
+
+# Runs in a child interpreter; prints one JSON line with its measurements
+FIRST_FRAME_SCRIPT = r'''
+import time
+start = time.perf_counter()
+
+import asyncio, itertools, json, sys
+from types import SimpleNamespace
+import flet as ft
+from flet.core.connection import Connection
+from flet.core.protocol import PageCommandsBatchResponsePayload
+
+
+class NullConnection(Connection):
+    """Connection that accepts every command and never talks to a client."""
+
+    def send_command(self, session_id, command):
+        return SimpleNamespace(result="", error="")
+
+    ids = itertools.count(1)
+
+    def send_commands(self, session_id, commands):
+        # One line of new control ids per "add" command, one id per added control
+        results = [" ".join(f"_{next(self.ids)}" for _ in cmd.commands)
+                   for cmd in commands if cmd.name == "add"]
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+
+conn = NullConnection()
+conn.page_url = "http://127.0.0.1:8550"
+page = ft.Page(conn, "bench", asyncio.new_event_loop())
+imported = time.perf_counter()
+
+import app
+application = app.MDIApplication()
+application.main(page)
+# page.go() is dispatched asynchronously; render the home route directly
+application.route_change(SimpleNamespace(route="/", page=page))
+first_frame = time.perf_counter()
+
+print(json.dumps({
+    "flet_setup_s": imported - start,
+    "first_frame_s": first_frame - imported,
+    "heavy_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+}))
+'''
+
+
+def import_time(top):
+    """Run -X importtime for 'import app' and summarize its stderr report."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self [us] | cumulative | imported package"
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        entries.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    # Nesting is shown by indenting the name; top-level imports have one space
+    total_us = sum(cumulative for cumulative, _, name in entries if not name.startswith("  "))
+    top_entries = sorted(entries, reverse=True)[:top]
+    return {
+        "total_s": total_us / 1e6,
+        "module_count": len(entries),
+        "top": [{"module": name.strip(), "cumulative_ms": cumulative / 1000, "self_ms": self_us / 1000}
+                for cumulative, self_us, name in top_entries],
+    }
+
+
+def first_frame(runs):
+    """Time MDIApplication startup to the rendered home view in fresh interpreters."""
+    script = f"HEAVY_MODULES = {HEAVY_MODULES!r}\n" + FIRST_FRAME_SCRIPT
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True)
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    frames = [sample["first_frame_s"] for sample in samples]
+    return {
+        "runs": runs,
+        "median_s": statistics.median(frames),
+        "min_s": min(frames),
+        "max_s": max(frames),
+        "flet_setup_median_s": statistics.median(sample["flet_setup_s"] for sample in samples),
+        "heavy_loaded": samples[-1]["heavy_loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="First-frame runs (median is reported)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to a JSON file")
+    args = parser.parse_args()
+
+    imports = import_time(args.top)
+    print(f"import app: {imports['total_s'] * 1000:.1f} ms across {imports['module_count']} modules")
+    print(f"{'module':<40} {'cumulative':>12} {'self':>10}")
+    for entry in imports["top"]:
+        print(f"{entry['module']:<40} {entry['cumulative_ms']:>9.1f} ms {entry['self_ms']:>7.1f} ms")
+
+    frame = first_frame(args.runs)
+    print()
+    print(f"first frame (main + home render), {frame['runs']} runs: median {frame['median_s'] * 1000:.1f} ms "
+          f"(min {frame['min_s'] * 1000:.1f}, max {frame['max_s'] * 1000:.1f}); "
+          f"flet import + page setup {frame['flet_setup_median_s'] * 1000:.1f} ms")
+    heavy = frame["heavy_loaded"]
+    print(f"heavy modules loaded at first frame: {', '.join(heavy) if heavy else 'none'}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"import_time": imports, "first_frame": frame}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Benchmark suite: the ingest stages on a synthetic corpus, saved for comparison
+
+Builds a synthetic corpus (see corpus.py: a masters tree with archival file
+names, an Alma CSV with compound groups, metadata for a merge and TIFF/JPEG/PDF
+masters of several sizes) and times, each --repeat times:
+
+- search              utils.perform_fuzzy_search_batch for --targets CSV names
+- thumbnail.<fmt>.<size>
+                      thumbnail generation (Alma options) for each image master
+- csv_updates         read the CSV and pipeline.apply_alma_updates, the logic
+                      behind the Update CSV view's "Apply All Updates"
+- merge_metadata      StorageView.run_merge_metadata on rows generated from
+                      the tree's files, with metadata.csv
+
+Results (median and best time per case, items/s, and the sub-stage timers
+from the instrumentation registry) are written as JSON to
+benchmarks/results/<timestamp>_<commit>.json, together with the commit, the
+Python version and the corpus parameters. --compare prints each case's
+change against an earlier results file and marks slowdowns beyond
+--tolerance; with --fail-on-regression the exit status is 1 then.
+
+The same seed always builds the same corpus, so results from two commits
+are comparable when they were run with the same options on the same machine.
+
+Usage (from the repository root):
+    python benchmarks/bench_suite.py [--files 2000] [--images 2] [--targets 50] [--repeat 5]
+        [--seed 0] [--only search,csv_updates] [--corpus /tmp/mdi_corpus]
+        [--compare benchmarks/results/<earlier>.json] [--tolerance 0.10] [--fail-on-regression]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import corpus  # noqa: E402
+import instrumentation  # noqa: E402
+import pipeline  # noqa: E402
+import utils  # noqa: E402
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+CASE_GROUPS = ("search", "thumbnail", "csv_updates", "merge_metadata")
+
+
+class FakeSession:
+    """page.session for StorageView: get/set plus the attributes generate_unique_id keeps."""
+
+    def __init__(self):
+        self._values = {}
+
+    def get(self, key):
+        return self._values.get(key)
+
+    def set(self, key, value):
+        self._values[key] = value
+
+
+class FakePage:
+    """Just enough of ft.Page for StorageView.run_merge_metadata."""
+
+    def __init__(self):
+        self.session = FakeSession()
+        self.snack_bar = None
+
+    def update(self):
+        pass
+
+
+def git_commit():
+    """Short commit hash and whether the tree has uncommitted changes (None if not a git checkout)."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(dirty)
+
+
+def measure(func, repeat, items):
+    """
+    Run func repeat times and summarize.
+
+    Returns:
+        dict: "runs" (seconds each), "median_s", "best_s", "items",
+              "items_per_s" (at the median) and "breakdown" (instrumentation
+              timers recorded during the runs)
+    """
+    metrics = instrumentation.get_metrics()
+    metrics.reset()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    median = statistics.median(runs)
+    return {
+        "runs": [round(run, 6) for run in runs],
+        "median_s": round(median, 6),
+        "best_s": round(min(runs), 6),
+        "items": items,
+        "items_per_s": round(items / median, 2) if median else None,
+        "breakdown": metrics.snapshot()["timers"],
+    }
+
+
+def search_case(manifest, targets, seed):
+    rows = pipeline.read_csv(manifest["ingest_csv"])
+    names = pipeline.extract_column_values(rows, "file_name_1")
+    sample = random.Random(seed).sample(names, min(targets, len(names)))
+
+    def run():
+        utils.perform_fuzzy_search_batch(manifest["search_root"], sample, pipeline.MATCH_THRESHOLD)
+    return run, len(sample)
+
+
+def thumbnail_cases(manifest, out_dir):
+    """One case per image format and size; each run makes every master's thumbnail."""
+    from thumbnail import generate_thumbnail, generate_pdf_thumbnail
+
+    size_order = list(manifest["params"]["sizes"])
+    groups = {}
+    for master in sorted(manifest["masters"], key=lambda m: (m["format"], size_order.index(m["size"]))):
+        groups.setdefault(f"thumbnail.{master['format']}.{master['size']}", []).append(master["path"])
+
+    cases = {}
+    for name, paths in groups.items():
+        def run(paths=paths):
+            for path in paths:
+                output_path = os.path.join(out_dir, os.path.basename(path) + ".jpg.clientThumb")
+                generate = generate_pdf_thumbnail if path.lower().endswith(".pdf") else generate_thumbnail
+                if not generate(path, output_path, pipeline.ALMA_THUMBNAIL_OPTIONS):
+                    raise RuntimeError(f"Thumbnail failed for {path}")
+        cases[name] = (run, len(paths))
+    return cases
+
+
+def csv_updates_case(manifest):
+    csv_path = manifest["ingest_csv"]
+    df = pipeline.read_csv(csv_path)
+    names = [name for name in pipeline.extract_column_values(df, "file_name_1") if name]
+    renames = [(name, pipeline.sanitize_file_name(name)) for name in names]
+
+    def run():
+        ids = iter(range(1700000000, 1800000000))
+        data = pipeline.read_csv(csv_path)
+        pipeline.apply_alma_updates(data, os.path.basename(csv_path), renames,
+                                    new_id=lambda: f"dg_{next(ids)}")
+    return run, len(df)
+
+
+def merge_metadata_case(manifest):
+    import flet as ft
+    import csv_io
+    from generated_rows import GeneratedRows
+    from views.storage_view import StorageView
+
+    headings = corpus.load_headings()
+    file_paths = [os.path.join(manifest["search_root"], name) for name in manifest["files"]]
+    metadata_df = csv_io.read_csv_strings(manifest["metadata_csv"])
+    job = SimpleNamespace(cancelled=False, report=lambda progress=None, message=None: None)
+
+    def run():
+        view = StorageView(FakePage())
+        view.generated_csv_data = GeneratedRows.from_file_paths(file_paths, headings)
+        view.metadata_df = metadata_df
+        view.run_merge_metadata(job)
+        # The view reports failures in a snack bar instead of raising
+        if view.page.snack_bar is not None and view.page.snack_bar.bgcolor == ft.Colors.RED_600:
+            raise RuntimeError(view.page.snack_bar.content.value)
+    return run, len(file_paths)
+
+
+def compare(results, baseline_path, tolerance):
+    """
+    Print each case's median against a baseline results file.
+
+    Returns:
+        list: Names of the cases slower than baseline by more than tolerance
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("corpus") != results["corpus"]:
+        print("Warning: the baseline was run on a different corpus; times are not comparable")
+    print(f"\nAgainst {os.path.basename(baseline_path)} (commit {baseline.get('commit')}):")
+    print(f"{'case':<28} {'before':>10} {'after':>10} {'change':>8}")
+    regressions = []
+    for name, case in results["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if not before:
+            print(f"{name:<28} {'-':>10} {case['median_s']:>9.3f}s {'new':>8}")
+            continue
+        change = case["median_s"] / before["median_s"] - 1 if before["median_s"] else 0.0
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<28} {before['median_s']:>9.3f}s {case['median_s']:>9.3f}s {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000, help="Files in the synthetic masters tree")
+    parser.add_argument("--images", type=int, default=2, help="Image masters per format and size")
+    parser.add_argument("--targets", type=int, default=50, help="CSV names looked up by the search case")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help=f"Comma-separated case groups to run ({', '.join(CASE_GROUPS)})")
+    parser.add_argument("--corpus", help="Build (or reuse) the corpus in this directory instead of a temporary one")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", help="An earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Slowdown (fraction of the baseline median) reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on a regression")
+    args = parser.parse_args()
+
+    only = set(args.only.split(",")) if args.only else set(CASE_GROUPS)
+    unknown = only - set(CASE_GROUPS)
+    if unknown:
+        parser.error(f"unknown case group(s): {', '.join(sorted(unknown))}")
+
+    # Only warnings from the stages; per-file INFO logging would dominate the timings
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    work_dir = tempfile.mkdtemp(prefix="mdi_bench_")
+    # The stages' events go to the work directory, not the repository's logs/events;
+    # the results file keeps their timings
+    instrumentation.configure_event_log(os.path.join(work_dir, "events"))
+    corpus_dir = args.corpus or os.path.join(work_dir, "corpus")
+    try:
+        manifest_path = os.path.join(corpus_dir, "corpus.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            wanted = {"files": args.files, "images": args.images, "seed": args.seed}
+            if any(manifest["params"][key] != value for key, value in wanted.items()):
+                parser.error(f"{corpus_dir} holds a corpus built with other options: {manifest['params']}")
+            print(f"Reusing corpus in {corpus_dir}")
+        else:
+            start = time.perf_counter()
+            manifest = corpus.make_corpus(corpus_dir, args.files, args.images, args.seed)
+            print(f"Built corpus in {time.perf_counter() - start:.1f}s: {len(manifest['files'])} files, "
+                  f"{manifest['csv_rows']} CSV rows ({manifest['compound_groups']} compound groups), "
+                  f"{len(manifest['masters'])} image masters")
+
+        cases = {}
+        if "search" in only:
+            cases["search"] = search_case(manifest, args.targets, args.seed)
+        if "thumbnail" in only:
+            thumbnail_dir = os.path.join(work_dir, "TN")
+            os.makedirs(thumbnail_dir, exist_ok=True)
+            cases.update(thumbnail_cases(manifest, thumbnail_dir))
+        if "csv_updates" in only:
+            cases["csv_updates"] = csv_updates_case(manifest)
+        if "merge_metadata" in only:
+            cases["merge_metadata"] = merge_metadata_case(manifest)
+
+        commit, dirty = git_commit()
+        results = {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "corpus": {**manifest["params"], "targets": args.targets},
+            "cases": {},
+        }
+        print(f"\n{'case':<28} {'median':>10} {'best':>10} {'items':>7} {'items/s':>10}")
+        for name, (run, items) in cases.items():
+            case = measure(run, args.repeat, items)
+            results["cases"][name] = case
+            print(f"{name:<28} {case['median_s']:>9.3f}s {case['best_s']:>9.3f}s {items:>7} "
+                  f"{case['items_per_s'] or 0:>10,.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}_{commit or 'nogit'}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults: {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
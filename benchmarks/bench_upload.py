@@ -0,0 +1,177 @@
+"""
+Benchmark: Alma upload stage throughput against a local S3 stand-in
+
+Builds a synthetic temporary ingest directory (a CSV, OBJS/ with masters
+drawn from a size distribution and one small TN/ thumbnail per master) and
+uploads it with uploader.Uploader for every combination of --workers and
+--part-mb, reporting objects/s, MB/s and retries.
+
+The target is uploader.LocalTransport (a directory-backed fake) wrapped to
+model the network: each request waits --latency-ms plus its size at
+--bandwidth-mbps, and fails with probability --fail-rate so retries are
+exercised. With --endpoint the upload goes to an S3-compatible server
+instead, e.g. a local moto server ("moto_server -p 5000"), which needs
+boto3; the network model is not applied then.
+
+Usage (from the repository root):
+    python benchmarks/bench_upload.py [--objects 200] [--sizes 1:70,20:25,120:5]
+        [--workers 1,4,8,16] [--part-mb 8,16] [--latency-ms 20] [--bandwidth-mbps 400]
+        [--fail-rate 0.01] [--endpoint http://127.0.0.1:5000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import instrumentation  # noqa: E402
+import uploader  # noqa: E402
+
+MB = 1024 * 1024
+
+
+class NetworkModel:
+    """Wraps a transport, adding latency, bandwidth limits and random failures per request."""
+
+    def __init__(self, transport, latency, bytes_per_s, fail_rate, seed=0):
+        self.transport = transport
+        self.latency = latency
+        self.bytes_per_s = bytes_per_s
+        self.fail_rate = fail_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _request(self, size=0):
+        time.sleep(self.latency + (size / self.bytes_per_s if self.bytes_per_s else 0))
+        with self._lock:
+            failed = self._random.random() < self.fail_rate
+        if failed:
+            raise ConnectionError("simulated network failure")
+
+    def list_objects(self, prefix):
+        self._request()
+        return self.transport.list_objects(prefix)
+
+    def put_object(self, key, path):
+        self._request(os.path.getsize(path))
+        return self.transport.put_object(key, path)
+
+    def create_multipart_upload(self, key):
+        self._request()
+        return self.transport.create_multipart_upload(key)
+
+    def upload_part(self, key, upload_id, part_number, data):
+        self._request(len(data))
+        return self.transport.upload_part(key, upload_id, part_number, data)
+
+    def complete_multipart_upload(self, key, upload_id, part_etags):
+        self._request()
+        return self.transport.complete_multipart_upload(key, upload_id, part_etags)
+
+    def abort_multipart_upload(self, key, upload_id):
+        self.transport.abort_multipart_upload(key, upload_id)
+
+    def describe(self):
+        return self.transport.describe()
+
+
+def parse_sizes(spec):
+    """"1:70,20:25" -> [(1 MB, 70), (20 MB, 25)]: size in MB and relative weight."""
+    sizes = []
+    for part in spec.split(","):
+        size_mb, _, weight = part.partition(":")
+        sizes.append((float(size_mb) * MB, float(weight or 1)))
+    return sizes
+
+
+def make_tree(root, objects, sizes, seed):
+    """Create <root>/ingest.csv, OBJS/ and TN/. Returns the total bytes."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(root, "OBJS"))
+    os.makedirs(os.path.join(root, "TN"))
+    block = os.urandom(MB)
+    total = 0
+    rows = ["file_name_1,dc:title"]
+    for i in range(objects):
+        size = int(rng.choices([s for s, _ in sizes], weights=[w for _, w in sizes])[0] * rng.uniform(0.8, 1.2))
+        name = f"grinnell_{i:05d}.tif"
+        with open(os.path.join(root, "OBJS", name), "wb") as f:
+            written = 0
+            while written < size:
+                chunk = block[:min(MB, size - written)]
+                f.write(chunk)
+                written += len(chunk)
+        with open(os.path.join(root, "TN", f"grinnell_{i:05d}_TN.jpg"), "wb") as f:
+            f.write(block[:20 * 1024])
+        total += size + 20 * 1024
+        rows.append(f"{name},Item {i}")
+    with open(os.path.join(root, "ingest.csv"), "w") as f:
+        f.write("\n".join(rows) + "\n")
+    return total
+
+
+def make_transport(args, bucket_dir):
+    if args.endpoint:
+        import boto3
+        client = boto3.client("s3", endpoint_url=args.endpoint, region_name="us-east-1",
+                              aws_access_key_id="test", aws_secret_access_key="test")
+        bucket = f"bench-{uuid.uuid4().hex[:8]}"
+        client.create_bucket(Bucket=bucket)
+        return uploader.S3Transport(bucket, client=client)
+    return NetworkModel(uploader.LocalTransport(bucket_dir), args.latency_ms / 1000,
+                        args.bandwidth_mbps * MB / 8, args.fail_rate, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=200, help="Masters in OBJS/ (each also gets a thumbnail)")
+    parser.add_argument("--sizes", default="1:70,20:25,120:5",
+                        help="Master size distribution as MB:weight pairs")
+    parser.add_argument("--workers", default="1,4,8,16", help="Comma-separated worker counts")
+    parser.add_argument("--part-mb", default="8,16", help="Comma-separated multipart part sizes in MB")
+    parser.add_argument("--threshold-mb", type=float, default=uploader.MULTIPART_THRESHOLD / MB,
+                        help="Multipart threshold in MB")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated per-request latency")
+    parser.add_argument("--bandwidth-mbps", type=float, default=400.0,
+                        help="Simulated bandwidth per connection in megabits/s (0 = unlimited)")
+    parser.add_argument("--fail-rate", type=float, default=0.01, help="Probability a request fails")
+    parser.add_argument("--endpoint", help="S3-compatible endpoint (e.g. a moto server) instead of the fake")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    logging.getLogger("uploader").setLevel(logging.ERROR)  # Retries are counted, not logged
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Keep the upload events out of the repository's logs/events
+        instrumentation.configure_event_log(os.path.join(work_dir, "events"))
+        temp_dir = os.path.join(work_dir, "ingest")
+        total = make_tree(temp_dir, args.objects, parse_sizes(args.sizes), args.seed)
+        items = uploader.collect_upload_items(temp_dir)
+        print(f"{len(items)} objects, {total / MB:,.0f} MB; latency {args.latency_ms} ms, "
+              f"{args.bandwidth_mbps} Mbit/s per connection, fail rate {args.fail_rate}")
+        print(f"{'workers':>7} {'part MB':>7} {'time':>8} {'objects/s':>10} {'MB/s':>8} {'retries':>8} {'failed':>7}")
+
+        for part_mb in [float(p) for p in args.part_mb.split(",")]:
+            for workers in [int(w) for w in args.workers.split(",")]:
+                bucket_dir = os.path.join(work_dir, f"bucket-{uuid.uuid4().hex[:8]}")
+                upload = uploader.Uploader(
+                    make_transport(args, bucket_dir), prefix=uploader.alma_prefix("bench", "run"),
+                    workers=workers, part_size=int(part_mb * MB),
+                    multipart_threshold=int(args.threshold_mb * MB),
+                    checkpoint_path=os.path.join(bucket_dir + ".checkpoint.jsonl"),
+                    retry_delay=0.05
+                )
+                stats = upload.run(items)
+                print(f"{workers:>7} {part_mb:>7g} {stats['elapsed_s']:>7.2f}s {stats['objects_per_s']:>10.1f} "
+                      f"{stats['mb_per_s']:>8.1f} {stats['retries']:>8} {len(stats['failed']):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Synthetic ingest corpora for the benchmark suite
+
+Builds, offline and reproducibly (same seed, same corpus), what an ingest
+batch looks like on disk:
+
+    <root>/
+        masters/<collection>/Box_03/Folder_12/<file>    N files with archival names
+        ingest.csv      Alma CSV (verified Alma-D headings) listing the files,
+                        with a comment row and compound parent/child groups
+        metadata.csv    Metadata for a metadata merge, keyed on file_name_1
+        corpus.json     The parameters and the list of image masters
+
+File names follow the patterns found in real batches ("grinnell_00421_OBJ.tif",
+"Scarlet and Black 1965-03-12 p04.pdf", "Box03_Folder12_007.jpg", ...). Some
+CSV names differ from the file on disk by separators or case, and a share
+of them have no file at all, so the fuzzy search has real work to do.
+
+Most files in the tree are empty (only their names matter to the search).
+The image masters -- --images of each format (TIFF, JPEG, PDF) and size --
+hold real noisy pixels, so decoding, resizing and encoding them costs what
+a scan of that size costs.
+
+Usage (from the repository root), to build a corpus to look at or reuse:
+    python benchmarks/corpus.py --root /tmp/mdi_corpus [--files 2000] [--images 2] [--seed 0]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADINGS_FILE = os.path.join(REPO_ROOT, "_data", "verified_CSV_headings_for_Alma-D.csv")
+
+# Image master sizes (label -> width, height in pixels)
+IMAGE_SIZES = {
+    "small": (800, 600),
+    "medium": (2400, 1800),
+    "large": (4800, 3600),
+}
+IMAGE_FORMATS = ("tif", "jpg", "pdf")
+
+COLLECTIONS = ("College_Archives", "Faulconer_Gallery", "Special_Collections", "Scarlet_and_Black")
+SURNAMES = ("Grinnell", "Herrick", "Magoun", "Rand", "Carnegie", "Burling", "Mears", "Goodnow", "Steiner", "Noyce")
+SUBJECTS = ("letter", "photograph", "program", "minutes", "poster", "postcard", "map", "ledger", "scrapbook")
+TYPES = ("Image", "Text", "StillImage")
+
+# Share of CSV rows whose file does not exist, and whose name is written
+# differently from the file on disk
+MISSING_SHARE = 0.05
+VARIANT_SHARE = 0.15
+
+# Share of CSV objects that are compound parents (followed by 2-4 children)
+COMPOUND_SHARE = 0.1
+
+
+def load_headings():
+    with open(HEADINGS_FILE, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f))
+
+
+def archival_name(rng, number):
+    """One file name (without extension) in one of the patterns seen in real batches."""
+    year = rng.randint(1890, 2020)
+    pattern = rng.randrange(5)
+    if pattern == 0:
+        return f"grinnell_{number:05d}_OBJ"
+    if pattern == 1:
+        return f"Box{rng.randint(1, 40):02d}_Folder{rng.randint(1, 30):02d}_{number % 1000:03d}"
+    if pattern == 2:
+        return f"Scarlet and Black {year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} p{number % 24 + 1:02d}"
+    if pattern == 3:
+        return f"dg_{1500000000 + number * 37}"
+    return f"{rng.choice(SURNAMES)}, {rng.choice('ABCDEFGHJKLMNPRSTW')}. {rng.choice(SUBJECTS)} {year} ({number})"
+
+
+def variant(rng, filename):
+    """The same name as a cataloguer might have typed it: other separators or case."""
+    stem, ext = os.path.splitext(filename)
+    choice = rng.randrange(3)
+    if choice == 0:
+        stem = stem.replace("_", " ") if "_" in stem else stem.replace(" ", "_")
+    elif choice == 1:
+        stem = stem.replace("_", "-").replace(" ", "-")
+    else:
+        stem = stem.lower()
+    return stem + ext
+
+
+def write_image(path, size, seed):
+    """Write a noisy RGB image (TIFF, JPEG or one-page PDF, by extension)."""
+    from PIL import Image
+
+    width, height = size
+    noise = Image.effect_noise((width, height), 48 + seed % 32)
+    gradient = Image.linear_gradient("L").resize((width, height))
+    img = Image.merge("RGB", (noise, gradient, Image.eval(noise, lambda v: 255 - v)))
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".tif":
+        img.save(path, "TIFF")
+    elif ext == ".jpg":
+        img.save(path, "JPEG", quality=92)
+    else:
+        img.save(path, "PDF", resolution=150)
+
+
+def make_corpus(root, files=2000, images=2, seed=0, sizes=None):
+    """
+    Build a corpus under root (see the module docstring for the layout).
+
+    Args:
+        root (str): Directory to build in (created if needed)
+        files (int): Files in the masters tree
+        images (int): Image masters per format and size
+        seed (int): Random seed; the same seed builds the same corpus
+        sizes (dict): Image size label -> (width, height) (default: IMAGE_SIZES)
+
+    Returns:
+        dict: The manifest also written to corpus.json: "params", "search_root",
+              "ingest_csv", "metadata_csv", "files", "csv_rows",
+              "compound_groups" and "masters" (one {"path", "format", "size"}
+              per image master)
+    """
+    rng = random.Random(seed)
+    sizes = sizes or IMAGE_SIZES
+    search_root = os.path.join(root, "masters")
+
+    # The tree: every file gets a unique archival name in a box/folder
+    names = set()
+    paths = []
+    for number in range(files):
+        name = archival_name(rng, number)
+        while name.lower() in names:
+            name += f"_{rng.randint(0, 9)}"
+        names.add(name.lower())
+        directory = os.path.join(search_root, rng.choice(COLLECTIONS),
+                                 f"Box_{rng.randint(1, 12):02d}", f"Folder_{rng.randint(1, 20):02d}")
+        paths.append(os.path.join(directory, f"{name}.{rng.choice(IMAGE_FORMATS)}"))
+
+    # Image masters: the first files of each extension get real pixels
+    masters = []
+    wanted = {(fmt, label): images for fmt in IMAGE_FORMATS for label in sizes}
+    for path in paths:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fmt = os.path.splitext(path)[1][1:]
+        label = next((label for (f, label), left in wanted.items() if f == fmt and left), None)
+        if label is None:
+            open(path, "wb").close()
+            continue
+        wanted[(fmt, label)] -= 1
+        write_image(path, sizes[label], len(masters))
+        masters.append({"path": path, "format": fmt, "size": label})
+
+    # The ingest CSV: one row per file (a few renamed or missing), grouped
+    # into single objects and compound parents with their children
+    headings = load_headings()
+    rows = []
+    compound_groups = 0
+    position = 0
+    while position < len(paths):
+        is_compound = rng.random() < COMPOUND_SHARE and position + 3 <= len(paths)
+        group = paths[position:position + (rng.randint(3, 5) if is_compound else 1)]
+        position += len(group)
+        compound_groups += is_compound
+        for index, path in enumerate(group):
+            filename = os.path.basename(path)
+            draw = rng.random()
+            if draw < MISSING_SHARE:
+                filename = f"missing_{len(rows):05d}{os.path.splitext(filename)[1]}"
+            elif draw < MISSING_SHARE + VARIANT_SHARE:
+                filename = variant(rng, filename)
+            row = dict.fromkeys(headings, "")
+            row.update({
+                "file_name_1": filename,
+                "dc:title": os.path.splitext(filename)[0].replace("_", " "),
+                "dc:type": rng.choice(TYPES),
+                "dc:date": str(rng.randint(1890, 2020)),
+                "dc:creator": rng.choice(SURNAMES),
+            })
+            if is_compound:
+                row["compoundrelationship"] = "parent" if index == 0 else "child"
+            rows.append(row)
+
+    ingest_csv = os.path.join(root, "ingest.csv")
+    with open(ingest_csv, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=headings)
+        writer.writeheader()
+        writer.writerow({headings[0]: f"# Synthetic corpus, seed {seed}"})
+        writer.writerows(rows)
+
+    # Metadata for a merge: most rows keyed exactly, some by a variant, some unmatched
+    metadata_csv = os.path.join(root, "metadata.csv")
+    metadata_columns = ["file_name_1", "dc:title", "dc:description", "dc:date", "dc:subject"]
+    with open(metadata_csv, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(metadata_columns)
+        for row in rows:
+            filename = os.path.basename(row["file_name_1"])
+            draw = rng.random()
+            if draw < 0.1:
+                continue
+            if draw < 0.25:
+                filename = variant(rng, filename)
+            writer.writerow([filename, f"{row['dc:title']} (catalogued)",
+                             f"{rng.choice(SUBJECTS).capitalize()} from the {rng.choice(COLLECTIONS)} collection",
+                             row["dc:date"], rng.choice(SUBJECTS)])
+
+    manifest = {
+        "params": {"files": files, "images": images, "seed": seed, "sizes": {k: list(v) for k, v in sizes.items()}},
+        "search_root": search_root,
+        "ingest_csv": ingest_csv,
+        "metadata_csv": metadata_csv,
+        "files": [os.path.basename(path) for path in paths],
+        "csv_rows": len(rows),
+        "compound_groups": compound_groups,
+        "masters": masters,
+    }
+    with open(os.path.join(root, "corpus.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", required=True, help="Directory to build the corpus in")
+    parser.add_argument("--files", type=int, default=2000, help="Files in the masters tree")
+    parser.add_argument("--images", type=int, default=2, help="Image masters per format and size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if os.path.exists(os.path.join(args.root, "corpus.json")):
+        sys.exit(f"{args.root} already holds a corpus")
+    manifest = make_corpus(args.root, args.files, args.images, args.seed)
+    print(f"{len(manifest['files'])} files, {manifest['csv_rows']} CSV rows "
+          f"({manifest['compound_groups']} compound groups), {len(manifest['masters'])} image masters "
+          f"in {args.root}")
+
+
+if __name__ == "__main__":
+    main()
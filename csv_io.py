@@ -0,0 +1,279 @@
+"""
+CSV Reading Helpers for Manage Digital Ingest
+
+This module centralizes how the application parses CSV files. Alma CSVs must be
+read with every column as a string and with pandas' default NaN handling turned
+off (keep_default_na=False), so identifiers like mms_id never become floats or
+scientific notation and empty cells stay empty strings.
+
+Two parser engines are supported:
+- "pyarrow": multithreaded Arrow CSV parser producing pyarrow-backed string
+  columns (the equivalent of engine="pyarrow", dtype_backend="pyarrow").
+  Used when pyarrow is installed.
+- "c": pandas' default C parser with dtype=str. Always available, and used as
+  the fallback whenever pyarrow is missing, an option is not supported by the
+  Arrow parser, or the Arrow parser rejects a file (ragged rows, bad bytes).
+
+pandas is imported on first parse, so header-only helpers such as
+read_csv_header() can be used without paying the pandas import cost.
+
+Writes go through write_csv_atomic(), which streams rows to a sibling temp
+file and renames it into place, so readers never see a truncated CSV.
+
+Note: pandas' own engine="pyarrow" infers column types before applying
+dtype=str, which turns "00123" into "123". To keep strict string semantics the
+Arrow path calls pyarrow.csv directly with every column typed as string.
+"""
+
+import csv
+import logging
+import os
+import stat
+import tempfile
+import time
+from functools import lru_cache
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Engine used when callers do not ask for one: "auto", "pyarrow" or "c"
+DEFAULT_ENGINE = "auto"
+
+# Encodings tried, in order, when reading user-supplied CSV files
+CSV_ENCODINGS = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'utf-16']
+
+# read_csv options the Arrow path does not implement; these go to the C parser
+_PYARROW_UNSUPPORTED = {'nrows', 'skiprows', 'usecols', 'chunksize', 'iterator', 'quoting'}
+
+
+@lru_cache(maxsize=1)
+def pyarrow_available():
+    """Return True if pyarrow (and its CSV module) can be imported."""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.csv  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_engine(engine=None, **kwargs):
+    """
+    Decide which parser engine to use for a read.
+
+    Args:
+        engine: "auto", "pyarrow", "c" or None (None uses DEFAULT_ENGINE)
+        **kwargs: The extra read_csv options the caller intends to pass
+
+    Returns:
+        str: Either "pyarrow" or "c"
+    """
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ("auto", "pyarrow", "c"):
+        raise ValueError(f"Unknown CSV engine '{engine}'. Must be 'auto', 'pyarrow' or 'c'.")
+
+    if engine == "c":
+        return "c"
+    if not pyarrow_available() or _PYARROW_UNSUPPORTED.intersection(kwargs):
+        return "c"
+    return "pyarrow"
+
+
+def _read_header(csv_path, encoding):
+    """Read only the header row of a CSV file with the stdlib csv module."""
+    with open(csv_path, 'r', encoding=encoding, newline='') as f:
+        header = next(csv.reader(f), [])
+    # Spreadsheet exports often start with a UTF-8 byte order mark
+    if header and header[0].startswith('\ufeff'):
+        header[0] = header[0][1:]
+    return header
+
+
+def read_csv_header(csv_path, encoding='utf-8'):
+    """
+    Read the column names of a CSV file without parsing any data rows.
+
+    Only the first line is read, using the stdlib csv module. Names are
+    normalized the way pandas.read_csv would report them, so results match
+    DataFrame.columns: a UTF-8 byte order mark is dropped, blank headings
+    become "Unnamed: <n>" and repeated headings get ".1", ".2" suffixes.
+
+    Args:
+        csv_path: Path to the CSV file
+        encoding: Text encoding of the file
+
+    Returns:
+        list: Column names in file order
+
+    Raises:
+        UnicodeDecodeError: If the header cannot be decoded with the given encoding
+    """
+    columns = []
+    seen = {}
+    for index, name in enumerate(_read_header(csv_path, encoding)):
+        if name == '':
+            name = f"Unnamed: {index}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        seen.setdefault(name, 0)
+        columns.append(name)
+    return columns
+
+
+def _read_csv_pyarrow(csv_path, encoding):
+    """Parse a CSV file with pyarrow, typing every column as a string."""
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    header = _read_header(csv_path, encoding)
+    if not header or len(set(header)) != len(header):
+        # Empty or duplicate headings: let the C parser apply pandas' naming rules
+        raise ValueError("Header row is empty or contains duplicate column names")
+
+    table = pacsv.read_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(encoding=encoding),
+        # Alma descriptions can legitimately contain quoted newlines
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            null_values=[],
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def read_csv_strings(csv_path, encoding='utf-8', engine=None, **kwargs):
+    """
+    Read a CSV file with every column as a string and no NaN conversion.
+
+    Args:
+        csv_path: Path to the CSV file
+        encoding: Text encoding of the file
+        engine: "auto", "pyarrow", "c" or None (None uses DEFAULT_ENGINE)
+        **kwargs: Extra options passed to pandas.read_csv (e.g. nrows)
+
+    Returns:
+        pandas.DataFrame: The CSV contents as strings
+
+    Raises:
+        UnicodeDecodeError: If the file cannot be decoded with the given encoding,
+            so callers can keep trying other encodings
+    """
+    with instrumentation.timer("csv_parse"):
+        df = _read_csv_strings(csv_path, encoding, engine, **kwargs)
+    instrumentation.count("csv_parse.rows", len(df))
+    return df
+
+
+def _read_csv_strings(csv_path, encoding, engine, **kwargs):
+    if resolve_engine(engine, **kwargs) == "pyarrow":
+        try:
+            return _read_csv_pyarrow(csv_path, encoding)
+        except (UnicodeDecodeError, UnicodeError):
+            raise
+        except Exception as e:
+            # Invalid UTF-8 is reported by Arrow as ArrowInvalid, so re-check with
+            # the C parser, which raises UnicodeDecodeError for the encoding loop
+            logger.info(f"pyarrow CSV engine could not parse {csv_path} ({e}); falling back to C parser")
+
+    import pandas as pd
+    return pd.read_csv(csv_path, encoding=encoding, dtype=str, keep_default_na=False, **kwargs)
+
+
+# Rows serialized per to_csv call when streaming a DataFrame to disk
+WRITE_CHUNK_ROWS = 5000
+
+
+def _default_file_mode():
+    """Permission bits a plain open() would give a new file under the current umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _fsync_directory(directory):
+    """Flush a directory entry (the rename) to disk where the OS supports it."""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_csv_atomic(df, csv_path, rows=None, transform=None, encoding='utf-8',
+                     chunk_rows=WRITE_CHUNK_ROWS):
+    """
+    Write a DataFrame to CSV without ever exposing a partially written file.
+
+    Rows are streamed in chunks to a temporary file next to csv_path, which is
+    flushed, fsynced and then renamed over csv_path with os.replace. If the
+    process dies mid-write the previous csv_path is left untouched. Only one
+    chunk is materialized at a time, so filtering or rewriting columns never
+    needs a full copy of the frame.
+
+    Output matches df.to_csv(csv_path, index=False, quoting=csv.QUOTE_MINIMAL).
+
+    Args:
+        df: The DataFrame to write
+        csv_path: Destination path
+        rows: Optional positional row indexes to write, in order (default: all rows)
+        transform: Optional callable(chunk, positions) returning the chunk to
+            write; chunk is a fresh DataFrame the callable may modify in place
+            and positions are the chunk's row positions in df
+        encoding: Text encoding of the output file
+        chunk_rows: Number of rows serialized per chunk
+
+    Returns:
+        int: Number of data rows written
+    """
+    import numpy as np
+
+    positions = np.arange(len(df)) if rows is None else np.asarray(rows, dtype=np.intp)
+    directory = os.path.dirname(os.path.abspath(csv_path))
+    with instrumentation.stage("csv_save", path=csv_path, rows=len(positions)) as stage_info:
+        start_time = time.perf_counter()
+
+        fd, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(csv_path)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding=encoding, newline='') as f:
+                if len(positions) == 0:
+                    df.iloc[0:0].to_csv(f, index=False, quoting=csv.QUOTE_MINIMAL)
+                for start in range(0, len(positions), chunk_rows):
+                    chunk_positions = positions[start:start + chunk_rows]
+                    chunk = df.iloc[chunk_positions]
+                    if transform is not None:
+                        chunk = transform(chunk.copy(), chunk_positions)
+                    chunk.to_csv(f, index=False, header=(start == 0), quoting=csv.QUOTE_MINIMAL)
+                f.flush()
+                os.fsync(f.fileno())
+
+            if os.path.exists(csv_path):
+                os.chmod(temp_path, stat.S_IMODE(os.stat(csv_path).st_mode))
+            else:
+                os.chmod(temp_path, _default_file_mode())
+            os.replace(temp_path, csv_path)
+            _fsync_directory(directory)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        elapsed = max(time.perf_counter() - start_time, 1e-9)
+        size_bytes = os.path.getsize(csv_path)
+        size_mb = size_bytes / (1024 * 1024)
+        logger.info(
+            f"Wrote {len(positions)} rows ({size_mb:.2f} MB) to {csv_path} in {elapsed:.3f}s "
+            f"({size_mb / elapsed:.1f} MB/s, {len(positions) / elapsed:.0f} rows/s)"
+        )
+        stage_info["bytes"] = size_bytes
+    return len(positions)
@@ -0,0 +1,187 @@
+"""
+Generated CSV Rows for Manage Digital Ingest
+
+This module contains GeneratedRows, the column-oriented store behind the
+Storage view's generated CSV rows. An Alma row has dozens of headings but only
+a few (file_name_1, dc:title, merged metadata) are ever filled in, so instead
+of one dict per file holding every heading, values are kept as one list per
+column and columns that are entirely empty are not stored at all.
+
+The session holds the store in its plain-dict form (see to_session()), which
+is JSON-serializable for AboutView.preserve_session and shares the column
+lists with the live object rather than copying them.
+"""
+
+import os
+
+# Session key the Storage view keeps its generated rows under
+SESSION_KEY = "generated_csv_rows"
+
+
+class GeneratedRows:
+    """
+    Column-oriented table of generated CSV rows with sparse empty columns.
+    """
+
+    def __init__(self, headings=None, length=0, columns=None):
+        """
+        Initialize the store.
+
+        Args:
+            headings (list): Column names, in output order
+            length (int): Number of rows
+            columns (dict): Heading -> list of values, for non-empty columns only
+        """
+        self.headings = list(headings or [])
+        self.length = length
+        self._heading_set = set(self.headings)
+        self._columns = {}
+        for heading, values in (columns or {}).items():
+            if heading in self._heading_set and len(values) == length:
+                self._columns[heading] = values
+
+    @classmethod
+    def from_file_paths(cls, file_paths, headings):
+        """
+        Build one row per file with file_name_1 and dc:title filled in.
+
+        Args:
+            file_paths (list): Paths of the selected files
+            headings (list): Alma CSV headings
+
+        Returns:
+            GeneratedRows: The new rows
+        """
+        store = cls(headings, len(file_paths))
+        filenames = [os.path.basename(path) for path in file_paths]
+        if 'file_name_1' in store._heading_set:
+            store._columns['file_name_1'] = filenames
+        if 'dc:title' in store._heading_set:
+            store._columns['dc:title'] = [os.path.splitext(name)[0] for name in filenames]
+        return store
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a store from a list of row dicts (the pre-columnar session format).
+
+        Args:
+            records (list): Row dicts sharing the same keys
+
+        Returns:
+            GeneratedRows: The rows in columnar form
+        """
+        headings = list(records[0].keys()) if records else []
+        store = cls(headings, len(records))
+        for heading in headings:
+            values = [record.get(heading, "") for record in records]
+            if any(values):
+                store._columns[heading] = values
+        return store
+
+    @classmethod
+    def from_session(cls, value):
+        """
+        Rebuild a store from what the session holds under SESSION_KEY.
+
+        Accepts the dict written by to_session(), a legacy list of row dicts
+        (e.g. from an older preserved session), or None.
+
+        Args:
+            value: The session value
+
+        Returns:
+            GeneratedRows: The restored rows (empty if value is empty or unrecognized)
+        """
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            return cls(value.get("headings"), value.get("length", 0), value.get("columns"))
+        if isinstance(value, list):
+            return cls.from_records(value)
+        return cls()
+
+    def to_session(self):
+        """
+        Plain-dict, JSON-serializable form for page.session.
+
+        The column lists are shared, not copied.
+
+        Returns:
+            dict: {"headings": [...], "length": n, "columns": {heading: [values]}}
+        """
+        return {"headings": self.headings, "length": self.length, "columns": self._columns}
+
+    def __len__(self):
+        return self.length
+
+    def has_column(self, heading):
+        """Return True if heading is one of the row headings."""
+        return heading in self._heading_set
+
+    def get(self, position, heading):
+        """
+        Get one cell value.
+
+        Args:
+            position (int): Row position
+            heading (str): Column name
+
+        Returns:
+            str: The value ("" for columns that are empty)
+        """
+        values = self._columns.get(heading)
+        return values[position] if values is not None else ""
+
+    def set(self, position, heading, value):
+        """
+        Set one cell value, allocating the column on its first non-empty value.
+
+        Args:
+            position (int): Row position
+            heading (str): Column name (must be one of the headings)
+            value (str): New value
+        """
+        values = self._columns.get(heading)
+        if values is None:
+            if not value:
+                return
+            if heading not in self._heading_set:
+                raise KeyError(f"Unknown heading '{heading}'")
+            values = [""] * self.length
+            self._columns[heading] = values
+        values[position] = value
+
+    def column(self, heading):
+        """
+        Get all values of one column.
+
+        Args:
+            heading (str): Column name
+
+        Returns:
+            list: The values; a new list of "" for columns that are empty
+        """
+        values = self._columns.get(heading)
+        return values if values is not None else [""] * self.length
+
+    def non_empty_columns(self):
+        """Headings with at least one non-empty value, in heading order."""
+        return [heading for heading in self.headings
+                if heading in self._columns and any(self._columns[heading])]
+
+    def to_dataframe(self, headings=None):
+        """
+        Build a string DataFrame for display or export.
+
+        Args:
+            headings (list): Columns to include (default: all headings)
+
+        Returns:
+            pandas.DataFrame: One row per generated row
+        """
+        import pandas as pd
+
+        headings = self.headings if headings is None else headings
+        return pd.DataFrame({heading: self.column(heading) for heading in headings},
+                            columns=headings, dtype=object)
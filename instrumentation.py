@@ -0,0 +1,415 @@
+"""
+Structured Event Log for Manage Digital Ingest
+
+This module records ingest stage events as JSON Lines, alongside the
+free-form mdi.log. Each application run gets its own file,
+EVENTS_DIR/<run id>.jsonl, created on the first event (configure_event_log()
+moves it elsewhere, e.g. to a temporary directory). Every record carries:
+
+- "run":   the run id (start time plus a random suffix)
+- "event": the event name, e.g. "search.start", "search.match", "csv_save.end"
+- "t":     monotonic seconds since the run started
+- "wall":  wall-clock epoch seconds, for lining records up with mdi.log
+- event-specific fields, such as "duration_s", "target" or "rows"
+
+Views and helpers emit events through emit() and stage() instead of building
+log strings:
+
+    with instrumentation.stage("search", targets=len(files)) as info:
+        ...
+        instrumentation.emit("search.match", target=name, ratio=ratio)
+        info["matched"] = matched
+
+stage() writes "<name>.start" and "<name>.end" records; the end record has
+the duration and status ("ok" or "error") and any fields added to info.
+summarize_run() turns a run's file into per-stage counts, durations and
+throughput, so two runs can be compared.
+
+Alongside the event log, an in-memory MetricsRegistry keeps live per-name
+call counts, total times and p50/p95 durations for the whole process. Every
+stage() is recorded there, and hot paths too fine-grained for events
+(thumbnail decode/resize/encode, tree walk and scoring) use timer():
+
+    with instrumentation.timer("thumbnail.resize"):
+        img.thumbnail(size)
+    instrumentation.count("search.candidates", len(files))
+
+snapshot() feeds the performance panel in the About view; export() writes
+it as JSON.
+"""
+
+import atexit
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+EVENTS_DIR = os.path.join("logs", "events")
+
+# Number of run files kept in EVENTS_DIR
+EVENTS_KEEP_RUNS = 50
+
+# Most recent durations kept per timer for the p50/p95 figures
+METRICS_SAMPLES = 2048
+
+
+def new_run_id():
+    """Run id: local start time plus a short random suffix, sortable by time."""
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+class EventLog:
+    """
+    Append-only JSON Lines event stream for one run.
+    """
+
+    def __init__(self, events_dir=EVENTS_DIR, run_id=None):
+        """
+        Initialize the event log. The file is created on the first event.
+
+        Args:
+            events_dir (str): Directory holding one file per run
+            run_id (str): Run id (default: new_run_id())
+        """
+        self.events_dir = events_dir
+        self.run_id = run_id or new_run_id()
+        self.path = os.path.join(events_dir, f"{self.run_id}.jsonl")
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._stream = None
+
+    def _open(self):
+        os.makedirs(self.events_dir, exist_ok=True)
+        self._stream = open(self.path, "a", encoding="utf-8")
+        self._prune()
+
+    def _prune(self):
+        """Delete the oldest run files beyond EVENTS_KEEP_RUNS."""
+        runs = sorted(glob.glob(os.path.join(self.events_dir, "*.jsonl")))
+        for path in runs[:max(0, len(runs) - EVENTS_KEEP_RUNS)]:
+            if path != self.path:
+                os.remove(path)
+
+    def emit(self, event, **fields):
+        """
+        Record one event.
+
+        Args:
+            event (str): Event name
+            **fields: JSON-serializable event fields
+
+        Returns:
+            float: The event's monotonic timestamp ("t")
+        """
+        now = time.monotonic() - self._start
+        record = {"run": self.run_id, "event": event, "t": round(now, 6), "wall": round(time.time(), 3)}
+        record.update(fields)
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        try:
+            with self._lock:
+                if self._stream is None:
+                    self._open()
+                self._stream.write(line)
+        except Exception as e:
+            logger.warning(f"Failed to record event '{event}': {e}")
+        return now
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """
+        Record the start and end of a stage, with its duration.
+
+        Args:
+            name (str): Stage name; events are "<name>.start" and "<name>.end"
+            **fields: Fields for the start record
+
+        Yields:
+            dict: Fields to add to the end record
+        """
+        info = {}
+        start = self.emit(f"{name}.start", **fields)
+        status = "ok"
+        try:
+            yield info
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            duration = time.monotonic() - self._start - start
+            self.emit(f"{name}.end", status=status, duration_s=round(duration, 6), **info)
+            self.flush()
+            _metrics.record(name, duration)
+
+    def flush(self):
+        """Write buffered events to disk."""
+        with self._lock:
+            if self._stream is not None:
+                self._stream.flush()
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list (None if empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _round(value):
+    return None if value is None else round(value, 6)
+
+
+class TimerStats:
+    """
+    Totals for one timer, plus its most recent durations for percentiles.
+    """
+
+    def __init__(self, samples=METRICS_SAMPLES):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=samples)
+
+    def add(self, duration):
+        self.calls += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.samples.append(duration)
+
+    def to_dict(self):
+        ordered = sorted(self.samples)
+        return {
+            "calls": self.calls,
+            "total_s": round(self.total, 6),
+            "mean_s": round(self.total / self.calls, 6) if self.calls else None,
+            "p50_s": _round(percentile(ordered, 0.50)),
+            "p95_s": _round(percentile(ordered, 0.95)),
+            "max_s": round(self.max, 6),
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide timers and counters, kept in memory.
+    """
+
+    def __init__(self, samples=METRICS_SAMPLES):
+        """
+        Initialize an empty registry.
+
+        Args:
+            samples (int): Most recent durations kept per timer for percentiles
+        """
+        self._samples = samples
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._counters = {}
+        self.started = time.time()
+        self.version = 0  # Changes on every update, so viewers can skip redraws
+
+    def record(self, name, duration):
+        """Add one duration (seconds) to timer name."""
+        with self._lock:
+            stats = self._timers.get(name)
+            if stats is None:
+                stats = self._timers[name] = TimerStats(self._samples)
+            stats.add(duration)
+            self.version += 1
+
+    def count(self, name, n=1):
+        """Add n to counter name."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+            self.version += 1
+
+    @contextmanager
+    def timer(self, name):
+        """Time the body of a with block into timer name (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """
+        Current figures.
+
+        Returns:
+            dict: "since" (epoch seconds), "timers" {name: {"calls", "total_s",
+                  "mean_s", "p50_s", "p95_s", "max_s"}} and "counters" {name: n},
+                  names in sorted order
+        """
+        with self._lock:
+            timers = {name: self._timers[name].to_dict() for name in sorted(self._timers)}
+            counters = dict(sorted(self._counters.items()))
+            since = self.started
+        return {"since": since, "timers": timers, "counters": counters}
+
+    def reset(self):
+        """Forget all timers and counters."""
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self.started = time.time()
+            self.version += 1
+
+    def export(self, path):
+        """
+        Write snapshot() as JSON.
+
+        Args:
+            path (str): Output file path
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temp_path, path)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics():
+    """The process-wide MetricsRegistry."""
+    return _metrics
+
+
+def timer(name):
+    """Time a with block into the process-wide registry (see MetricsRegistry.timer)."""
+    return _metrics.timer(name)
+
+
+def count(name, n=1):
+    """Add to a counter in the process-wide registry."""
+    _metrics.count(name, n)
+
+
+_event_log = None
+_event_log_lock = threading.Lock()
+
+
+def configure_event_log(events_dir):
+    """
+    Send this run's events to events_dir instead of EVENTS_DIR, e.g. a
+    temporary directory for benchmarks. Events already recorded stay in the
+    previous file.
+
+    Args:
+        events_dir (str): Directory holding one file per run
+
+    Returns:
+        EventLog: The new shared event log
+    """
+    global _event_log
+    with _event_log_lock:
+        if _event_log is not None:
+            _event_log.close()
+        _event_log = EventLog(events_dir)
+        atexit.register(_event_log.close)
+        return _event_log
+
+
+def get_event_log():
+    """
+    Get the application-wide EventLog for this run, creating it on first use.
+
+    Returns:
+        EventLog: The shared event log
+    """
+    global _event_log
+    with _event_log_lock:
+        if _event_log is None:
+            _event_log = EventLog()
+            atexit.register(_event_log.close)
+        return _event_log
+
+
+def emit(event, **fields):
+    """Record one event in this run's event log (see EventLog.emit)."""
+    return get_event_log().emit(event, **fields)
+
+
+def stage(name, **fields):
+    """Record a stage in this run's event log (see EventLog.stage)."""
+    return get_event_log().stage(name, **fields)
+
+
+def read_events(path):
+    """
+    Read a run's events.
+
+    Args:
+        path (str): Run file path
+
+    Returns:
+        list: Event records in order
+    """
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue  # Partially written last line
+    return events
+
+
+def list_runs(events_dir=EVENTS_DIR):
+    """
+    List recorded runs, newest first.
+
+    Returns:
+        list: Run file paths
+    """
+    return sorted(glob.glob(os.path.join(events_dir, "*.jsonl")), reverse=True)
+
+
+def summarize_run(path):
+    """
+    Per-stage totals for one run.
+
+    Item events (e.g. "search.match") are counted against their stage
+    ("search"), giving a throughput in items per second of stage time.
+
+    Args:
+        path (str): Run file path
+
+    Returns:
+        dict: stage -> {"runs": n, "errors": n, "total_s": s, "items": n,
+              "items_per_s": rate}
+    """
+    stages = {}
+    for record in read_events(path):
+        name, _, kind = record.get("event", "").partition(".")
+        summary = stages.setdefault(name, {"runs": 0, "errors": 0, "total_s": 0.0, "items": 0})
+        if kind == "end":
+            summary["runs"] += 1
+            summary["total_s"] += record.get("duration_s", 0.0)
+            if record.get("status") == "error":
+                summary["errors"] += 1
+        elif kind != "start":
+            summary["items"] += 1
+
+    for summary in stages.values():
+        summary["total_s"] = round(summary["total_s"], 6)
+        summary["items_per_s"] = round(summary["items"] / summary["total_s"], 3) if summary["total_s"] else None
+    return stages
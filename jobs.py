@@ -0,0 +1,302 @@
+"""
+Background Job Runner for Manage Digital Ingest
+
+Long operations (fuzzy search, the automatic search-and-link workflow,
+derivative creation, CSV updates, metadata merges) run as jobs instead of
+inside the Flet click handler that starts them:
+
+    runner = jobs.get_runner(self.page)
+    runner.submit("Create derivatives", self.run_create_derivatives)
+
+    def run_create_derivatives(self, job):
+        for index, path in enumerate(paths):
+            if job.cancelled:
+                break
+            ...
+            job.report((index + 1) / len(paths), f"{index + 1}/{len(paths)} files")
+
+Handlers that must not run twice at once (a double-click on "Apply All
+Updates", two searches writing the same session keys) use submit_once()
+with a key; it returns None while a job with that key is queued or running:
+
+    if runner.submit_once("update_csv", "Apply CSV updates", self.run_all_updates) is None:
+        self.show_snack("CSV updates are already running", is_error=True)
+
+A job function receives its Job as the first argument. It reports progress
+with job.report() and checks job.cancelled (or calls job.check_cancelled(),
+which raises JobCancelled) between items; cancellation is cooperative.
+
+JobRunner starts at most max_concurrency jobs at once and queues the rest.
+Jobs run in threads started by the runner's spawn function, page.run_thread
+for the page's runner. Listeners registered with subscribe() are called
+with the Job whenever it starts, reports progress or finishes; the log
+overlay's jobs panel uses this. Job starts and ends are also recorded in the
+event log.
+"""
+
+import itertools
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+
+import instrumentation
+import settings_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 2
+
+# Finished jobs kept for the jobs panel
+KEEP_FINISHED = 20
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised by Job.check_cancelled() once the job has been cancelled."""
+
+
+class Job:
+    """
+    One background operation: its state, progress and cancellation flag.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name, func, args, kwargs, notify, key=None):
+        self.id = next(Job._ids)
+        self.name = name
+        self.key = key  # Set by submit_once(); at most one active job per key
+        self.status = QUEUED
+        self.progress = None  # 0.0 - 1.0, or None if unknown
+        self.message = ""
+        self.error = None
+        self.result = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._notify = notify
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        """True once cancel() has been called."""
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Ask the job to stop; a queued job will not start."""
+        if self.status not in FINISHED_STATES:
+            self._cancel.set()
+            logger.info(f"Cancellation requested for job {self.id} ({self.name})")
+            self._notify(self)
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job has been cancelled."""
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.id} ({self.name}) was cancelled")
+
+    def report(self, progress=None, message=None):
+        """
+        Update the job's progress and notify listeners.
+
+        Args:
+            progress (float): Fraction done, 0.0 - 1.0
+            message (str): Short status text
+        """
+        if progress is not None:
+            self.progress = max(0.0, min(1.0, progress))
+        if message is not None:
+            self.message = message
+        self._notify(self)
+
+    @property
+    def elapsed(self):
+        """Seconds the job has been running (or ran)."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def _run(self):
+        if self._cancel.is_set():
+            self.status = CANCELLED
+            self.finished = time.time()
+            self._notify(self)
+            return
+        self.status = RUNNING
+        self.started = time.time()
+        self._notify(self)
+        instrumentation.emit("job.start", job=self.id, name=self.name)
+        try:
+            self.result = self._func(self, *self._args, **self._kwargs)
+            self.status = CANCELLED if self._cancel.is_set() else DONE
+        except JobCancelled:
+            self.status = CANCELLED
+        except Exception as e:
+            self.status = FAILED
+            self.error = str(e)
+            logger.error(f"Job {self.id} ({self.name}) failed: {e}")
+        finally:
+            self.finished = time.time()
+            instrumentation.emit("job.end", job=self.id, name=self.name, status=self.status,
+                                 duration_s=round(self.elapsed, 6))
+            self._notify(self)
+
+
+class JobRunner:
+    """
+    Runs jobs in background threads, at most max_concurrency at a time.
+    """
+
+    def __init__(self, spawn=None, max_concurrency=None):
+        """
+        Initialize the runner.
+
+        Args:
+            spawn (callable): Starts a thread: spawn(func). Default: a daemon threading.Thread
+            max_concurrency (int or callable): Jobs allowed to run at once, or a
+                function returning it (read each time a job could start).
+                Default: the max_concurrent_jobs setting
+        """
+        self._spawn = spawn or (lambda func: threading.Thread(target=func, daemon=True).start())
+        self._max_concurrency = max_concurrency
+        self._lock = threading.RLock()
+        self._queue = deque()
+        self._running = []
+        self._finished = deque(maxlen=KEEP_FINISHED)
+        self._listeners = []
+
+    @property
+    def max_concurrency(self):
+        value = self._max_concurrency
+        if value is None:
+            value = settings_store.get_settings().get("max_concurrent_jobs", DEFAULT_MAX_CONCURRENCY)
+        elif callable(value):
+            value = value()
+        return max(1, int(value))
+
+    def submit(self, name, func, *args, **kwargs):
+        """
+        Queue func to run as a job.
+
+        Args:
+            name (str): Name shown in the jobs panel
+            func (callable): Called as func(job, *args, **kwargs)
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job(name, func, args, kwargs, self._notify)
+        with self._lock:
+            self._queue.append(job)
+        return self._queued(job)
+
+    def submit_once(self, key, name, func, *args, **kwargs):
+        """
+        Queue func to run as a job, unless a job with the same key is still
+        queued or running.
+
+        Args:
+            key (str): Identifies the operation, e.g. "update_csv"
+            name (str): Name shown in the jobs panel
+            func (callable): Called as func(job, *args, **kwargs)
+
+        Returns:
+            Job: The queued job, or None if one with this key is already active
+        """
+        with self._lock:
+            if any(active.key == key for active in self._running + list(self._queue)):
+                logger.info(f"Not starting '{name}': a '{key}' job is already active")
+                return None
+            job = Job(name, func, args, kwargs, self._notify, key=key)
+            self._queue.append(job)
+        return self._queued(job)
+
+    def _queued(self, job):
+        logger.info(f"Queued job {job.id} ({job.name})")
+        self._notify(job)
+        self._start_next()
+        return job
+
+    def _start_next(self):
+        with self._lock:
+            while self._queue and len(self._running) < self.max_concurrency:
+                job = self._queue.popleft()
+                self._running.append(job)
+                self._spawn(lambda job=job: self._execute(job))
+
+    def _execute(self, job):
+        try:
+            job._run()
+        finally:
+            with self._lock:
+                if job in self._running:
+                    self._running.remove(job)
+                self._finished.appendleft(job)
+            self._start_next()
+
+    def jobs(self):
+        """All known jobs: running, then queued, then recently finished (newest first)."""
+        with self._lock:
+            return list(self._running) + list(self._queue) + list(self._finished)
+
+    def active(self):
+        """Running and queued jobs."""
+        with self._lock:
+            return list(self._running) + list(self._queue)
+
+    def cancel_all(self):
+        """Cancel every running and queued job."""
+        for job in self.active():
+            job.cancel()
+
+    def subscribe(self, listener):
+        """Call listener(job) on every job change (from the job's thread)."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, job):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                logger.warning(f"Job listener failed: {e}")
+
+
+# One JobRunner per page. Kept here rather than in page.session, which
+# session_store.preserve() would save (as a string) with the user's data.
+_runners = weakref.WeakKeyDictionary()
+_runners_lock = threading.Lock()
+
+
+def get_runner(page):
+    """
+    Get the page's JobRunner, creating it on first use.
+
+    Args:
+        page (ft.Page): The Flet page
+
+    Returns:
+        JobRunner: Runner whose jobs start with page.run_thread
+    """
+    with _runners_lock:
+        runner = _runners.get(page)
+        if runner is None:
+            runner = _runners[page] = JobRunner(spawn=page.run_thread)
+        return runner
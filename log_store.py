@@ -0,0 +1,465 @@
+"""
+Rotating, Indexed Log Storage for Manage Digital Ingest
+
+This module contains IndexedRotatingFileHandler, the handler app.py uses for
+mdi.log, and the readers the log view uses to browse old logs.
+
+mdi.log is rotated when it exceeds LOG_MAX_BYTES or when it is older than
+LOG_MAX_AGE. Rotated segments are gzipped into LOG_ARCHIVE_DIR as
+mdi.log.<start time>.gz; only the newest LOG_BACKUP_COUNT are kept.
+
+Every segment has a sidecar index (<segment>.idx, JSON Lines) of uncompressed
+byte offsets:
+- {"o": offset, "t": time, "l": "WARNING"} for each WARNING or worse record
+- {"o": offset, "t": time} checkpoints every INDEX_CHECKPOINT_BYTES
+- {"o": offset, "t": time, "run": start} where each application run starts
+
+The index lets the viewer find "errors in the last run" or the start of a time
+range by reading a few lines at known offsets instead of scanning every log.
+Offsets into .gz segments are still reached by decompressing up to them, but
+no lines before them are parsed.
+"""
+
+import glob
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import shutil
+import time
+from datetime import datetime
+
+from logger import LOG_FILE
+
+logger = logging.getLogger(__name__)
+
+LOG_ARCHIVE_DIR = "logs"
+
+# Rotate when the active log reaches this size...
+LOG_MAX_BYTES = 10 * 1024 * 1024
+
+# ...or when its first record is older than this many seconds
+LOG_MAX_AGE = 24 * 60 * 60
+
+# Number of rotated segments to keep
+LOG_BACKUP_COUNT = 30
+
+# Bytes between time checkpoints in the index
+INDEX_CHECKPOINT_BYTES = 64 * 1024
+
+INDEX_SUFFIX = ".idx"
+
+# Matches the "%(asctime)s" prefix app.py writes (milliseconds after the comma)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+# Rotated segment names embed their start time, so they sort oldest to newest
+SEGMENT_TIME_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+
+def index_path(segment_path):
+    """Sidecar index path for a log segment (mdi.log.idx, mdi.log.<time>.idx)."""
+    if segment_path.endswith(".gz"):
+        segment_path = segment_path[:-3]
+    return segment_path + INDEX_SUFFIX
+
+
+def line_level(line):
+    """
+    Get the level of a log line from its "[LEVEL]" field.
+
+    Returns:
+        int: The logging level, or 0 if the line has none
+    """
+    name = line[24:].split("]", 1)[0].strip(" [")
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else 0
+
+
+def parse_timestamp(line):
+    """
+    Get the time a log line was written from its asctime prefix.
+
+    Returns:
+        float: Epoch seconds, or None if the line has no timestamp (e.g. a
+               traceback continuation line)
+    """
+    try:
+        return datetime.strptime(line[:23], TIMESTAMP_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+class IndexedRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """
+    FileHandler with size- and age-based rotation, gzip of rotated segments
+    and a sidecar index of record offsets.
+    """
+
+    def __init__(self, filename=LOG_FILE, archive_dir=LOG_ARCHIVE_DIR, max_bytes=LOG_MAX_BYTES,
+                 max_age=LOG_MAX_AGE, backup_count=LOG_BACKUP_COUNT, encoding="utf-8"):
+        """
+        Initialize the handler and mark the start of this run in the index.
+
+        Args:
+            filename (str): Active log file
+            archive_dir (str): Directory for rotated, gzipped segments
+            max_bytes (int): Size that triggers rotation (0 disables)
+            max_age (float): Age in seconds that triggers rotation (0 disables)
+            backup_count (int): Number of rotated segments to keep
+            encoding (str): Log file encoding
+        """
+        super().__init__(filename, mode="a", encoding=encoding, delay=False)
+        self.archive_dir = archive_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.run_start = time.time()
+        self._run_marked = False
+        self._index_stream = None
+        self._last_checkpoint = 0
+        self._segment_start = self._read_segment_start()
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _read_segment_start(self):
+        """Time of the active segment's first record, from its index or mtime."""
+        path = index_path(self.baseFilename)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                first = f.readline()
+            if first:
+                return json.loads(first)["t"]
+        except (OSError, ValueError, KeyError):
+            pass
+        try:
+            if os.path.getsize(self.baseFilename) > 0:
+                return os.path.getmtime(self.baseFilename)
+        except OSError:
+            pass
+        return None
+
+    def _write_index(self, entry):
+        if self._index_stream is None:
+            self._index_stream = open(index_path(self.baseFilename), "a", encoding="utf-8")
+        self._index_stream.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._index_stream.flush()
+
+    def _index_record(self, record, offset):
+        """Add index entries for the record just written at offset."""
+        if self._segment_start is None:
+            self._segment_start = record.created
+
+        entry = None
+        if not self._run_marked:
+            entry = {"o": offset, "t": record.created, "run": self.run_start}
+            self._run_marked = True
+        if record.levelno >= logging.WARNING:
+            entry = dict(entry or {"o": offset, "t": record.created}, l=record.levelname)
+        if entry is None and offset - self._last_checkpoint >= INDEX_CHECKPOINT_BYTES:
+            entry = {"o": offset, "t": record.created}
+        if entry is not None:
+            self._write_index(entry)
+            self._last_checkpoint = offset
+
+    # ------------------------------------------------------------------
+    # Rotation
+    # ------------------------------------------------------------------
+
+    def shouldRollover(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        if self.max_bytes > 0 and self.stream.tell() >= self.max_bytes:
+            return True
+        if self.max_age > 0 and self._segment_start is not None:
+            return record.created - self._segment_start >= self.max_age
+        return False
+
+    def doRollover(self):
+        """Gzip the active log and its index into the archive, then start a new segment."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if self._index_stream:
+            self._index_stream.close()
+            self._index_stream = None
+
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            stamp = datetime.fromtimestamp(self._segment_start or time.time()).strftime(SEGMENT_TIME_FORMAT)
+            name = os.path.join(self.archive_dir, f"{os.path.basename(self.baseFilename)}.{stamp}")
+            suffix = 1
+            while os.path.exists(name + ".gz"):
+                suffix += 1
+                name = os.path.join(self.archive_dir, f"{os.path.basename(self.baseFilename)}.{stamp}-{suffix}")
+
+            with open(self.baseFilename, "rb") as src, gzip.open(name + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self.baseFilename)
+            if os.path.exists(index_path(self.baseFilename)):
+                os.replace(index_path(self.baseFilename), name + INDEX_SUFFIX)
+            self._prune_archive()
+
+        self._segment_start = None
+        self._last_checkpoint = 0
+        # The rest of this run continues in the new segment
+        self._run_marked = False
+        self.stream = self._open()
+
+    def _prune_archive(self):
+        """Delete the oldest rotated segments beyond backup_count."""
+        segments = sorted(glob.glob(os.path.join(self.archive_dir, os.path.basename(self.baseFilename) + ".*.gz")))
+        for path in segments[:max(0, len(segments) - self.backup_count)]:
+            for stale in (path, index_path(path)):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+    def emit(self, record):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            offset = self.stream.tell()
+            logging.FileHandler.emit(self, record)
+            self._index_record(record, offset)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            if self._index_stream:
+                self._index_stream.close()
+                self._index_stream = None
+        finally:
+            self.release()
+        super().close()
+
+
+class LogSegment:
+    """
+    One log segment (the active mdi.log or a rotated .gz) and its index.
+
+    Nothing is read until it is asked for; the index is cached after the
+    first read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = index_path(path)
+        self.compressed = path.endswith(".gz")
+        self._index = None
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    @property
+    def size(self):
+        """Size on disk in bytes (compressed size for .gz segments)."""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def read_index(self):
+        """
+        Read the sidecar index.
+
+        Returns:
+            list: Index entries in file order (empty if there is no index)
+        """
+        if self._index is None or not self.compressed:
+            entries = []
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            continue  # Partially written last entry
+            except OSError:
+                pass
+            self._index = entries
+        return self._index
+
+    @property
+    def start_time(self):
+        """Time of the first indexed record, or the file's mtime."""
+        index = self.read_index()
+        if index:
+            return index[0]["t"]
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def open(self):
+        """Open the segment for binary reading (decompressing .gz segments)."""
+        if self.compressed:
+            return gzip.open(self.path, "rb")
+        return open(self.path, "rb")
+
+    def read_lines(self, offset=0, max_lines=200):
+        """
+        Read lines starting at a byte offset.
+
+        Args:
+            offset (int): Uncompressed byte offset of the first line
+            max_lines (int): Maximum number of lines to read
+
+        Returns:
+            tuple: (list of lines, offset after the last line read, or None at
+                   end of segment)
+        """
+        lines = []
+        with self.open() as f:
+            f.seek(offset)
+            for _ in range(max_lines):
+                line = f.readline()
+                if not line:
+                    return lines, None
+                lines.append(line.decode("utf-8", errors="replace"))
+            next_offset = f.tell()
+            return lines, (next_offset if f.readline() else None)
+
+    def read_records_at(self, offsets):
+        """
+        Read the record starting at each offset, with any continuation lines
+        (e.g. a traceback).
+
+        Args:
+            offsets (list): Ascending uncompressed byte offsets
+
+        Returns:
+            list: One string per offset
+        """
+        records = []
+        with self.open() as f:
+            for offset in offsets:
+                f.seek(offset)
+                record = f.readline().decode("utf-8", errors="replace")
+                while True:
+                    position = f.tell()
+                    line = f.readline()
+                    if not line:
+                        break
+                    text = line.decode("utf-8", errors="replace")
+                    if parse_timestamp(text) is not None:
+                        f.seek(position)
+                        break
+                    record += text
+                records.append(record)
+        return records
+
+    def offset_for_time(self, when):
+        """
+        Offset of the last index entry at or before a time (0 if none).
+
+        Reading forward from here reaches every record written at or after when.
+        """
+        offset = 0
+        for entry in self.read_index():
+            if entry["t"] > when:
+                break
+            offset = entry["o"]
+        return offset
+
+
+def list_segments(log_file=LOG_FILE, archive_dir=LOG_ARCHIVE_DIR):
+    """
+    List log segments, newest first: the active log, then rotated segments.
+
+    Returns:
+        list: LogSegment objects
+    """
+    segments = []
+    if os.path.exists(log_file):
+        segments.append(LogSegment(log_file))
+    rotated = sorted(glob.glob(os.path.join(archive_dir, os.path.basename(log_file) + ".*.gz")), reverse=True)
+    segments.extend(LogSegment(path) for path in rotated)
+    return segments
+
+
+def last_run_records(min_level=logging.ERROR, segments=None):
+    """
+    Get the records at or above a level written since the most recent run started.
+
+    Only index entries are consulted to find the records; each is then read
+    at its offset.
+
+    Args:
+        min_level (int): Minimum logging level
+        segments (list): Segments to search (default: list_segments())
+
+    Returns:
+        list: Record strings, oldest first
+    """
+    segments = list_segments() if segments is None else segments
+    found = []
+    run = None
+    for segment in segments:  # Newest first
+        index = segment.read_index()
+        if run is None:
+            runs = [entry["run"] for entry in index if "run" in entry]
+            if not runs:
+                continue
+            run = runs[-1]
+        # A run that outlived a rotation is marked again at the top of each new segment
+        run_offsets = [entry["o"] for entry in index if entry.get("run") == run]
+        if not run_offsets:
+            break
+        start = run_offsets[0]
+        offsets = [entry["o"] for entry in index
+                   if entry["o"] >= start and logging.getLevelName(entry.get("l", "NOTSET")) >= min_level]
+        found[:0] = segment.read_records_at(offsets)
+        if start > 0:
+            break
+    return found
+
+
+def records_between(start, end, min_level=logging.NOTSET, max_lines=1000, segments=None):
+    """
+    Get the lines written between two times, oldest first.
+
+    Segments that end before start or begin after end are skipped; inside a
+    segment, reading starts at the nearest index entry before start.
+
+    Args:
+        start (float): Range start, epoch seconds
+        end (float): Range end, epoch seconds
+        min_level (int): Minimum logging level of the lines to return
+        max_lines (int): Stop after this many lines
+        segments (list): Segments to search (default: list_segments())
+
+    Returns:
+        list: Matching lines
+    """
+    segments = list_segments() if segments is None else segments
+    start = int(start * 1000) / 1000  # Log lines carry milliseconds only
+    chosen = []
+    next_start = None  # Start time of the next newer segment
+    for segment in segments:
+        segment_start = segment.start_time
+        if segment_start is not None and segment_start <= end and (next_start is None or next_start >= start):
+            chosen.append(segment)
+        next_start = segment_start
+
+    results = []
+    for segment in reversed(chosen):  # Oldest first
+        with segment.open() as f:
+            f.seek(segment.offset_for_time(start))
+            keep = False
+            for raw in f:
+                line = raw.decode("utf-8", errors="replace")
+                when = parse_timestamp(line)
+                if when is not None:
+                    if when > end:
+                        break
+                    keep = when >= start and line_level(line) >= min_level
+                # Continuation lines (tracebacks) follow their record
+                if keep:
+                    results.append(line)
+                    if len(results) >= max_lines:
+                        return results
+    return results
@@ -1,6 +1,131 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
 import flet as ft
 
+# Application log file, written by the FileHandler set up in app.py
+LOG_FILE = "mdi.log"
+
+# Bytes read per step when scanning the log backwards for its last lines
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# If more than this was appended between polls, LogFollower re-reads only the tail
+FOLLOW_MAX_BYTES = 1024 * 1024
+
+# Minimum seconds between SnackBars; warnings arriving faster are combined
+SNACKBAR_MIN_INTERVAL = 1.0
+
+# QueueListeners started by start_queue_logging() and not yet stopped
+_running_listeners = set()
+_listeners_lock = threading.Lock()
+
+
+def _decode_lines(data):
+    return [line.decode("utf-8", errors="replace") for line in data.splitlines(keepends=True)]
+
+
+def tail_lines(path=LOG_FILE, max_lines=100, block_size=TAIL_BLOCK_SIZE):
+    """
+    Read the last complete lines of a file without reading the whole file.
+
+    Blocks are read backwards from the end until enough newlines are found, so
+    the cost depends on max_lines and line length, not on the file size. A
+    trailing line that has no newline yet (still being written) is left out.
+
+    Args:
+        path (str): File to read
+        max_lines (int): Maximum number of lines to return
+        block_size (int): Bytes read per step
+
+    Returns:
+        tuple: (list of lines, byte offset just past the last returned line)
+    """
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        data = b""
+        # One newline more than max_lines marks where the first wanted line starts
+        while pos > 0 and data.count(b"\n") <= max_lines:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+
+    complete = data.rfind(b"\n") + 1
+    offset = pos + complete
+    lines = _decode_lines(data[:complete])
+    if pos > 0 and lines:
+        lines = lines[1:]  # Probably starts mid-line
+    return lines[-max_lines:] if max_lines else [], offset
+
+
+class LogFollower:
+    """
+    Keeps the last lines of a log file, reading only what was appended.
+
+    The first poll() reads the tail with tail_lines(); later polls read from
+    the last seen offset to the end of the file. If the file was replaced or
+    truncated (e.g. rotated), or a very large amount was appended, the tail is
+    read again.
+    """
+
+    def __init__(self, path=LOG_FILE, max_lines=100):
+        """
+        Initialize the follower. Nothing is read until the first poll().
+
+        Args:
+            path (str): Log file to follow
+            max_lines (int): Number of recent lines to keep
+        """
+        self.path = path
+        self.max_lines = max_lines
+        self.lines = deque(maxlen=max_lines)
+        self._offset = None
+        self._file_id = None
+
+    def poll(self):
+        """
+        Read lines appended since the last poll.
+
+        Returns:
+            list: The new complete lines (also added to self.lines)
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.lines.clear()
+            self._offset = None
+            return []
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if (self._offset is None or file_id != self._file_id or stat.st_size < self._offset
+                or stat.st_size - self._offset > FOLLOW_MAX_BYTES):
+            new_lines, self._offset = tail_lines(self.path, self.max_lines)
+            self._file_id = file_id
+            self.lines.clear()
+            self.lines.extend(new_lines)
+            return new_lines
+
+        if stat.st_size == self._offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(stat.st_size - self._offset)
+        complete = data.rfind(b"\n") + 1
+        if complete == 0:
+            return []  # Only a partial line so far
+        self._offset += complete
+        new_lines = _decode_lines(data[:complete])
+        self.lines.extend(new_lines)
+        return new_lines
+
 
 class SnackBarHandler(logging.Handler):
     """A logging.Handler that posts log messages to a Flet SnackBar.
@@ -9,11 +134,20 @@ class SnackBarHandler(logging.Handler):
     application sets a page in the handler via handler.set_page(page)).
     To keep usage simple, the handler will also look for `record.page` and
     fall back to a stored page reference.
+
+    At most one SnackBar is shown per min_interval seconds. Warnings and
+    errors that arrive in between are combined into a single SnackBar such as
+    "37 warnings in the last second", shown when the interval is up.
     """
 
-    def __init__(self, level=logging.NOTSET):
+    def __init__(self, level=logging.NOTSET, min_interval=SNACKBAR_MIN_INTERVAL):
         super().__init__(level)
         self._page = None
+        self.min_interval = min_interval
+        self._last_shown = float("-inf")
+        self._pending = []  # (levelno, message) not yet shown
+        self._timer = None
+        self._pending_lock = threading.Lock()
 
     @property
     def page(self):
@@ -30,29 +164,122 @@ class SnackBarHandler(logging.Handler):
         self._page = page
 
     def emit(self, record: logging.LogRecord) -> None:
+        # Only show warnings and errors in snackbar
+        if record.levelno < logging.WARNING:
+            return
         try:
-            msg = self.format(record)
             page = getattr(record, 'page', None) or self._page
             
             if page is None:
                 # No page available; nothing we can do
                 return
 
+            msg = self.format(record)
+            with self._pending_lock:
+                self._pending.append((record.levelno, msg))
+                if self._timer is not None:
+                    return  # Already waiting to show the pending messages
+                delay = self._last_shown + self.min_interval - time.monotonic()
+                if delay > 0:
+                    self._timer = threading.Timer(delay, self._show_pending, args=(page,))
+                    self._timer.daemon = True
+                    self._timer.start()
+                    return
+            self._show_pending(page)
+        except Exception:
+            self.handleError(record)
+
+    def _summary(self, pending):
+        """SnackBar text for one or more pending messages."""
+        if len(pending) == 1:
+            return pending[0][1]
+        errors = sum(1 for levelno, _ in pending if levelno >= logging.ERROR)
+        warnings = len(pending) - errors
+        counts = []
+        if errors:
+            counts.append(f"{errors} error{'s' if errors != 1 else ''}")
+        if warnings:
+            counts.append(f"{warnings} warning{'s' if warnings != 1 else ''}")
+        window = "second" if self.min_interval == 1 else f"{self.min_interval:g} seconds"
+        return f"{' and '.join(counts)} in the last {window}. Latest: {pending[-1][1]}"
+
+    def _show_pending(self, page):
+        """Show everything pending as one SnackBar."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            self._timer = None
+            self._last_shown = time.monotonic()
+        if not pending:
+            return
+        try:
+            msg = self._summary(pending)
+
             # Ensure a snack_bar exists on the page
             if not hasattr(page, 'snack_bar') or page.snack_bar is None:
                 page.snack_bar = ft.SnackBar(content=ft.Text(msg))
 
-            # Only show warnings and errors in snackbar
-            if record.levelno >= logging.WARNING:
-                # Color by level
-                if record.levelno >= logging.ERROR:
-                    bgcolor = ft.Colors.RED_600
-                else:
-                    bgcolor = ft.Colors.ORANGE_400
-                
-                page.snack_bar.content.value = msg
-                page.snack_bar.bgcolor = bgcolor
-                page.open(page.snack_bar)
-                page.update()
-        except Exception:
-            self.handleError(record)
+            # Color by level
+            if max(levelno for levelno, _ in pending) >= logging.ERROR:
+                bgcolor = ft.Colors.RED_600
+            else:
+                bgcolor = ft.Colors.ORANGE_400
+
+            page.snack_bar.content.value = msg
+            page.snack_bar.bgcolor = bgcolor
+            page.open(page.snack_bar)
+            page.update()
+        except Exception as e:
+            sys.stderr.write(f"SnackBarHandler failed to show message: {e}\n")
+
+    def close(self):
+        with self._pending_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending = []
+        super().close()
+
+
+def start_queue_logging(logger, handlers):
+    """
+    Move logging I/O off the calling threads.
+
+    The given handlers are detached from logger and served by a
+    QueueListener thread; logger gets a single QueueHandler in their place, so
+    a logging call only formats its message and enqueues the record. Records
+    still queued at exit are written before the interpreter stops; to stop
+    earlier, call stop_queue_logging().
+
+    Args:
+        logger (logging.Logger): Logger whose handlers to replace (usually the root)
+        handlers (list): Handlers to run on the listener thread
+
+    Returns:
+        logging.handlers.QueueListener: The running listener
+    """
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        logger.removeHandler(handler)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    with _listeners_lock:
+        _running_listeners.add(listener)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    atexit.register(stop_queue_logging, listener)
+    return listener
+
+
+def stop_queue_logging(listener):
+    """
+    Stop a listener from start_queue_logging() after it writes the queued records.
+
+    Safe to call more than once; only the first call stops the listener.
+
+    Args:
+        listener (logging.handlers.QueueListener): The listener to stop
+    """
+    with _listeners_lock:
+        if listener not in _running_listeners:
+            return
+        _running_listeners.discard(listener)
+    listener.stop()
@@ -0,0 +1,227 @@
+"""
+Command-Line Entry Point for Manage Digital Ingest
+
+Runs the ingest stages without the Flet UI, for batch runs on a server with
+no display:
+
+    python -m mdi ingest --csv ingest.csv --search-root /mnt/masters --out storage/temp/batch_01
+    python -m mdi watch --drop /mnt/dropbox
+
+"ingest" reads the CSV, fuzzy-matches its file_name_1 values under the
+search root, builds OBJS/ (links and File-Not-Found placeholders), creates
+the TN/ thumbnails, applies the Update CSV view's Alma updates and writes
+the working CSV and values.csv into the output directory, the same layout
+the app builds in storage/temp. With --dry-run it stops after writing
+objs_plan.json.
+
+Output left in storage/temp (the default for --out and --out-root) is
+subject to the app's temporary directory cleanup (temp_gc.py): it is deleted
+once unused for longer than the Max age setting, or, after the Quota idle
+time, to stay under the Quota.
+Pass a directory outside storage/temp to keep the output.
+
+"watch" runs the same stages for every CSV dropped into a folder, once the
+folder's writes settle (see watcher.py), until interrupted with Ctrl-C.
+
+Every stage is recorded in the structured event log (logs/events/, or
+--events-dir), and the per-stage timings are printed at the end. Messages go
+to mdi.log as in the app, and to the console with --verbose.
+
+Run from the repository root, so the verified headings in _data/ and the
+placeholder assets in assets/ are found.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+
+import instrumentation
+import pipeline
+import temp_gc
+from logger import LOG_FILE
+from log_store import IndexedRotatingFileHandler
+
+logger = logging.getLogger("mdi")
+
+
+def setup_logging(verbose=False):
+    """Log to mdi.log, and to the console (INFO with verbose, otherwise WARNING)."""
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+
+    console = logging.StreamHandler()
+    console.setLevel(logging.INFO if verbose else logging.WARNING)
+    console.setFormatter(formatter)
+    root_logger.addHandler(console)
+
+    file_handler = IndexedRotatingFileHandler(LOG_FILE)
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(formatter)
+    root_logger.addHandler(file_handler)
+
+
+class ProgressPrinter:
+    """One updating line of progress per stage, on stderr."""
+
+    def __init__(self):
+        self._done = set()
+
+    def __call__(self, stage, fraction):
+        if stage in self._done:
+            return
+        sys.stderr.write(f"\r{stage:<12} {fraction:6.1%}")
+        if fraction >= 1.0:
+            sys.stderr.write("\n")
+            self._done.add(stage)
+        sys.stderr.flush()
+
+
+def print_stage_summary():
+    """Print per-stage durations and throughput for this run's event log."""
+    event_log = instrumentation.get_event_log()
+    event_log.flush()
+    try:
+        stages = instrumentation.summarize_run(event_log.path)
+    except FileNotFoundError:
+        return
+    print(f"\n{'stage':<14} {'time':>9} {'items':>7} {'items/s':>9}")
+    for name, summary in stages.items():
+        if not summary["runs"]:
+            continue
+        rate = f"{summary['items_per_s']:,.1f}" if summary["items_per_s"] else "-"
+        print(f"{name:<14} {summary['total_s']:>8.2f}s {summary['items']:>7} {rate:>9}")
+    print(f"Event log: {event_log.path}")
+
+
+def ingest(args):
+    """Run the ingest subcommand. Returns the process exit code."""
+    try:
+        report = pipeline.run_ingest(
+            args.csv, args.search_root, args.out,
+            dry_run=args.dry_run,
+            progress_callback=None if args.quiet else ProgressPrinter(),
+            **pipeline_options(args)
+        )
+    except (ValueError, KeyError, OSError) as e:
+        logger.error(f"Ingest failed: {e}")
+        print(f"Ingest failed: {e}", file=sys.stderr)
+        return 2
+
+    print(f"Temporary directory: {report['temp_dir']}")
+    print(f"Files in CSV: {report['files']} | matched: {report['matched']} | "
+          f"unmatched: {len(report['unmatched'])}")
+    if args.dry_run:
+        print(f"Dry run - OBJS/ plan written to {report['plan_path']}")
+    else:
+        print(f"OBJS/: {report['linked']} links, {report['placeholders']} placeholders")
+        if 'thumbnails' in report:
+            print(f"TN/: {report['thumbnails']} thumbnails, {len(report['thumbnail_errors'])} failed")
+        print(f"CSV: {report['temp_csv']}")
+        print(f"values.csv: {report['values_csv']}")
+    for filename in report["unmatched"]:
+        print(f"  not found: {filename}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+    if not args.quiet:
+        print_stage_summary()
+    failed = report["unmatched"] or report.get("thumbnail_errors")
+    return 1 if failed and args.strict else 0
+
+
+def watch(args):
+    """Run the watch subcommand until interrupted. Returns the process exit code."""
+    import watcher
+
+    def on_result(csv_path, report, error):
+        if error:
+            print(f"FAILED  {csv_path}: {error}")
+        else:
+            print(f"DONE    {csv_path}: {report['matched']} matched, {len(report['unmatched'])} not found "
+                  f"-> {report['temp_dir']}")
+
+    drop_watcher = watcher.DropFolderWatcher(
+        args.drop, args.out_root, on_result=on_result,
+        settle=watcher.SETTLE_SECONDS if args.settle is None else args.settle,
+        ingest_options=pipeline_options(args)
+    )
+    print(f"Watching {drop_watcher.drop_dir} - press Ctrl-C to stop")
+    stop = threading.Event()
+    try:
+        drop_watcher.run(stop)
+    except KeyboardInterrupt:
+        stop.set()
+    return 0
+
+
+def pipeline_options(args):
+    """pipeline.run_ingest keyword arguments from the shared options."""
+    return {
+        "column_name": args.column,
+        "threshold": args.threshold,
+        "mode": args.mode,
+        "derivatives": not args.skip_derivatives,
+        "workers": args.workers,
+        "validate": not args.no_validate,
+    }
+
+
+def add_pipeline_options(parser):
+    """Options shared by ingest and watch."""
+    parser.add_argument("--column", default="file_name_1", help="Column holding the file names")
+    parser.add_argument("--threshold", type=int, default=pipeline.MATCH_THRESHOLD,
+                        help="Minimum fuzzy match ratio (0-100)")
+    parser.add_argument("--mode", default="Alma", help="Ingest mode (headings validation and CSV updates)")
+    parser.add_argument("--workers", type=int, default=pipeline.DERIVATIVE_WORKERS,
+                        help="Threads creating thumbnails")
+    parser.add_argument("--skip-derivatives", action="store_true", help="Do not create TN/ thumbnails")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="Do not check the CSV headings against the verified list")
+    parser.add_argument("--events-dir", default=instrumentation.EVENTS_DIR,
+                        help="Directory for the structured event log (default: logs/events)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log to the console too")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m mdi", description="Manage Digital Ingest without the UI")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subcommands.add_parser("ingest", help="Run every ingest stage for one CSV",
+                                           description=__doc__,
+                                           formatter_class=argparse.RawDescriptionHelpFormatter)
+    ingest_parser.add_argument("--csv", required=True, help="The ingest CSV")
+    ingest_parser.add_argument("--search-root", required=True, help="Directory searched for the CSV's files")
+    ingest_parser.add_argument("--out", help="Temporary ingest directory to build (default: a new one in "
+                                             "storage/temp, where old directories are cleaned up)")
+    add_pipeline_options(ingest_parser)
+    ingest_parser.add_argument("--dry-run", action="store_true", help="Stop after writing the OBJS/ plan")
+    ingest_parser.add_argument("--report", help="Also write the run report as JSON to this file")
+    ingest_parser.add_argument("--strict", action="store_true",
+                               help="Exit with status 1 if any file was not found or a thumbnail failed")
+    ingest_parser.add_argument("-q", "--quiet", action="store_true", help="No progress or stage timings")
+    ingest_parser.set_defaults(func=ingest)
+
+    watch_parser = subcommands.add_parser("watch", help="Ingest each CSV dropped into a folder",
+                                          description=__doc__,
+                                          formatter_class=argparse.RawDescriptionHelpFormatter)
+    watch_parser.add_argument("--drop", required=True, help="The drop folder to watch")
+    watch_parser.add_argument("--out-root", default=temp_gc.TEMP_ROOT,
+                              help="Where each batch's ingest directory is created (default: storage/temp, "
+                                   "where old directories are cleaned up)")
+    watch_parser.add_argument("--settle", type=float,
+                              help="Seconds without changes before a CSV is ingested (default: 10)")
+    add_pipeline_options(watch_parser)
+    watch_parser.set_defaults(func=watch)
+
+    args = parser.parse_args(argv)
+    setup_logging(args.verbose)
+    instrumentation.configure_event_log(args.events_dir)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+"""
+OBJS/ Materialization for Manage Digital Ingest
+
+This module builds the OBJS/ folder of a temporary ingest directory: one
+symbolic link per matched source file, plus File-Not-Found placeholders for
+files the CSV expects but the search did not find. It works in two phases:
+
+1. build_plan() decides everything in memory: sanitized names, collision
+   suffixes and which placeholder asset each missing file gets. OBJS/ is
+   listed once (NameAllocator) and sources are checked once per parent
+   folder (existing_paths()), instead of stat() calls per file and per
+   collision probe. The resulting MaterializationPlan can be exported as JSON
+   for review before anything is written (a dry run).
+2. execute() carries the plan out on a thread pool. Placeholders are
+   reflinks (copy-on-write clones) or hard links to the single asset where
+   the file system allows, and full copies only as a last resort.
+"""
+
+import errno
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Plan entry kinds
+LINK = "symlink"
+PLACEHOLDER = "placeholder"
+
+# Threads used to execute a plan
+MATERIALIZE_WORKERS = 8
+
+# Placeholder asset by (lower-case) extension of the missing file
+PLACEHOLDER_ASSETS = {
+    ".pdf": "File-Not-Found.pdf",
+    ".tif": "File-Not-Found.tif",
+    ".tiff": "File-Not-Found.tif",
+    ".jpg": "File-Not-Found.jpg",
+    ".jpeg": "File-Not-Found.jpg",
+    ".png": "File-Not-Found.png",
+}
+DEFAULT_PLACEHOLDER_ASSET = "File-Not-Found.jpg"
+
+
+def _is_case_insensitive(directory):
+    """
+    Return True if names in directory are compared case-insensitively
+    (e.g. the default macOS and Windows file systems).
+    """
+    name = f".CaseProbe-{uuid.uuid4().hex}"
+    probe = os.path.join(directory, name)
+    try:
+        with open(probe, "w"):
+            pass
+    except OSError:
+        return os.path.normcase("A") == os.path.normcase("a")
+    try:
+        return os.path.exists(os.path.join(directory, name.lower()))
+    finally:
+        os.remove(probe)
+
+
+class NameAllocator:
+    """
+    Allocates unique file names in a directory from an in-memory snapshot.
+
+    Names follow the previous on-disk probing scheme: the name itself if it
+    is free, otherwise "<stem>_1<ext>", "<stem>_2<ext>", ... The snapshot is
+    taken once, so the allocator must be the only writer to the directory
+    while it is in use.
+    """
+
+    def __init__(self, directory):
+        """
+        Snapshot the names already in directory.
+
+        Args:
+            directory (str): Directory the names are allocated in (created if missing)
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._key = str.casefold if _is_case_insensitive(directory) else (lambda name: name)
+        with os.scandir(directory) as entries:
+            self._taken = {self._key(entry.name) for entry in entries}
+        self._next_suffix = {}  # name key -> next counter to try
+
+    def __contains__(self, name):
+        return self._key(name) in self._taken
+
+    def key(self, name):
+        """Comparison key for name: case-folded on case-insensitive file systems."""
+        return self._key(name)
+
+    def reserve(self, filename):
+        """Mark filename as taken without allocating a suffix."""
+        self._taken.add(self._key(filename))
+
+    def allocate(self, filename):
+        """
+        Reserve a free name for filename.
+
+        Args:
+            filename (str): The wanted file name (already sanitized)
+
+        Returns:
+            str: filename, or "<stem>_<n><ext>" if filename is taken
+        """
+        key = self._key(filename)
+        if key not in self._taken:
+            self._taken.add(key)
+            return filename
+
+        base_name, ext = os.path.splitext(filename)
+        counter = self._next_suffix.get(key, 1)
+        candidate = f"{base_name}_{counter}{ext}"
+        while self._key(candidate) in self._taken:
+            counter += 1
+            candidate = f"{base_name}_{counter}{ext}"
+        self._next_suffix[key] = counter + 1
+        self._taken.add(self._key(candidate))
+        return candidate
+
+
+def existing_paths(paths):
+    """
+    Return the subset of paths that exist, listing each parent directory once.
+
+    Like os.path.exists, symbolic links count only if their target exists.
+    Paths whose parent cannot be listed are checked individually.
+
+    Args:
+        paths (list): File paths (empty or None entries are ignored)
+
+    Returns:
+        set: The paths, as given, that exist
+    """
+    by_parent = {}
+    for path in paths:
+        if path:
+            parent, name = os.path.split(path)
+            by_parent.setdefault(parent, {}).setdefault(name, []).append(path)
+
+    found = set()
+    for parent, names in by_parent.items():
+        try:
+            with os.scandir(parent or ".") as entries:
+                for entry in entries:
+                    wanted = names.get(entry.name)
+                    if wanted and (not entry.is_symlink() or os.path.exists(entry.path)):
+                        found.update(wanted)
+        except OSError:
+            found.update(path for group in names.values() for path in group if os.path.exists(path))
+    return found
+
+
+def placeholder_asset(filename, assets_dir):
+    """
+    Pick the File-Not-Found asset for a missing file.
+
+    Args:
+        filename (str): The expected file name
+        assets_dir (str): Directory holding the File-Not-Found assets
+
+    Returns:
+        tuple: (asset path, True if the extension was recognized)
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    asset = PLACEHOLDER_ASSETS.get(ext)
+    return os.path.join(assets_dir, asset or DEFAULT_PLACEHOLDER_ASSET), asset is not None
+
+
+class MaterializationPlan:
+    """
+    Everything execute() will create in OBJS/, decided up front.
+
+    Each entry is a dict with:
+    - "kind":     LINK or PLACEHOLDER
+    - "source":   the file linked to (LINK) or the placeholder asset
+    - "dest":     full path in OBJS/
+    - "name":     file name in OBJS/ (sanitized, with any collision suffix)
+    - "sanitized": the sanitized name before any collision suffix (LINK only)
+    - "original": the original path (LINK) or expected file name (PLACEHOLDER)
+    - "replace":  True if dest already exists and is replaced (PLACEHOLDER only)
+    """
+
+    def __init__(self, objs_dir):
+        self.objs_dir = objs_dir
+        self.entries = []
+        self.skipped = []  # {"original": ..., "reason": ...}
+
+    def links(self):
+        return [entry for entry in self.entries if entry["kind"] == LINK]
+
+    def placeholders(self):
+        return [entry for entry in self.entries if entry["kind"] == PLACEHOLDER]
+
+    def summary(self):
+        """Counts for logging: links, placeholders, renamed, skipped."""
+        return {
+            "links": len(self.links()),
+            "placeholders": len(self.placeholders()),
+            "renamed": sum(1 for entry in self.links()
+                           if entry["name"] != entry.get("sanitized", entry["name"])),
+            "skipped": len(self.skipped),
+        }
+
+    def to_dict(self):
+        return {"objs_dir": self.objs_dir, "summary": self.summary(),
+                "entries": self.entries, "skipped": self.skipped}
+
+    def export(self, path):
+        """
+        Write the plan as JSON for review.
+
+        Args:
+            path (str): Output file path
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(temp_path, path)
+
+
+def build_plan(objs_dir, sources=(), placeholder_names=(), sanitize=None, assets_dir="assets"):
+    """
+    Plan OBJS/ links and placeholders without touching the file system
+    (beyond listing OBJS/ and the source folders).
+
+    Args:
+        objs_dir (str): The OBJS/ directory
+        sources (list): Paths of matched files to link, in order
+        placeholder_names (list): Expected file names that need a placeholder
+        sanitize (callable): Maps a file name to its OBJS/ name (default: unchanged)
+        assets_dir (str): Directory holding the File-Not-Found assets
+
+    Returns:
+        MaterializationPlan: The plan
+    """
+    sanitize = sanitize or (lambda name: name)
+    plan = MaterializationPlan(objs_dir)
+    allocator = NameAllocator(objs_dir)
+    existing_sources = existing_paths(sources)
+
+    for original_path in sources:
+        if not original_path or original_path not in existing_sources:
+            plan.skipped.append({"original": original_path, "reason": "source not found"})
+            continue
+        sanitized = sanitize(os.path.basename(original_path))
+        name = allocator.allocate(sanitized)
+        plan.entries.append({
+            "kind": LINK,
+            "source": os.path.abspath(original_path),
+            "dest": os.path.join(objs_dir, name),
+            "name": name,
+            "sanitized": sanitized,
+            "original": original_path,
+        })
+
+    # Placeholders must keep the exact name the CSV expects. A name already
+    # on disk (e.g. from an earlier run) is replaced; one claimed by a link
+    # in this plan is left to the matched file.
+    linked = {allocator.key(entry["name"]) for entry in plan.entries}
+    for filename in placeholder_names:
+        if not filename:
+            continue
+        name = sanitize(filename)
+        if allocator.key(name) in linked:
+            plan.skipped.append({"original": filename, "reason": f"'{name}' is already linked to a matched file"})
+            continue
+        asset, known = placeholder_asset(filename, assets_dir)
+        if not known:
+            logger.warning(f"Unknown extension for '{filename}', using {os.path.basename(asset)} placeholder")
+        plan.entries.append({
+            "kind": PLACEHOLDER,
+            "source": asset,
+            "dest": os.path.join(objs_dir, name),
+            "name": name,
+            "original": filename,
+            "replace": name in allocator,
+        })
+        allocator.reserve(name)
+        linked.add(allocator.key(name))
+    return plan
+
+
+def _reflink(source, dest):
+    """Clone source to dest with copy-on-write (Linux FICLONE); raises OSError if unsupported."""
+    import fcntl  # Not available on Windows
+
+    FICLONE = 0x40049409
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(dest)
+            raise
+
+
+def materialize_placeholder(source, dest):
+    """
+    Create dest as a placeholder copy of source as cheaply as possible.
+
+    Tries a reflink, then a hard link, then a full copy.
+
+    Args:
+        source (str): The placeholder asset
+        dest (str): The file to create (must not exist)
+
+    Returns:
+        str: "reflink", "hardlink" or "copy"
+    """
+    try:
+        _reflink(source, dest)
+        return "reflink"
+    except (OSError, ImportError):
+        pass
+    try:
+        os.link(source, dest)
+        return "hardlink"
+    except OSError as e:
+        if e.errno == errno.EEXIST:
+            raise
+    shutil.copy2(source, dest)
+    return "copy"
+
+
+def _execute_entry(entry):
+    if entry["kind"] == LINK:
+        os.symlink(entry["source"], entry["dest"])
+        return "symlink"
+    if entry.get("replace") and os.path.lexists(entry["dest"]):
+        # Remove rather than write through: dest may be a link to a real file
+        os.remove(entry["dest"])
+    return materialize_placeholder(entry["source"], entry["dest"])
+
+
+def execute(plan, workers=MATERIALIZE_WORKERS):
+    """
+    Create everything in a plan, in parallel.
+
+    Args:
+        plan (MaterializationPlan): The plan to carry out
+        workers (int): Thread pool size
+
+    Returns:
+        dict: {"created": [entries], "failed": [(entry, error message)],
+               "methods": {method: count}, "elapsed_s": s, "per_s": rate}
+    """
+    os.makedirs(plan.objs_dir, exist_ok=True)
+    start = time.perf_counter()
+    created, failed, methods = [], [], {}
+    if plan.entries:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(plan.entries)))) as pool:
+            futures = [pool.submit(_execute_entry, entry) for entry in plan.entries]
+            for entry, future in zip(plan.entries, futures):
+                try:
+                    method = future.result()
+                except Exception as e:
+                    failed.append((entry, str(e)))
+                    continue
+                entry["method"] = method
+                methods[method] = methods.get(method, 0) + 1
+                created.append(entry)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    return {"created": created, "failed": failed, "methods": methods,
+            "elapsed_s": elapsed, "per_s": len(created) / elapsed}
@@ -0,0 +1,773 @@
+"""
+Ingest Pipeline Stages for Manage Digital Ingest
+
+The work behind the CSV selector, Derivatives and Update CSV views, as plain
+functions with no Flet dependency. The views call them with values from the
+page session, and mdi.py calls them from the command line:
+
+1. read_csv() / extract_column_values()   - load the CSV, list the expected files
+2. match_files()                          - fuzzy-match them under a search root
+3. link_files()                           - build OBJS/ (links and placeholders)
+4. create_thumbnail()                     - Alma .jpg.clientThumb derivatives in TN/
+5. apply_alma_updates()                   - the Update CSV view's "Apply All Updates"
+6. write_values_csv()                     - values.csv without comment rows
+
+run_ingest() chains the stages for one CSV. Every stage is recorded with
+instrumentation.stage(), so a headless run can be profiled stage by stage
+from its event log.
+
+pandas and numpy are imported inside the functions that use them, so
+importing this module (and with it the file selector view) stays cheap.
+"""
+
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+
+import csv_io
+import instrumentation
+import objs_linker
+import utils
+from thumbnail import generate_thumbnail, generate_pdf_thumbnail
+
+logger = logging.getLogger(__name__)
+
+# Minimum fuzzy match ratio (0-100) for a file to count as found
+MATCH_THRESHOLD = 90
+
+# Alma thumbnail options (TN/<name>.jpg.clientThumb)
+ALMA_THUMBNAIL_OPTIONS = {
+    'trim': False,
+    'height': 200,
+    'width': 200,
+    'quality': 85,
+    'type': 'thumbnail'
+}
+IMAGE_EXTENSIONS = ('.tiff', '.tif', '.jpg', '.jpeg', '.png', '.gif', '.bmp')
+
+# Threads creating thumbnails in create_derivatives()
+DERIVATIVE_WORKERS = 4
+
+# Values written into the row that describes the CSV file itself
+ALMA_COLLECTION_ID = '81342586470004641'
+HANDLE_PREFIX = "http://hdl.handle.net/11084/"
+
+# IDs issued by new_unique_id(), shared by every run in this process
+_id_history = SimpleNamespace(session=SimpleNamespace())
+_id_lock = threading.Lock()
+
+
+def sanitize_file_path(file_path):
+    """
+    Sanitize a file path by replacing spaces with underscores and
+    handling spaces adjacent to dashes.
+
+    Args:
+        file_path (str): The original file path
+
+    Returns:
+        str: The sanitized file path
+    """
+    if not file_path:
+        return file_path
+
+    # Only the file name is sanitized, and its extension is kept as-is
+    directory, filename = os.path.split(file_path)
+    name_part, ext_part = os.path.splitext(filename.strip())
+    name_part = name_part.strip()
+
+    # Space-dash-space first, then remaining space-dash and dash-space, become double dashes
+    name_part = re.sub(r'\s+-\s+', '--', name_part)
+    name_part = re.sub(r'\s+-', '--', name_part)
+    name_part = re.sub(r'-\s+', '--', name_part)
+
+    # Replace remaining spaces with underscores
+    name_part = re.sub(r'\s+', '_', name_part)
+
+    sanitized_filename = name_part + ext_part.strip()
+    return os.path.join(directory, sanitized_filename) if directory else sanitized_filename
+
+
+def sanitize_file_name(filename):
+    """OBJS/ name for a file: the sanitized base name."""
+    return os.path.basename(sanitize_file_path(filename))
+
+
+def make_temp_directory(temp_dir=None):
+    """
+    Create a temporary ingest directory with its OBJS/, TN/ and SMALL/ subdirectories.
+
+    Args:
+        temp_dir (str): Directory to use (default: a new
+            storage/temp/file_selector_<timestamp>_<id>)
+
+    Returns:
+        tuple: (temp_dir, objs_dir, tn_dir, small_dir)
+    """
+    if not temp_dir:
+        session_id = datetime.now().strftime("%Y%m%d_%H%M%S") + "_" + str(uuid.uuid4())[:8]
+        temp_dir = os.path.join(os.getcwd(), "storage", "temp", f"file_selector_{session_id}")
+    directories = [os.path.join(temp_dir, name) for name in ("OBJS", "TN", "SMALL")]
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+    return (temp_dir, *directories)
+
+
+def copy_csv_to_temp(source_path, temp_dir):
+    """
+    Copy a CSV file into temp_dir as <sanitized name>_<YYYYMMDD_HHMMSS><ext>.
+
+    Args:
+        source_path (str): Path to the source CSV file
+        temp_dir (str): The temporary directory
+
+    Returns:
+        str: Path to the copy
+    """
+    name, ext = os.path.splitext(os.path.basename(source_path))
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    dest_path = os.path.join(temp_dir, f"{utils.sanitize_filename(name)}_{timestamp}{ext}")
+    shutil.copy2(source_path, dest_path)
+    logger.info(f"Copied CSV file to: {dest_path}")
+    return dest_path
+
+
+def read_csv(csv_path, encodings=None):
+    """
+    Read a CSV (all columns as strings) or Excel file, trying each encoding in turn.
+
+    Args:
+        csv_path (str): Path to the file
+        encodings (list): Encodings to try (default: csv_io.CSV_ENCODINGS)
+
+    Returns:
+        pandas.DataFrame: The table
+
+    Raises:
+        ValueError: If the format is unsupported or no encoding works
+    """
+    ext = os.path.splitext(csv_path)[1].lower()
+    if ext in ('.xlsx', '.xls'):
+        import pandas as pd
+        return pd.read_excel(csv_path)
+    if ext != '.csv':
+        raise ValueError(f"Unsupported file format: {ext}")
+
+    for encoding in encodings or csv_io.CSV_ENCODINGS:
+        try:
+            df = csv_io.read_csv_strings(csv_path, encoding=encoding)
+            logger.info(f"Successfully read CSV with encoding: {encoding}")
+            return df
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+    raise ValueError("Could not read CSV file with any standard encoding")
+
+
+def comment_mask(df):
+    """
+    Boolean array, True for comment rows (first column starts with '#').
+
+    Args:
+        df (pandas.DataFrame): The CSV data
+
+    Returns:
+        numpy.ndarray: One flag per row
+    """
+    import numpy as np
+    if len(df.columns) == 0:
+        return np.zeros(len(df), dtype=bool)
+    first_column = df[df.columns[0]]
+    return first_column.astype(str).str.strip().str.startswith('#').to_numpy(dtype=bool)
+
+
+def extract_column_values(df, column_name):
+    """
+    Non-empty values of a column, skipping comment rows.
+
+    Args:
+        df (pandas.DataFrame): The CSV data
+        column_name (str): Column holding the expected file names
+
+    Returns:
+        list: Stripped, non-empty values in row order
+
+    Raises:
+        KeyError: If the column is missing
+    """
+    if column_name not in df.columns:
+        raise KeyError(f"Column '{column_name}' not found in CSV file")
+    comments = comment_mask(df)
+    if comments.any():
+        logger.info(f"Filtered out {int(comments.sum())} comment rows starting with '#' in column '{df.columns[0]}'")
+    values = df[~comments][column_name].dropna().astype(str).str.strip()
+    return values[values != ''].tolist()
+
+
+def match_files(search_dir, filenames, threshold=MATCH_THRESHOLD, progress_callback=None, cancel_check=None):
+    """
+    Fuzzy-match expected file names against the files under search_dir.
+
+    Args:
+        search_dir (str): Directory searched recursively
+        filenames (list): Expected file names (e.g. from file_name_1)
+        threshold (int): Minimum ratio for a match
+        progress_callback (callable): Called with the fraction searched (0.0 - 1.0)
+        cancel_check (callable): Returns True to stop the search
+
+    Returns:
+        dict: "matched_paths" and "matched_ratios" (per match, in CSV order),
+              "csv_filenames_for_matched" (the CSV name of each match) and
+              "unmatched" ({"filename", "best_path", "best_ratio"} dicts),
+              or None if the search was cancelled
+    """
+    results = utils.perform_fuzzy_search_batch(
+        search_dir, filenames, threshold=threshold,
+        progress_callback=progress_callback, cancel_check=cancel_check
+    )
+    if results is None:
+        return None
+
+    matches = {"matched_paths": [], "matched_ratios": [], "csv_filenames_for_matched": [], "unmatched": []}
+    for filename in filenames:
+        match_path, ratio = results.get(filename, (None, 0))
+        if match_path and ratio >= threshold:
+            matches["matched_paths"].append(match_path)
+            matches["matched_ratios"].append(ratio)
+            matches["csv_filenames_for_matched"].append(filename)
+            logger.info(f"Found match for '{filename}': {match_path} ({ratio}% match)")
+            continue
+
+        # Keep the best candidate so the UI can show how close it came
+        matches["unmatched"].append({'filename': filename, 'best_path': match_path, 'best_ratio': ratio})
+        if ratio == 0:
+            logger.error(f"No match found for '{filename}' (0% match)")
+        elif ratio < 50:
+            logger.error(f"No match found for '{filename}' ({ratio}% match - very low)")
+        elif ratio < threshold:
+            logger.warning(f"No match found for '{filename}' ({ratio}% match - below {threshold}% threshold)")
+        else:
+            logger.warning(f"HIGH RATIO BUT NO PATH for '{filename}' ({ratio}% match, path={match_path})")
+
+    logger.info(f"Fuzzy search completed. Found {len(matches['matched_paths'])} matches "
+                f"out of {len(filenames)} files")
+    return matches
+
+
+def link_files(temp_dir, file_paths, placeholder_names=(), assets_dir=None, dry_run=False):
+    """
+    Build OBJS/: symbolic links with sanitized names for matched files and
+    File-Not-Found placeholders for unmatched ones.
+
+    The whole plan is worked out first and written to objs_plan.json in
+    temp_dir, then carried out on a thread pool (see objs_linker). With
+    dry_run only the plan is written.
+
+    Args:
+        temp_dir (str): The temporary directory (OBJS/ is created inside it)
+        file_paths (list): Matched file paths to link
+        placeholder_names (list): Expected file names that need a placeholder
+        assets_dir (str): Directory holding the File-Not-Found assets (default: ./assets)
+        dry_run (bool): Only write the plan
+
+    Returns:
+        dict: "plan" (objs_linker.MaterializationPlan), "plan_path",
+              "temp_file_info" (one dict per link: original_path,
+              original_filename, temp_path, sanitized_filename),
+              "placeholder_paths" and "result" (from objs_linker.execute,
+              None for a dry run)
+    """
+    objs_dir = os.path.join(temp_dir, "OBJS")
+    assets_dir = assets_dir or os.path.join(os.getcwd(), "assets")
+
+    with instrumentation.timer("link.plan"):
+        plan = objs_linker.build_plan(objs_dir, file_paths, placeholder_names, sanitize_file_name, assets_dir)
+    plan_path = os.path.join(temp_dir, "objs_plan.json")
+    plan.export(plan_path)
+    for skipped in plan.skipped:
+        logger.warning(f"Skipping '{skipped['original']}': {skipped['reason']}")
+    summary = plan.summary()
+    logger.info(f"OBJS/ plan: {summary['links']} links ({summary['renamed']} renamed), "
+                f"{summary['placeholders']} placeholders, {summary['skipped']} skipped - {plan_path}")
+    linked = {"plan": plan, "plan_path": plan_path, "temp_file_info": [], "placeholder_paths": [], "result": None}
+    if dry_run:
+        return linked
+
+    with instrumentation.stage("link", files=len(file_paths), placeholders=len(placeholder_names),
+                               objs_dir=objs_dir) as link_info:
+        with instrumentation.timer("link.execute"):
+            result = objs_linker.execute(plan)
+        instrumentation.count("link.created", len(result["created"]))
+        instrumentation.count("link.failed", len(result["failed"]))
+        for entry, error in result["failed"]:
+            logger.error(f"Failed to create {entry['kind']} for {entry['original']}: {error}")
+            instrumentation.emit("link.failed", source=entry["original"], kind=entry["kind"], error=error)
+        for entry in result["created"]:
+            instrumentation.emit("link.created", source=entry["original"], link=entry["dest"],
+                                 kind=entry["kind"], method=entry["method"])
+        link_info["linked"] = len(result["created"])
+        link_info["methods"] = result["methods"]
+        link_info["links_per_s"] = round(result["per_s"], 1)
+
+    for entry in result["created"]:
+        if entry["kind"] == objs_linker.PLACEHOLDER:
+            linked["placeholder_paths"].append(entry["dest"])
+            continue
+        linked["temp_file_info"].append({
+            'original_path': entry["original"],
+            'original_filename': os.path.basename(entry["original"]),
+            'temp_path': entry["dest"],
+            'sanitized_filename': entry["name"]
+        })
+    linked["result"] = result
+
+    methods = ", ".join(f"{count} {method}" for method, count in sorted(result["methods"].items()))
+    logger.info(f"Created {len(result['created'])} entries in OBJS/ ({methods or 'none'}) "
+                f"in {result['elapsed_s']:.2f}s ({result['per_s']:.0f}/s)")
+    return linked
+
+
+def mark_unmatched_titles(df, filenames, column_name='file_name_1'):
+    """
+    Prepend "ATTENTION! " to the dc:title of each row whose file was not found.
+
+    Args:
+        df (pandas.DataFrame): The CSV data (changed in place)
+        filenames (list): Expected file names that were not found
+        column_name (str): Column holding the file names
+
+    Returns:
+        int: Number of titles changed
+    """
+    if column_name not in df.columns or 'dc:title' not in df.columns:
+        logger.error(f"CSV missing required columns ({column_name} or dc:title)")
+        return 0
+
+    comments = comment_mask(df)
+    row_by_filename = {}
+    for position, (value, is_comment) in enumerate(zip(df[column_name].tolist(), comments)):
+        if not is_comment:
+            row_by_filename.setdefault(value, position)
+
+    changed = 0
+    for filename in filenames:
+        position = row_by_filename.get(filename)
+        if position is None:
+            logger.warning(f"Could not find '{filename}' in CSV {column_name} column")
+            continue
+        row_idx = df.index[position]
+        current_title = str(df.at[row_idx, 'dc:title'])
+        if current_title.startswith("ATTENTION! "):
+            logger.info(f"dc:title for '{filename}' already has ATTENTION! prefix")
+            continue
+        df.at[row_idx, 'dc:title'] = f"ATTENTION! {current_title}"
+        logger.info(f"Updated dc:title for '{filename}' with ATTENTION! prefix")
+        changed += 1
+    return changed
+
+
+def thumbnail_path(file_path):
+    """TN/<root>.jpg.clientThumb beside the OBJS/ folder holding file_path."""
+    dirname, basename = os.path.split(file_path)
+    temp_base_dir = os.path.dirname(dirname) if dirname.endswith('OBJS') else dirname
+    return os.path.join(temp_base_dir, 'TN', f"{os.path.splitext(basename)[0]}.jpg.clientThumb")
+
+
+def create_thumbnail(file_path):
+    """
+    Create the Alma thumbnail for a file in OBJS/.
+
+    Args:
+        file_path (str): Path to the source file
+
+    Returns:
+        tuple: (success: bool, result: str) - the thumbnail path or an error message
+    """
+    if any(char.isspace() for char in file_path):
+        return False, f"File path '{file_path}' contains spaces! This should not happen with temp files."
+
+    ext = os.path.splitext(file_path)[1].lower()
+    derivative_path = thumbnail_path(file_path)
+    os.makedirs(os.path.dirname(derivative_path), exist_ok=True)
+    if ext in IMAGE_EXTENSIONS:
+        if generate_thumbnail(file_path, derivative_path, ALMA_THUMBNAIL_OPTIONS):
+            return True, derivative_path
+        return False, f"Failed to create Alma thumbnail: {derivative_path}"
+    if ext == '.pdf':
+        if generate_pdf_thumbnail(file_path, derivative_path, ALMA_THUMBNAIL_OPTIONS):
+            return True, derivative_path
+        return False, f"Failed to create PDF thumbnail: {derivative_path}"
+    return False, f"Unsupported file type for Alma: {ext}"
+
+
+def create_derivatives(file_paths, workers=DERIVATIVE_WORKERS, progress_callback=None):
+    """
+    Create Alma thumbnails for many files on a thread pool.
+
+    Args:
+        file_paths (list): Files in OBJS/
+        workers (int): Threads creating thumbnails
+        progress_callback (callable): Called with the fraction done (0.0 - 1.0)
+
+    Returns:
+        dict: "succeeded" [thumbnail paths] and "failed" [(file, error)]
+    """
+    def create(file_path):
+        file_start = time.perf_counter()
+        try:
+            success, result = create_thumbnail(file_path)
+        except Exception as e:
+            success, result = False, str(e)
+        instrumentation.emit("derivatives.file", file=file_path, mode="Alma",
+                             status="ok" if success else "error",
+                             duration_s=round(time.perf_counter() - file_start, 6))
+        return success, result
+
+    report = {"succeeded": [], "failed": []}
+    with instrumentation.stage("derivatives", files=len(file_paths), mode="Alma") as stage_info:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for index, (file_path, (success, result)) in enumerate(zip(file_paths, pool.map(create, file_paths))):
+                if success:
+                    report["succeeded"].append(result)
+                else:
+                    logger.error(f"Thumbnail failed for {file_path}: {result}")
+                    report["failed"].append((file_path, result))
+                if progress_callback:
+                    progress_callback((index + 1) / len(file_paths))
+        stage_info.update(processed=len(file_paths), succeeded=len(report["succeeded"]),
+                          failed=len(report["failed"]))
+    return report
+
+
+def _handle_url(unique_id):
+    """Handle URL for an ID: "dg_1234567890" -> http://hdl.handle.net/11084/1234567890."""
+    return f"{HANDLE_PREFIX}{unique_id.split('_')[-1] if '_' in unique_id else unique_id}"
+
+
+def _is_blank(value):
+    import pandas as pd
+    return pd.isna(value) or str(value).strip() == ''
+
+
+def new_unique_id():
+    """
+    A new "dg_<epoch>" ID from the process-wide ID history (thread-safe).
+
+    Returns:
+        str: An ID no earlier call in this process has returned
+    """
+    with _id_lock:
+        return utils.generate_unique_id(_id_history)
+
+
+def apply_alma_updates(df, temp_csv_filename, renames=(), column_name='file_name_1', mode="Alma",
+                       new_id=None, progress_callback=None):
+    """
+    Apply the Update CSV view's "Apply All Updates" steps to a CSV's data.
+
+    1. Replace each matched file name with its sanitized OBJS/ name
+    2. Append a row for the CSV file itself (Alma)
+    3. Fill empty originating_system_id and dc:identifier cells, set every
+       dc:identifier to its Handle URL, blank collection_id except on the
+       last row and link compound parents and children (Alma)
+    4. Set dginfo on every row to the CSV's file name
+
+    Args:
+        df (pandas.DataFrame): The CSV data (not changed; a copy is returned)
+        temp_csv_filename (str): File name of the working copy of the CSV
+        renames (list): (CSV file name, sanitized file name) pairs for matched files
+        column_name (str): Column holding the file names
+        mode (str): Ingest mode; steps 2 and 3 only run for "Alma"
+        new_id (callable): Returns a new unique ID (default: new_unique_id, so
+            back-to-back runs in one process never repeat an ID)
+        progress_callback (callable): Called as progress_callback(fraction, message)
+
+    Returns:
+        tuple: (updated DataFrame, counts dict with "renamed", "filled_ids",
+                "handles", "compound_groups", "compound_errors" and "csv_row",
+                the appended row as a dict or None)
+    """
+    import pandas as pd
+
+    new_id = new_id or new_unique_id
+    progress = progress_callback or (lambda fraction, message: None)
+    counts = {"renamed": 0, "filled_ids": 0, "handles": 0, "compound_groups": 0,
+              "compound_errors": 0, "csv_row": None}
+    df = df.copy()
+    columns = set(df.columns)
+
+    # Step 1: Replace matched file names with their sanitized names (first non-comment row)
+    progress(0.1, "Applying matched filenames")
+    if column_name not in columns:
+        raise KeyError(f"Column '{column_name}' not found in CSV file")
+    comments = comment_mask(df)
+    rows_by_filename = {}  # A name listed twice is renamed on its rows in order
+    for position, (value, is_comment) in enumerate(zip(df[column_name].tolist(), comments)):
+        if not is_comment:
+            rows_by_filename.setdefault(value, deque()).append(position)
+    for csv_filename, sanitized_filename in renames:
+        positions = rows_by_filename.get(csv_filename)
+        position = positions.popleft() if positions else None
+        if position is None:
+            logger.warning(f"No match found for csv_filename: '{csv_filename}'")
+            continue
+        df.at[df.index[position], column_name] = sanitized_filename
+        counts["renamed"] += 1
+    logger.info(f"Updated {counts['renamed']} of {len(renames)} matched filename(s) in '{column_name}'")
+
+    if mode == "Alma":
+        # Step 2: Append a row describing the CSV file itself
+        progress(0.3, "Adding the CSV row")
+        unique_id = new_id()
+        new_row = {col: '' for col in df.columns}
+        new_row['originating_system_id'] = unique_id
+        new_row['dc:identifier'] = _handle_url(unique_id)
+        new_row['collection_id'] = ALMA_COLLECTION_ID  # Only the CSV row keeps a collection_id
+        new_row['dc:type'] = 'Dataset'
+        new_row['dc:title'] = temp_csv_filename
+        new_row['file_name_1'] = temp_csv_filename
+        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+        columns = set(df.columns)
+        comments = comment_mask(df)
+        counts["csv_row"] = new_row
+        logger.info(f"Appended new row with ID: {unique_id}")
+
+        # Step 3: Fill empty IDs, then point every dc:identifier at its Handle URL
+        progress(0.5, "Filling IDs and identifiers")
+        rows = [idx for idx in range(len(df)) if not comments[idx]]
+        if 'originating_system_id' in columns:
+            for idx in rows:
+                if _is_blank(df.at[idx, 'originating_system_id']):
+                    generated = new_id()
+                    df.at[idx, 'originating_system_id'] = generated
+                    if 'dc:identifier' in columns and _is_blank(df.at[idx, 'dc:identifier']):
+                        df.at[idx, 'dc:identifier'] = _handle_url(generated)
+                    counts["filled_ids"] += 1
+            if counts["filled_ids"]:
+                logger.info(f"Filled {counts['filled_ids']} empty originating_system_id cell(s)")
+
+            if 'dc:identifier' in columns:
+                for idx in rows:
+                    orig_id = df.at[idx, 'originating_system_id']
+                    if _is_blank(orig_id):
+                        continue
+                    orig_id = str(orig_id).strip()
+                    numeric_part = orig_id.split('_')[-1] if '_' in orig_id else orig_id
+                    if numeric_part.isdigit():
+                        df.at[idx, 'dc:identifier'] = f"{HANDLE_PREFIX}{numeric_part}"
+                        counts["handles"] += 1
+                if counts["handles"]:
+                    logger.info(f"Set {counts['handles']} dc:identifier cell(s) to Handle URL format")
+        else:
+            logger.warning("originating_system_id column not found in CSV")
+
+        # Blank collection_id everywhere except the CSV row (the last one)
+        if 'collection_id' in columns:
+            for idx in rows:
+                if idx < len(df) - 1:
+                    df.at[idx, 'collection_id'] = ''
+
+        if 'compoundrelationship' in columns:
+            _link_compound_rows(df, rows, counts)
+
+    # Step 4: dginfo names the CSV on every row
+    progress(0.9, "Populating dginfo")
+    if 'dginfo' in columns:
+        df['dginfo'] = temp_csv_filename
+        logger.info(f"Set dginfo field to '{temp_csv_filename}' for all {len(df)} rows")
+    else:
+        logger.warning("dginfo column not found in CSV")
+    return df, counts
+
+
+def _link_compound_rows(df, rows, counts):
+    """
+    Link each compound parent to the child rows that follow it: group_id,
+    rep_label and rep_public_note on the children, and table of contents and
+    dc:type 'compound' on the parent. A parent with fewer than two children
+    gets mms_id "*ERROR* Too few children!".
+    """
+    columns = set(df.columns)
+    relationships = [str(df.at[idx, 'compoundrelationship']).strip() for idx in rows]
+    position = 0
+    while position < len(rows):
+        if not relationships[position].startswith('parent'):
+            position += 1
+            continue
+
+        parent_idx = rows[position]
+        parent_pid = df.at[parent_idx, 'originating_system_id'] if 'originating_system_id' in columns else ''
+        if 'group_id' in columns:
+            df.at[parent_idx, 'group_id'] = parent_pid
+
+        toc = ""
+        child_count = 0
+        position += 1
+        while position < len(rows) and relationships[position].startswith('child'):
+            child_idx = rows[position]
+            child_title = str(df.at[child_idx, 'dc:title']) if 'dc:title' in columns else ''
+            child_type = str(df.at[child_idx, 'dc:type']) if 'dc:type' in columns else ''
+            if child_title and child_type:
+                toc += f"{child_title} ({child_type}) | "
+            elif child_title:
+                toc += f"{child_title} | "
+            if 'group_id' in columns:
+                df.at[child_idx, 'group_id'] = parent_pid
+            if 'rep_label' in columns:
+                df.at[child_idx, 'rep_label'] = child_title
+            if 'rep_public_note' in columns:
+                df.at[child_idx, 'rep_public_note'] = child_type
+            child_count += 1
+            position += 1
+
+        if child_count < 2:
+            logger.error(f"*ERROR* Parent at row {parent_idx} has only {child_count} child(ren), need at least 2!")
+            if 'mms_id' in columns:
+                df.at[parent_idx, 'mms_id'] = "*ERROR* Too few children!"
+            counts["compound_errors"] += 1
+            continue
+
+        if 'dcterms:tableOfContents' in columns:
+            df.at[parent_idx, 'dcterms:tableOfContents'] = toc.rstrip(' | ')
+        if 'dc:type' in columns:
+            df.at[parent_idx, 'dc:type'] = 'compound'
+        if 'dcterms:type.dcterms:DCMIType' in columns:
+            df.at[parent_idx, 'dcterms:type.dcterms:DCMIType'] = ''
+        counts["compound_groups"] += 1
+
+    if counts["compound_groups"]:
+        logger.info(f"Processed {counts['compound_groups']} compound parent/child group(s)")
+
+
+def write_values_csv(df, values_csv_path):
+    """
+    Write values.csv: comment rows removed, collection_id blank except on
+    the last row (the CSV's own row), minimal quoting.
+
+    Args:
+        df (pandas.DataFrame): The CSV data
+        values_csv_path (str): Output path
+
+    Returns:
+        int: Rows written
+    """
+    import numpy as np
+
+    # Positions only, so the frame is never copied as a whole
+    kept_positions = np.flatnonzero(~comment_mask(df))
+    comment_count = len(df) - len(kept_positions)
+    if comment_count > 0:
+        logger.info(f"Removing {comment_count} comment row(s) from values.csv")
+
+    transform = None
+    if 'collection_id' in df.columns and len(kept_positions) > 0:
+        last_position = kept_positions[-1]
+
+        def transform(chunk, positions):
+            # Applied per written chunk, so only that chunk is ever copied
+            chunk['collection_id'] = np.where(positions == last_position, chunk['collection_id'], '')
+            return chunk
+
+    csv_io.write_csv_atomic(df, values_csv_path, rows=kept_positions, transform=transform)
+    logger.info(f"Saved values.csv to: {values_csv_path} ({len(kept_positions)} rows)")
+    return len(kept_positions)
+
+
+def run_ingest(csv_path, search_root, out_dir=None, column_name='file_name_1', threshold=MATCH_THRESHOLD,
+               mode="Alma", derivatives=True, workers=DERIVATIVE_WORKERS, validate=True, dry_run=False,
+               progress_callback=None, new_id=None):
+    """
+    Run every ingest stage for one CSV, without the UI.
+
+    Args:
+        csv_path (str): The ingest CSV
+        search_root (str): Directory searched for the CSV's files
+        out_dir (str): Temporary ingest directory to build (default: a new one in storage/temp)
+        column_name (str): Column holding the file names
+        threshold (int): Minimum fuzzy match ratio
+        mode (str): Ingest mode, for heading validation and the Alma steps
+        derivatives (bool): Create TN/ thumbnails
+        workers (int): Threads creating thumbnails
+        validate (bool): Check the CSV headings against the verified list first
+        dry_run (bool): Stop after writing the OBJS/ plan
+        progress_callback (callable): Called as progress_callback(stage, fraction)
+        new_id (callable): Returns a new unique ID (default: new_unique_id)
+
+    Returns:
+        dict: Paths and counts for the run: "temp_dir", "temp_csv", "values_csv",
+              "plan_path", "files", "matched", "unmatched", "linked",
+              "placeholders", "thumbnails", "thumbnail_errors", "csv_counts"
+
+    Raises:
+        ValueError: If the CSV fails validation or cannot be read
+    """
+    progress = progress_callback or (lambda stage, fraction: None)
+    report = {"temp_dir": None, "temp_csv": None, "values_csv": None, "plan_path": None}
+
+    if validate:
+        is_valid, unmatched_headings, error = utils.validate_csv_headings(csv_path, mode)
+        if error:
+            raise ValueError(error)
+        if not is_valid:
+            raise ValueError(f"CSV contains {len(unmatched_headings)} unverified heading(s) for {mode} "
+                             f"mode: {', '.join(sorted(unmatched_headings))}")
+
+    with instrumentation.stage("csv_load", path=csv_path) as load_info:
+        df = read_csv(csv_path)
+        filenames = extract_column_values(df, column_name)
+        load_info.update(rows=len(df), files=len(filenames))
+    report["files"] = len(filenames)
+
+    temp_dir = make_temp_directory(out_dir)[0]
+    report["temp_dir"] = temp_dir
+
+    matches = match_files(search_root, filenames, threshold,
+                          progress_callback=lambda fraction: progress("search", fraction))
+    report["matched"] = len(matches["matched_paths"])
+    report["unmatched"] = [info['filename'] for info in matches["unmatched"]]
+
+    linked = link_files(temp_dir, matches["matched_paths"], report["unmatched"], dry_run=dry_run)
+    report["plan_path"] = linked["plan_path"]
+    if dry_run:
+        return report
+    report["linked"] = len(linked["temp_file_info"])
+    report["placeholders"] = len(linked["placeholder_paths"])
+
+    temp_csv = copy_csv_to_temp(csv_path, temp_dir)
+    report["temp_csv"] = temp_csv
+    created = {os.path.basename(path) for path in linked["placeholder_paths"]}
+    mark_unmatched_titles(df, [name for name in report["unmatched"] if sanitize_file_name(name) in created],
+                          column_name)
+
+    if derivatives:
+        objs_files = [info['temp_path'] for info in linked["temp_file_info"]] + linked["placeholder_paths"]
+        made = create_derivatives(objs_files, workers,
+                                  progress_callback=lambda fraction: progress("derivatives", fraction))
+        report["thumbnails"] = len(made["succeeded"])
+        report["thumbnail_errors"] = made["failed"]
+
+    # Pair each link with the CSV name it was matched from (by source path,
+    # so skipped or failed links cannot shift the pairing)
+    csv_name_by_source = dict(zip(matches["matched_paths"], matches["csv_filenames_for_matched"]))
+    renames = [(csv_name_by_source[info['original_path']], info['sanitized_filename'])
+               for info in linked["temp_file_info"] if info['original_path'] in csv_name_by_source]
+
+    with instrumentation.stage("csv_update", rows=len(df), renames=len(renames)) as update_info:
+        df, counts = apply_alma_updates(df, os.path.basename(temp_csv), renames, column_name, mode,
+                                        new_id=new_id, progress_callback=lambda fraction, message: progress("csv_update", fraction))
+        update_info.update({key: value for key, value in counts.items() if key != "csv_row"})
+    progress("csv_update", 1.0)
+    report["csv_counts"] = {key: value for key, value in counts.items() if key != "csv_row"}
+
+    with instrumentation.stage("export", rows=len(df)) as export_info:
+        csv_io.write_csv_atomic(df, temp_csv)
+        report["values_csv"] = os.path.join(temp_dir, "values.csv")
+        export_info["values_rows"] = write_values_csv(df, report["values_csv"])
+    return report
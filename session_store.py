@@ -0,0 +1,366 @@
+"""
+Preserved Session Storage for Manage Digital Ingest
+
+This module saves and restores page.session for the About view's "Preserve
+Session" feature. Small values (strings, numbers, short lists) are kept in
+PERSISTENT_SESSION_FILE as before. Bulky collections such as
+selected_file_paths, temp_file_info, generated_csv_rows and unmatched_filenames
+are written as compact JSON Lines files in PERSISTENT_SESSION_DIR, one file per
+key, and are only read back when a view first asks for them.
+
+Lazy loading works through LazySessionStorage, a drop-in replacement for Flet's
+SessionStorage that install() puts on the page at startup. A preserved key is
+held as a placeholder until page.session.get() first reads it. Flet has no
+public way to replace page.session, so install() sets the page's private
+storage attribute, and only on the Flet version it was checked against
+(FLET_SESSION_VERSION); on any other version it logs a warning and preserved
+sessions load eagerly.
+
+Bulky keys are rewritten only when dirty, that is when page.session.set() was
+called for them since the last preserve. Code that changes a session
+collection in place must set() it again for the change to be preserved, which
+is already how the views update session state.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+
+from flet.core.session_storage import SessionStorage
+
+logger = logging.getLogger(__name__)
+
+PERSISTENT_SESSION_FILE = "storage/data/persistent_session.json"
+PERSISTENT_SESSION_DIR = "storage/data/persistent_session"
+
+# Key in PERSISTENT_SESSION_FILE listing the keys stored in side files
+LAZY_KEYS_FIELD = "_lazy_keys"
+
+# Compact JSON size above which a list or dict is moved to its own file
+BULKY_VALUE_BYTES = 4096
+
+# Flet version whose Page keeps page.session in PAGE_SESSION_ATTR; install()
+# only replaces the storage on this version (pinned in python-requirements.txt)
+FLET_SESSION_VERSION = "0.28.2"
+PAGE_SESSION_ATTR = "_Page__session_storage"
+
+
+class _LazyValue:
+    """Placeholder for a preserved session value that has not been read yet."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        return read_jsonl(self.path)
+
+
+class LazySessionStorage(SessionStorage):
+    """
+    SessionStorage that loads preserved collections on first access and
+    remembers which keys changed since the last preserve.
+    """
+
+    def __init__(self, page):
+        super().__init__(page)
+        self._values = {}
+        self.dirty_keys = set()
+
+    def set(self, key, value):
+        self._values[key] = value
+        self.dirty_keys.add(key)
+
+    def set_lazy(self, key, path):
+        """Register a preserved key whose value is read from path on first access."""
+        self._values[key] = _LazyValue(path)
+        self.dirty_keys.discard(key)
+
+    def get(self, key):
+        value = self._values.get(key)
+        if isinstance(value, _LazyValue):
+            placeholder = value
+            try:
+                value = placeholder.load()
+                logger.info(f"Loaded preserved session key '{key}' from {placeholder.path}")
+            except Exception as e:
+                logger.error(f"Failed to load preserved session key '{key}': {e}")
+                value = None
+            self._values[key] = value
+        return value
+
+    def is_loaded(self, key):
+        """Return False if key is still an unread preserved value."""
+        return not isinstance(self._values.get(key), _LazyValue)
+
+    def contains_key(self, key):
+        return key in self._values
+
+    def remove(self, key):
+        self._values.pop(key)
+        self.dirty_keys.discard(key)
+
+    def get_keys(self):
+        return list(self._values.keys())
+
+    def clear(self):
+        self._values.clear()
+        self.dirty_keys.clear()
+
+
+def install(page):
+    """
+    Replace page.session with a LazySessionStorage, keeping any existing keys.
+
+    Call once at startup, before restore(). On a Flet version other than
+    FLET_SESSION_VERSION, or if the page does not keep page.session where
+    expected, a warning is logged and preserved sessions are loaded eagerly
+    instead.
+
+    Args:
+        page: The Flet page object
+
+    Returns:
+        bool: True if lazy storage is active
+    """
+    current = page.session
+    if isinstance(current, LazySessionStorage):
+        return True
+    version = _flet_version()
+    if version != FLET_SESSION_VERSION:
+        logger.warning(f"Lazy session storage was checked against Flet {FLET_SESSION_VERSION}, "
+                       f"not {version}; preserved sessions will load eagerly")
+        return False
+    if getattr(page, PAGE_SESSION_ATTR, None) is not current:
+        logger.warning("Page session storage not found; preserved sessions will load eagerly")
+        return False
+
+    storage = LazySessionStorage(page)
+    for key in current.get_keys():
+        storage.set(key, current.get(key))
+    storage.dirty_keys.clear()
+    setattr(page, PAGE_SESSION_ATTR, storage)
+    if page.session is not storage:
+        setattr(page, PAGE_SESSION_ATTR, current)
+        logger.warning("Page session storage could not be replaced; preserved sessions will load eagerly")
+        return False
+    return True
+
+
+def _flet_version():
+    """The installed Flet version, or None if it cannot be read."""
+    try:
+        from flet.version import version
+        return version
+    except Exception:
+        return None
+
+
+def is_loaded(session, key):
+    """
+    Return True if key's value is in memory (always True for plain SessionStorage).
+
+    Lets callers such as the About view list preserved keys without loading them.
+    """
+    return not isinstance(session, LazySessionStorage) or session.is_loaded(key)
+
+
+def _sidecar_path(key):
+    """File name for a bulky key: the key with unsafe characters replaced."""
+    safe = re.sub(r'[^\w.-]', '_', key)
+    return os.path.join(PERSISTENT_SESSION_DIR, f"{safe}.jsonl")
+
+
+def write_jsonl(path, value):
+    """
+    Write a list or dict as JSON Lines, atomically.
+
+    The first line describes the container ({"type": "list"} or
+    {"type": "dict"}); each following line holds one list item or one
+    [key, value] pair, in compact JSON.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        if isinstance(value, dict):
+            f.write('{"type": "dict"}\n')
+            for item in value.items():
+                f.write(json.dumps(list(item), separators=(',', ':'), ensure_ascii=False))
+                f.write('\n')
+        else:
+            f.write('{"type": "list"}\n')
+            for item in value:
+                f.write(json.dumps(item, separators=(',', ':'), ensure_ascii=False))
+                f.write('\n')
+    os.replace(temp_path, path)
+
+
+def read_jsonl(path):
+    """Read a list or dict written by write_jsonl."""
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        items = [json.loads(line) for line in f if line.strip()]
+    if header.get("type") == "dict":
+        return {key: value for key, value in items}
+    return items
+
+
+def _is_bulky(value):
+    """Return True for collections large enough to live in their own file."""
+    if not isinstance(value, (list, dict)):
+        return False
+    if len(value) > 100:
+        return True
+    return len(json.dumps(value, separators=(',', ':'), default=str)) > BULKY_VALUE_BYTES
+
+
+def preserve(session, protect_temp=True):
+    """
+    Save page.session to PERSISTENT_SESSION_FILE plus one side file per bulky key.
+
+    Bulky keys that are unchanged since they were last preserved (still
+    unread, or never set() again) keep their existing side file.
+
+    Args:
+        session: page.session
+        protect_temp (bool): Mark temp_directory as protected from cleanup
+
+    Returns:
+        tuple: (number of keys preserved, number of side files written)
+    """
+    os.makedirs(PERSISTENT_SESSION_DIR, exist_ok=True)
+    dirty_keys = getattr(session, 'dirty_keys', None)
+
+    session_data = {}
+    lazy_keys = {}
+    written = 0
+    keys = session.get_keys()
+    for key in keys:
+        path = _sidecar_path(key)
+        if not is_loaded(session, key) or (
+            dirty_keys is not None and key not in dirty_keys and os.path.exists(path)
+        ):
+            # Side file is already current
+            lazy_keys[key] = os.path.basename(path)
+            continue
+
+        value = session.get(key)
+        # Convert to JSON-serializable format
+        if not isinstance(value, (str, int, float, bool, type(None), list, dict)):
+            value = str(value)
+
+        if _is_bulky(value):
+            write_jsonl(path, value)
+            lazy_keys[key] = os.path.basename(path)
+            written += 1
+        else:
+            session_data[key] = value
+
+    # Add a flag to mark temp directory as protected
+    if protect_temp and session.contains_key("temp_directory") and session.get("temp_directory"):
+        session_data["_temp_protected"] = True
+    session_data[LAZY_KEYS_FIELD] = lazy_keys
+
+    temp_path = f"{PERSISTENT_SESSION_FILE}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(session_data, f, indent=2)
+    os.replace(temp_path, PERSISTENT_SESSION_FILE)
+
+    # Drop side files for keys that are gone or small now
+    keep = set(lazy_keys.values())
+    for name in os.listdir(PERSISTENT_SESSION_DIR):
+        if name.endswith('.jsonl') and name not in keep:
+            os.remove(os.path.join(PERSISTENT_SESSION_DIR, name))
+
+    if dirty_keys is not None:
+        dirty_keys.clear()
+
+    logger.info(f"Preserved {len(keys)} session keys ({len(lazy_keys)} in side files, {written} rewritten)")
+    return len(keys), written
+
+
+def restore(session):
+    """
+    Restore a preserved session into page.session.
+
+    Small keys are set immediately; bulky keys are registered for lazy
+    loading when session is a LazySessionStorage, otherwise read now.
+
+    Args:
+        session: page.session
+
+    Returns:
+        dict: The small values from PERSISTENT_SESSION_FILE, or None if there
+              is no preserved session
+    """
+    if not os.path.exists(PERSISTENT_SESSION_FILE):
+        return None
+
+    with open(PERSISTENT_SESSION_FILE, 'r', encoding='utf-8') as f:
+        session_data = json.load(f)
+
+    lazy_keys = session_data.pop(LAZY_KEYS_FIELD, {})
+    for key, value in session_data.items():
+        if key != "_temp_protected":  # Don't restore the protection flag itself
+            session.set(key, value)
+
+    for key, filename in lazy_keys.items():
+        path = os.path.join(PERSISTENT_SESSION_DIR, filename)
+        if not os.path.exists(path):
+            logger.warning(f"Preserved session file missing for key '{key}': {path}")
+            continue
+        if isinstance(session, LazySessionStorage):
+            session.set_lazy(key, path)
+        else:
+            session.set(key, read_jsonl(path))
+
+    if isinstance(session, LazySessionStorage):
+        session.dirty_keys.clear()
+
+    logger.info(f"Restored {len(session_data) + len(lazy_keys)} session keys from {PERSISTENT_SESSION_FILE} "
+                f"({len(lazy_keys)} load on first use)")
+    return session_data
+
+
+def delete_preserved():
+    """
+    Delete the preserved session file and its side files.
+
+    Returns:
+        bool: True if anything was deleted
+    """
+    deleted = False
+    if os.path.exists(PERSISTENT_SESSION_FILE):
+        os.remove(PERSISTENT_SESSION_FILE)
+        deleted = True
+    if os.path.isdir(PERSISTENT_SESSION_DIR):
+        shutil.rmtree(PERSISTENT_SESSION_DIR)
+        deleted = True
+    return deleted
+
+
+def is_temp_protected():
+    """
+    Return True if a preserved session marked its temp directory as protected.
+
+    Only the small PERSISTENT_SESSION_FILE is read; side files are not touched.
+    """
+    if not os.path.exists(PERSISTENT_SESSION_FILE):
+        return False
+    with open(PERSISTENT_SESSION_FILE, 'r', encoding='utf-8') as f:
+        return bool(json.load(f).get("_temp_protected"))
+
+
+def protected_temp_directory():
+    """
+    Return the temp directory a preserved session protects, or None.
+
+    Only the small PERSISTENT_SESSION_FILE is read; side files are not touched.
+    """
+    if not os.path.exists(PERSISTENT_SESSION_FILE):
+        return None
+    with open(PERSISTENT_SESSION_FILE, 'r', encoding='utf-8') as f:
+        session_data = json.load(f)
+    if session_data.get("_temp_protected"):
+        return session_data.get("temp_directory")
+    return None
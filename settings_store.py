@@ -0,0 +1,209 @@
+"""
+Persistent Settings Store for Manage Digital Ingest
+
+This module contains SettingsStore, the single owner of _data/persistent.json.
+The file is read once and every lookup is then served from memory. Writes
+update memory immediately and are flushed to disk together after a short
+debounce (and at exit), so a burst of changes, such as a view saving the same
+setting on every render, costs at most one write.
+
+Flushes are atomic (temp file plus os.replace). If another process changed
+the file since it was last read, the on-disk settings are re-read and the
+pending changes merged on top, so neither writer's keys are lost.
+
+Disk reads and writes are counted; counters() exposes them so the I/O caused
+by each navigation can be logged.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_FILE = os.path.join("_data", "persistent.json")
+
+# Seconds to wait after the last change before writing
+FLUSH_DELAY = 0.5
+
+
+class SettingsStore:
+    """
+    Cached, debounced access to the persistent settings file.
+    """
+
+    def __init__(self, path=SETTINGS_FILE, flush_delay=FLUSH_DELAY):
+        """
+        Initialize the store. Nothing is read until the first access.
+
+        Args:
+            path (str): Settings file path
+            flush_delay (float): Debounce delay for writes, in seconds
+        """
+        self.path = path
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._data = None
+        self._pending = {}
+        self._timer = None
+        self._mtime = None
+        self._counters = {"disk_reads": 0, "disk_writes": 0, "gets": 0, "updates": 0}
+
+    def _read_disk(self):
+        """Read the settings file; returns {} if it is missing or unreadable."""
+        self._counters["disk_reads"] += 1
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._mtime = os.path.getmtime(self.path)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            self._mtime = None
+        except Exception as e:
+            logger.warning(f"Failed to load persistent settings from {self.path}: {e}")
+        return {}
+
+    def _ensure_loaded(self):
+        if self._data is None:
+            self._data = self._read_disk()
+
+    def get(self, key, default=None):
+        """
+        Get one setting from memory.
+
+        Args:
+            key (str): Setting name
+            default: Value returned when the setting is missing
+
+        Returns:
+            The setting value or default
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._counters["gets"] += 1
+            return self._data.get(key, default)
+
+    def all(self):
+        """
+        Get a copy of all settings.
+
+        Returns:
+            dict: Every setting, including changes not yet flushed
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._counters["gets"] += 1
+            return dict(self._data)
+
+    def update(self, settings):
+        """
+        Change one or more settings and schedule a flush.
+
+        Values equal to the current ones are ignored, so re-saving an
+        unchanged setting never touches the disk.
+
+        Args:
+            settings (dict): Settings to change
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._counters["updates"] += 1
+            changed = {key: value for key, value in settings.items()
+                       if key not in self._data or self._data[key] != value}
+            if not changed:
+                return
+            self._data.update(changed)
+            self._pending.update(changed)
+            self._schedule_flush()
+
+    def set(self, key, value):
+        """Change a single setting (see update())."""
+        self.update({key: value})
+
+    def _schedule_flush(self):
+        """(Re)start the debounce timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """
+        Write pending changes to disk now, merging with any external changes.
+
+        Returns:
+            bool: True if the file was written
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return False
+
+            data = self._data
+            try:
+                current_mtime = os.path.getmtime(self.path)
+            except OSError:
+                current_mtime = None
+            if current_mtime != self._mtime:
+                # Someone else wrote the file since we read it: keep their keys
+                data = self._read_disk()
+                data.update(self._pending)
+
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2)
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                logger.error(f"Failed to save persistent settings: {e}")
+                return False
+
+            self._counters["disk_writes"] += 1
+            self._mtime = os.path.getmtime(self.path)
+            self._data = data
+            logger.info(f"Saved persistent settings: {self._pending}")
+            self._pending = {}
+            return True
+
+    def reload(self):
+        """Discard the cache (flushing pending changes first) and re-read on next access."""
+        with self._lock:
+            self.flush()
+            self._data = None
+
+    def counters(self):
+        """
+        Get the I/O counters.
+
+        Returns:
+            dict: disk_reads, disk_writes, gets and updates since startup
+        """
+        with self._lock:
+            return dict(self._counters)
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_settings():
+    """
+    Get the application-wide SettingsStore, creating it on first use.
+
+    Pending changes are flushed automatically when the interpreter exits.
+
+    Returns:
+        SettingsStore: The shared store
+    """
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = SettingsStore()
+            atexit.register(_settings.flush)
+        return _settings
@@ -0,0 +1,321 @@
+"""
+Temporary Directory Garbage Collector for Manage Digital Ingest
+
+Every CSV selection or file pick can create a new run directory under
+storage/temp (file_selector_<timestamp>_<id>, csv_update_<timestamp>, ...).
+This module indexes those directories and removes old ones:
+
+- scan_temp_root() lists each run directory with its size, file count,
+  last use (newest file modification or access time, or directory
+  modification time, inside it) and whether it is protected. Directories
+  are measured in parallel with os.scandir, without following the symbolic
+  links in OBJS/.
+- select_for_deletion() applies the policy: unprotected directories unused
+  for more than max_age_days go first, then the least recently used ones
+  until the total is under the quota. The quota pass never takes a
+  directory used in the last quota_min_idle_hours, so a batch that is
+  still being built or uploaded survives a full disk.
+- remove_tree() deletes a directory with os.scandir and a thread pool.
+
+A directory is protected if it is the current session's temp directory or
+the one a preserved session marked as protected (see session_store). The
+ingest directories "mdi ingest" and "mdi watch" create in storage/temp by
+default are not protected: they are collected like any other run directory.
+start_background_gc() runs collect() shortly after startup and then
+periodically, using the temp_gc_* settings.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentation
+import session_store
+import settings_store
+
+logger = logging.getLogger(__name__)
+
+TEMP_ROOT = os.path.join("storage", "temp")
+
+# Policy defaults, overridden by the temp_gc_* settings
+DEFAULT_MAX_AGE_DAYS = 14
+DEFAULT_QUOTA_GB = 10
+DEFAULT_QUOTA_MIN_IDLE_HOURS = 6
+GC_WORKERS = 8
+
+# Background collection: first run after START_DELAY, then every INTERVAL (seconds)
+GC_START_DELAY = 30
+GC_INTERVAL = 6 * 60 * 60
+
+
+def _measure(path):
+    """
+    Size, file count and last use of a directory tree.
+
+    Returns:
+        tuple: (bytes, files, last_used epoch seconds)
+    """
+    size = files = 0
+    last_used = 0.0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        # Directory access times change whenever a directory is
+                        # listed, this scan included, so only mtime counts
+                        last_used = max(last_used, stat.st_mtime)
+                        stack.append(entry.path)
+                    else:
+                        last_used = max(last_used, stat.st_mtime, stat.st_atime)
+                        size += stat.st_size
+                        files += 1
+        except OSError as e:
+            logger.warning(f"Could not read {current}: {e}")
+    try:
+        stat = os.stat(path)
+        last_used = max(last_used, stat.st_mtime)
+    except OSError:
+        pass
+    return size, files, last_used
+
+
+def _same_path(a, b):
+    return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+
+def protected_paths(current_temp_dir=None):
+    """
+    Temp directories that must not be collected.
+
+    Args:
+        current_temp_dir (str): The running session's temp_directory
+
+    Returns:
+        list: Protected directory paths
+    """
+    paths = [current_temp_dir] if current_temp_dir else []
+    try:
+        preserved = session_store.protected_temp_directory()
+        if preserved:
+            paths.append(preserved)
+    except Exception as e:
+        logger.warning(f"Could not read preserved session protection: {e}")
+    return paths
+
+
+def scan_temp_root(root=TEMP_ROOT, protected=(), workers=GC_WORKERS):
+    """
+    Index the run directories in root.
+
+    Args:
+        root (str): The temp root, normally storage/temp
+        protected (list): Directories that must not be deleted
+        workers (int): Directories measured in parallel
+
+    Returns:
+        list: One dict per directory: "path", "name", "size", "files",
+              "last_used" and "protected", most recently used first
+    """
+    try:
+        with os.scandir(root) as entries:
+            directories = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        measurements = list(pool.map(_measure, directories))
+
+    index = []
+    for path, (size, files, last_used) in zip(directories, measurements):
+        index.append({
+            "path": path,
+            "name": os.path.basename(path),
+            "size": size,
+            "files": files,
+            "last_used": last_used,
+            "protected": any(_same_path(path, p) for p in protected),
+        })
+    index.sort(key=lambda item: item["last_used"], reverse=True)
+    return index
+
+
+def select_for_deletion(index, max_age_days=DEFAULT_MAX_AGE_DAYS, quota_bytes=None,
+                        quota_min_idle_hours=DEFAULT_QUOTA_MIN_IDLE_HOURS, now=None):
+    """
+    Pick directories to delete under the age and quota policies.
+
+    Args:
+        index (list): Entries from scan_temp_root()
+        max_age_days (float): Delete directories unused for longer (None: no age limit)
+        quota_bytes (int): Then delete least recently used directories until
+            the total is at most this (None: no quota)
+        quota_min_idle_hours (float): The quota pass skips directories used
+            more recently than this, even if the total stays over the quota
+        now (float): Current time (default: time.time())
+
+    Returns:
+        list: (entry, reason) tuples, oldest first
+    """
+    now = time.time() if now is None else now
+    candidates = sorted((item for item in index if not item["protected"]), key=lambda item: item["last_used"])
+    selected = []
+    if max_age_days is not None:
+        cutoff = now - max_age_days * 86400
+        selected = [(item, f"unused for {(now - item['last_used']) / 86400:.0f} days")
+                    for item in candidates if item["last_used"] < cutoff]
+
+    if quota_bytes is not None:
+        chosen = {item["path"] for item, _ in selected}
+        total = sum(item["size"] for item in index if item["path"] not in chosen)
+        idle_cutoff = now - (quota_min_idle_hours or 0) * 3600
+        for item in candidates:
+            if total <= quota_bytes or item["last_used"] >= idle_cutoff:
+                break
+            if item["path"] not in chosen:
+                selected.append((item, "over quota"))
+                total -= item["size"]
+    return selected
+
+
+def remove_tree(path, workers=GC_WORKERS):
+    """
+    Delete a directory tree, removing files in parallel.
+
+    Symbolic links are removed, never followed, so the originals that OBJS/
+    links point to are untouched.
+
+    Args:
+        path (str): Directory to delete
+        workers (int): Threads removing files
+
+    Returns:
+        int: Number of files removed
+    """
+    files, directories = [], [path]
+    index = 0
+    while index < len(directories):
+        with os.scandir(directories[index]) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                else:
+                    files.append(entry.path)
+        index += 1
+
+    def unlink(file_path):
+        try:
+            os.unlink(file_path)
+        except FileNotFoundError:
+            pass
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(unlink, files, chunksize=64))
+    for directory in reversed(directories):  # Children before parents
+        os.rmdir(directory)
+    return len(files)
+
+
+def get_policy():
+    """
+    Current GC policy from the settings.
+
+    Returns:
+        dict: "enabled", "max_age_days", "quota_gb" and "quota_min_idle_hours"
+    """
+    settings = settings_store.get_settings()
+    return {
+        "enabled": bool(settings.get("temp_gc_enabled", True)),
+        "max_age_days": float(settings.get("temp_gc_max_age_days", DEFAULT_MAX_AGE_DAYS)),
+        "quota_gb": float(settings.get("temp_gc_quota_gb", DEFAULT_QUOTA_GB)),
+        "quota_min_idle_hours": float(settings.get("temp_gc_quota_min_idle_hours", DEFAULT_QUOTA_MIN_IDLE_HOURS)),
+    }
+
+
+def collect(root=TEMP_ROOT, current_temp_dir=None, max_age_days=None, quota_gb=None,
+            quota_min_idle_hours=None, dry_run=False):
+    """
+    Scan root and delete what the policy selects.
+
+    Args:
+        root (str): The temp root
+        current_temp_dir (str): The running session's temp_directory (kept)
+        max_age_days (float): Age limit (default: from settings)
+        quota_gb (float): Size quota in GB (default: from settings)
+        quota_min_idle_hours (float): Idle time before the quota may delete a
+            directory (default: from settings)
+        dry_run (bool): Only report what would be deleted
+
+    Returns:
+        dict: "scanned", "total_bytes", "deleted" [(entry, reason)],
+              "freed_bytes", "failed" [(entry, error)]
+    """
+    policy = get_policy()
+    max_age_days = policy["max_age_days"] if max_age_days is None else max_age_days
+    quota_gb = policy["quota_gb"] if quota_gb is None else quota_gb
+    if quota_min_idle_hours is None:
+        quota_min_idle_hours = policy["quota_min_idle_hours"]
+
+    with instrumentation.stage("temp_gc", root=root, dry_run=dry_run) as gc_info:
+        index = scan_temp_root(root, protected_paths(current_temp_dir))
+        selected = select_for_deletion(index, max_age_days, int(quota_gb * 1024 ** 3), quota_min_idle_hours)
+        report = {"scanned": len(index), "total_bytes": sum(item["size"] for item in index),
+                  "deleted": [], "freed_bytes": 0, "failed": []}
+        for item, reason in selected:
+            if dry_run:
+                report["deleted"].append((item, reason))
+                continue
+            try:
+                remove_tree(item["path"])
+            except Exception as e:
+                logger.error(f"Failed to delete temp directory {item['path']}: {e}")
+                report["failed"].append((item, str(e)))
+                continue
+            logger.info(f"Deleted temp directory {item['name']} ({item['size'] / 1024 ** 2:,.1f} MB, {reason})")
+            report["deleted"].append((item, reason))
+            report["freed_bytes"] += item["size"]
+        gc_info.update(scanned=report["scanned"], deleted=len(report["deleted"]),
+                       freed_bytes=report["freed_bytes"], failed=len(report["failed"]))
+    return report
+
+
+def start_background_gc(get_current_temp_dir=None, start_delay=GC_START_DELAY, interval=GC_INTERVAL):
+    """
+    Run collect() in a daemon thread, after start_delay and then every interval.
+
+    Args:
+        get_current_temp_dir (callable): Returns the running session's temp
+            directory at collection time
+        start_delay (float): Seconds before the first collection
+        interval (float): Seconds between collections
+
+    Returns:
+        threading.Event: Set it to stop the collector
+    """
+    stop = threading.Event()
+
+    def run():
+        delay = start_delay
+        while not stop.wait(delay):
+            delay = interval
+            if not get_policy()["enabled"]:
+                continue
+            try:
+                current = get_current_temp_dir() if get_current_temp_dir else None
+                report = collect(current_temp_dir=current)
+                if report["deleted"]:
+                    logger.info(f"Temp GC freed {report['freed_bytes'] / 1024 ** 2:,.1f} MB "
+                                f"from {len(report['deleted'])} of {report['scanned']} directories")
+            except Exception as e:
+                logger.error(f"Temp GC failed: {e}")
+
+    threading.Thread(target=run, name="temp-gc", daemon=True).start()
+    return stop
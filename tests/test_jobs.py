@@ -0,0 +1,33 @@
+"""
+Regression checks for jobs.py.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import instrumentation  # noqa: E402
+import jobs  # noqa: E402
+
+
+def test_submit_once_refuses_a_second_active_job(tmp_path):
+    instrumentation.configure_event_log(str(tmp_path / "events"))
+    release = threading.Event()
+    runner = jobs.JobRunner(max_concurrency=2)
+
+    first = runner.submit_once("update_csv", "Apply CSV updates", lambda job: release.wait(5))
+    assert first is not None
+    assert runner.submit_once("update_csv", "Apply CSV updates", lambda job: None) is None
+    other = runner.submit_once("merge_metadata", "Merge metadata", lambda job: None)
+    assert other is not None
+
+    release.set()
+    for job in (first, other):
+        while job.status not in jobs.FINISHED_STATES:
+            release.wait(0.01)
+    assert runner.submit_once("update_csv", "Apply CSV updates", lambda job: None) is not None
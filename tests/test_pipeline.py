@@ -0,0 +1,41 @@
+"""
+Regression checks for pipeline.py.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pipeline  # noqa: E402
+
+
+def make_frame(rows):
+    return pd.DataFrame({
+        "originating_system_id": [""] * rows,
+        "dc:identifier": [""] * rows,
+        "file_name_1": [f"file_{n:04d}.jpg" for n in range(rows)],
+        "dc:title": [f"File {n}" for n in range(rows)],
+        "collection_id": [""] * rows,
+        "dginfo": [""] * rows,
+    })
+
+
+def issued_ids(df):
+    return set(df["originating_system_id"]), set(df["dc:identifier"])
+
+
+def test_back_to_back_updates_never_repeat_ids():
+    first, _ = pipeline.apply_alma_updates(make_frame(300), "first.csv")
+    second, _ = pipeline.apply_alma_updates(make_frame(300), "second.csv")
+
+    first_ids, first_handles = issued_ids(first)
+    second_ids, second_handles = issued_ids(second)
+    assert len(first_ids) == len(second_ids) == 301
+    assert not first_ids & second_ids
+    assert not first_handles & second_handles
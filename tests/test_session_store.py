@@ -0,0 +1,45 @@
+"""
+Regression checks for session_store.py.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flet.core.session_storage import SessionStorage  # noqa: E402
+
+import session_store  # noqa: E402
+
+
+class Page:
+    """Keeps its session the way flet.Page does (a name-mangled private attribute)."""
+
+    def __init__(self):
+        self.__session_storage = SessionStorage(self)
+
+    @property
+    def session(self):
+        return self.__session_storage
+
+
+def test_install_keeps_existing_keys():
+    page = Page()
+    page.session.set("temp_directory", "storage/temp/run_01")
+    assert session_store.install(page)
+    assert isinstance(page.session, session_store.LazySessionStorage)
+    assert page.session.get("temp_directory") == "storage/temp/run_01"
+    assert not page.session.dirty_keys
+
+
+def test_install_warns_and_stays_eager_on_other_flet_versions(monkeypatch, caplog):
+    monkeypatch.setattr(session_store, "FLET_SESSION_VERSION", "0.0.0")
+    page = Page()
+    with caplog.at_level(logging.WARNING, logger="session_store"):
+        assert not session_store.install(page)
+    assert type(page.session) is SessionStorage
+    assert "load eagerly" in caplog.text
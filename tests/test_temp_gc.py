@@ -0,0 +1,37 @@
+"""
+Regression checks for temp_gc.py.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import temp_gc  # noqa: E402
+
+NOW = 1_000_000_000.0
+GB = 1024 ** 3
+
+
+def entry(name, hours_idle, size_gb, protected=False):
+    return {"path": f"/tmp/{name}", "name": name, "size": int(size_gb * GB), "files": 1,
+            "last_used": NOW - hours_idle * 3600, "protected": protected}
+
+
+def test_quota_skips_recently_used_directories():
+    """Over the quota, only directories idle for quota_min_idle_hours are deleted."""
+    index = [entry("building", 0.5, 8), entry("yesterday", 20, 4), entry("last_week", 24 * 7, 2)]
+    selected = temp_gc.select_for_deletion(index, max_age_days=None, quota_bytes=5 * GB,
+                                           quota_min_idle_hours=6, now=NOW)
+    assert [(item["name"], reason) for item, reason in selected] == [
+        ("last_week", "over quota"), ("yesterday", "over quota")]
+
+
+def test_age_limit_ignores_quota_idle_time():
+    index = [entry("recent", 1, 1), entry("old", 24 * 30, 1)]
+    selected = temp_gc.select_for_deletion(index, max_age_days=14, quota_bytes=None,
+                                           quota_min_idle_hours=24 * 365, now=NOW)
+    assert [item["name"] for item, _ in selected] == ["old"]
@@ -0,0 +1,40 @@
+"""
+Regression checks for utils.py.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: E402
+
+
+def brute_force_scores(targets, candidates, threshold):
+    """Every pair scored with score_normalized_match, no prefilter."""
+    return {
+        (t_idx, c_idx): score
+        for t_idx, target in enumerate(targets)
+        for c_idx, candidate in enumerate(candidates)
+        for score in [utils.score_normalized_match(utils.normalize_for_matching(target),
+                                                   utils.normalize_for_matching(candidate))]
+        if score >= threshold
+    }
+
+
+def test_assign_fuzzy_matches_prefilter_keeps_every_qualifying_pair():
+    targets = ["Box03_Folder12_007.jpg", "grinnell_00421_OBJ.tif", "Herrick, A. letter 1912.jpg",
+               "file_52.pdf", "Scarlet and Black 1965-03-12 p04.pdf"]
+    candidates = ["box03 folder12 007.jpg", "file_25.pdf", "grinnell-00421-OBJ.tif",
+                  "Herrick A letter 1912.tif", "scarlet_and_black_1965-03-12_p04.pdf", "unrelated.png"]
+    for threshold in (60, 80, 90):
+        scores = brute_force_scores(targets, candidates, threshold)
+        matches = utils.assign_fuzzy_matches(targets, candidates, threshold)
+        assert all(scores[(t_idx, c_idx)] == score for t_idx, c_idx, score in matches)
+        # Best-first assignment leaves no qualifying pair with both sides free
+        used_targets = {t_idx for t_idx, _, _ in matches}
+        used_candidates = {c_idx for _, c_idx, _ in matches}
+        assert not [pair for pair in scores if pair[0] not in used_targets and pair[1] not in used_candidates]
@@ -0,0 +1,79 @@
+"""
+Regression checks for watcher.py.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+
+import csv
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import instrumentation  # noqa: E402
+import pipeline  # noqa: E402
+import watcher  # noqa: E402
+
+
+def test_batches_share_one_id_source(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_run_ingest(csv_path, search_root, out_dir, **options):
+        calls.append(options)
+        return {"matched": 0, "unmatched": []}
+
+    monkeypatch.setattr(pipeline, "run_ingest", fake_run_ingest)
+    instrumentation.configure_event_log(str(tmp_path / "events"))
+    drop_watcher = watcher.DropFolderWatcher(str(tmp_path / "drop"), out_root=str(tmp_path / "out"),
+                                             ingest_options={"derivatives": False})
+    for name in ("batch_01.csv", "batch_02.csv"):
+        os.makedirs(drop_watcher.batch_dir(name))
+        csv_path = os.path.join(drop_watcher.drop_dir, name)
+        open(csv_path, "w").close()
+        drop_watcher.process(csv_path)
+
+    assert [options["new_id"] for options in calls] == [pipeline.new_unique_id] * 2
+    assert all(options["derivatives"] is False for options in calls)
+
+
+def write_batch(drop_dir, name, masters):
+    batch_dir = os.path.join(drop_dir, name)
+    os.makedirs(batch_dir)
+    for master in masters:
+        with open(os.path.join(batch_dir, master), "wb") as f:
+            f.write(name.encode())
+    with open(os.path.join(drop_dir, f"{name}.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["originating_system_id", "file_name_1", "dc:title", "dc:identifier", "dginfo"])
+        for master in masters:
+            writer.writerow(["", master, master, "", ""])
+    return os.path.join(drop_dir, f"{name}.csv")
+
+
+def test_batches_only_search_their_own_folder(tmp_path):
+    instrumentation.configure_event_log(str(tmp_path / "events"))
+    drop_dir = str(tmp_path / "drop")
+    drop_watcher = watcher.DropFolderWatcher(drop_dir, out_root=str(tmp_path / "out"),
+                                             ingest_options={"derivatives": False, "validate": False})
+    first = write_batch(drop_dir, "batch_a", ["scan_0001.jpg"])
+    second = write_batch(drop_dir, "batch_b", ["scan_0001.jpg"])
+
+    for csv_path, batch in ((first, "batch_a"), (second, "batch_b")):
+        report = drop_watcher.process(csv_path)
+        link = os.path.join(report["temp_dir"], "OBJS", "scan_0001.jpg")
+        assert os.path.realpath(link) == os.path.realpath(os.path.join(drop_dir, batch, "scan_0001.jpg"))
+
+
+def test_batch_without_its_folder_fails(tmp_path):
+    instrumentation.configure_event_log(str(tmp_path / "events"))
+    drop_dir = str(tmp_path / "drop")
+    drop_watcher = watcher.DropFolderWatcher(drop_dir, out_root=str(tmp_path / "out"),
+                                             ingest_options={"derivatives": False, "validate": False})
+    write_batch(drop_dir, "batch_a", ["scan_0001.jpg"])
+    orphan = os.path.join(drop_dir, "batch_b.csv")
+    shutil.copy(os.path.join(drop_dir, "batch_a.csv"), orphan)
+
+    assert drop_watcher.process(orphan) is None
+    assert os.path.exists(os.path.join(drop_dir, watcher.FAILED_DIR, "batch_b.csv"))
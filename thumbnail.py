@@ -22,10 +22,11 @@ For PDF processing:
 import os
 import io
 import logging
-from PIL import Image
-from PIL import ImageOps
-from PIL import ImageChops
-import fitz  # PyMuPDF
+
+import instrumentation
+
+# Pillow and PyMuPDF are imported inside each function so that importing this
+# module (and starting the app) does not pay for them until a derivative is made
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +48,8 @@ def generate_thumbnail(input_path, output_path, options):
     Returns:
         bool: True if successful, False otherwise
     """
+    from PIL import Image, ImageOps, ImageChops
+    
     try:
         width = options.get('width', 400)
         height = options.get('height', 400)
@@ -58,8 +61,12 @@ def generate_thumbnail(input_path, output_path, options):
         
         # Open the image
         with Image.open(input_path) as img:
-            # Handle EXIF orientation
-            img = ImageOps.exif_transpose(img)
+            with instrumentation.timer("thumbnail.decode"):
+                # Decode the pixels now (Image.open only reads the header)
+                img.load()
+                
+                # Handle EXIF orientation
+                img = ImageOps.exif_transpose(img)
             
             # Trim whitespace if requested
             if trim:
@@ -96,12 +103,14 @@ def generate_thumbnail(input_path, output_path, options):
             
             # Create thumbnail maintaining aspect ratio
             # thumbnail() modifies the image in-place and maintains aspect ratio
-            img.thumbnail((width, height), Image.Resampling.LANCZOS)
+            with instrumentation.timer("thumbnail.resize"):
+                img.thumbnail((width, height), Image.Resampling.LANCZOS)
             
             logger.info(f"Thumbnail size after resize: {img.size}")
             
             # Save as JPEG
-            img.save(output_path, 'JPEG', quality=quality, optimize=True)
+            with instrumentation.timer("thumbnail.encode"):
+                img.save(output_path, 'JPEG', quality=quality, optimize=True)
             
             logger.info(f"Successfully created thumbnail: {output_path}")
             return True
@@ -134,6 +143,9 @@ def generate_pdf_thumbnail(input_path, output_path, options):
     Returns:
         bool: True if successful, False otherwise
     """
+    from PIL import Image
+    import fitz  # PyMuPDF
+    
     try:
         width = options.get('width', 400)
         height = options.get('height', 400)
@@ -160,7 +172,8 @@ def generate_pdf_thumbnail(input_path, output_path, options):
         mat = fitz.Matrix(zoom, zoom)
         
         # Render page to pixmap (raster image)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
+        with instrumentation.timer("pdf_thumbnail.render"):
+            pix = page.get_pixmap(matrix=mat, alpha=False)
         
         logger.info(f"PDF page rendered, size: {pix.width}x{pix.height}")
         
@@ -174,12 +187,14 @@ def generate_pdf_thumbnail(input_path, output_path, options):
         logger.info(f"PDF converted to image, size: {img.size}")
         
         # Create thumbnail maintaining aspect ratio
-        img.thumbnail((width, height), Image.Resampling.LANCZOS)
+        with instrumentation.timer("pdf_thumbnail.resize"):
+            img.thumbnail((width, height), Image.Resampling.LANCZOS)
         
         logger.info(f"Thumbnail size after resize: {img.size}")
         
         # Save as JPEG
-        img.save(output_path, 'JPEG', quality=quality, optimize=True)
+        with instrumentation.timer("pdf_thumbnail.encode"):
+            img.save(output_path, 'JPEG', quality=quality, optimize=True)
         
         logger.info(f"Successfully created PDF thumbnail: {output_path}")
         return True
@@ -208,6 +223,8 @@ def get_image_info(input_path):
     Returns:
         dict: Dictionary containing image information (size, format, mode) or None on error
     """
+    from PIL import Image
+    
     try:
         with Image.open(input_path) as img:
             return {
@@ -0,0 +1,490 @@
+"""
+Alma S3 Upload Stage for Manage Digital Ingest
+
+This module uploads a temporary ingest directory (the temporary CSV, OBJS/
+and TN/) to the Alma upload area, replacing the serial "aws s3 cp
+--recursive" commands of the generated upload_to_alma.sh script:
+
+- Objects are uploaded by a bounded thread pool.
+- Files at or above MULTIPART_THRESHOLD are sent as multipart uploads, with
+  parts of PART_SIZE bytes.
+- Every finished object is appended to a checkpoint file in the temporary
+  directory (UPLOAD_CHECKPOINT). A re-run skips objects whose checkpoint
+  entry still matches the local file, so after a failure only the missing
+  objects are sent.
+- Objects already in the bucket with the same size and ETag are skipped.
+
+Where the objects go is up to a transport. S3Transport uses boto3 (pinned
+in python-requirements.txt), imported only when used. LocalTransport stores
+objects in a local directory with S3-style ETags, for testing and benchmarks
+without network access. Any object with the same methods can be used.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Alma upload area: s3://<ALMA_BUCKET>/<ALMA_UPLOAD_PREFIX>/<profile id>/<import id>/
+ALMA_BUCKET = "na-st01.ext.exlibrisgroup.com"
+ALMA_UPLOAD_PREFIX = "01GCL_INST/upload"
+DEFAULT_PROFILE_ID = "6496776180004641"
+
+UPLOAD_WORKERS = 8
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+PART_SIZE = 16 * 1024 * 1024
+MAX_RETRIES = 3
+RETRY_DELAY = 1.0  # Seconds before the first retry; doubled for each further retry
+
+# Per-object checkpoint, kept in the temporary directory
+UPLOAD_CHECKPOINT = "upload_checkpoint.jsonl"
+
+
+@lru_cache(maxsize=1)
+def boto3_available():
+    """Return True if boto3 can be imported."""
+    try:
+        import boto3  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def alma_prefix(profile_id, import_id):
+    """
+    Key prefix for one Alma import.
+
+    Args:
+        profile_id (str): Alma import profile id
+        import_id (str): Import id from the Alma Digital Uploader
+
+    Returns:
+        str: "<ALMA_UPLOAD_PREFIX>/<profile id>/<import id>/"
+    """
+    return f"{ALMA_UPLOAD_PREFIX}/{profile_id}/{import_id}/"
+
+
+def local_etag(path, part_size=PART_SIZE, multipart_threshold=MULTIPART_THRESHOLD):
+    """
+    Compute the ETag S3 gives a file uploaded with these settings.
+
+    Single-part uploads get the MD5 of the content; multipart uploads get the
+    MD5 of the concatenated part MD5s, followed by "-<number of parts>".
+
+    Args:
+        path (str): Local file
+        part_size (int): Multipart part size
+        multipart_threshold (int): Size at which multipart uploads are used
+
+    Returns:
+        str: The ETag, without quotes
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if size < multipart_threshold:
+            digest = hashlib.md5()
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+            return digest.hexdigest()
+        part_digests = [hashlib.md5(part).digest() for part in iter(lambda: f.read(part_size), b"")]
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+
+class S3Transport:
+    """
+    Uploads to an S3 bucket with boto3.
+    """
+
+    def __init__(self, bucket=ALMA_BUCKET, client=None):
+        """
+        Initialize the transport.
+
+        Args:
+            bucket (str): Bucket name
+            client: A boto3 S3 client (default: boto3.client("s3") with the
+                usual AWS credential lookup)
+        """
+        if client is None:
+            if not boto3_available():
+                raise RuntimeError("boto3 is not installed. Install with: pip install -r python-requirements.txt")
+            import boto3
+            client = boto3.client("s3")
+        self.bucket = bucket
+        self.client = client
+
+    def list_objects(self, prefix):
+        """Return {key: (size, etag)} for all objects under prefix."""
+        objects = {}
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                objects[item["Key"]] = (item["Size"], item["ETag"].strip('"'))
+        return objects
+
+    def put_object(self, key, path):
+        with open(path, "rb") as f:
+            response = self.client.put_object(Bucket=self.bucket, Key=key, Body=f)
+        return response["ETag"].strip('"')
+
+    def create_multipart_upload(self, key):
+        return self.client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+
+    def upload_part(self, key, upload_id, part_number, data):
+        response = self.client.upload_part(Bucket=self.bucket, Key=key, UploadId=upload_id,
+                                           PartNumber=part_number, Body=data)
+        return response["ETag"].strip('"')
+
+    def complete_multipart_upload(self, key, upload_id, part_etags):
+        parts = [{"PartNumber": number, "ETag": f'"{etag}"'} for number, etag in enumerate(part_etags, 1)]
+        response = self.client.complete_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id,
+                                                         MultipartUpload={"Parts": parts})
+        return response["ETag"].strip('"')
+
+    def abort_multipart_upload(self, key, upload_id):
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+    def describe(self):
+        return f"s3://{self.bucket}"
+
+
+class LocalTransport:
+    """
+    Stores objects as files under a local directory, with S3-style ETags.
+
+    Object metadata (size and ETag) is kept in <root>/.objects.json so
+    list_objects() does not have to hash anything.
+    """
+
+    def __init__(self, root):
+        """
+        Initialize the transport.
+
+        Args:
+            root (str): Directory standing in for the bucket (created if missing)
+        """
+        self.root = root
+        self._meta_path = os.path.join(root, ".objects.json")
+        self._parts_dir = os.path.join(root, ".multipart")
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._meta = json.load(f)
+        except (OSError, ValueError):
+            self._meta = {}
+
+    def _object_path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def _store(self, key, source_path, etag):
+        dest = self._object_path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        temp_path = f"{dest}.{uuid.uuid4().hex}.tmp"
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, dest)
+        with self._lock:
+            self._meta[key] = [os.path.getsize(dest), etag]
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump(self._meta, f)
+        return etag
+
+    def list_objects(self, prefix):
+        """Return {key: (size, etag)} for all objects under prefix."""
+        with self._lock:
+            return {key: tuple(value) for key, value in self._meta.items() if key.startswith(prefix)}
+
+    def put_object(self, key, path):
+        return self._store(key, path, local_etag(path, multipart_threshold=float("inf")))
+
+    def create_multipart_upload(self, key):
+        upload_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self._parts_dir, upload_id))
+        return upload_id
+
+    def upload_part(self, key, upload_id, part_number, data):
+        with open(os.path.join(self._parts_dir, upload_id, f"{part_number:05d}"), "wb") as f:
+            f.write(data)
+        return hashlib.md5(data).hexdigest()
+
+    def complete_multipart_upload(self, key, upload_id, part_etags):
+        upload_dir = os.path.join(self._parts_dir, upload_id)
+        joined = os.path.join(upload_dir, "joined")
+        with open(joined, "wb") as out:
+            for number in range(1, len(part_etags) + 1):
+                with open(os.path.join(upload_dir, f"{number:05d}"), "rb") as part:
+                    shutil.copyfileobj(part, out)
+        digest = hashlib.md5(b"".join(bytes.fromhex(etag) for etag in part_etags)).hexdigest()
+        try:
+            return self._store(key, joined, f"{digest}-{len(part_etags)}")
+        finally:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
+    def abort_multipart_upload(self, key, upload_id):
+        shutil.rmtree(os.path.join(self._parts_dir, upload_id), ignore_errors=True)
+
+    def describe(self):
+        return f"file://{os.path.abspath(self.root)}"
+
+
+def make_transport(target=None):
+    """
+    Create the transport for an upload target.
+
+    Args:
+        target (str): None or "" for the Alma bucket, "s3://<bucket>" for
+            another bucket, or "file://<dir>" / a directory path for LocalTransport
+
+    Returns:
+        S3Transport or LocalTransport
+    """
+    if not target:
+        return S3Transport(ALMA_BUCKET)
+    if target.startswith("s3://"):
+        return S3Transport(target[len("s3://"):].strip("/"))
+    if target.startswith("file://"):
+        target = target[len("file://"):]
+    return LocalTransport(target)
+
+
+def collect_upload_items(temp_dir, csv_filename=None):
+    """
+    List what the Alma upload sends: the temporary CSV, then OBJS/ and TN/.
+
+    As with "aws s3 cp --recursive", the files of both folders land directly
+    under the import prefix. values.csv is handled by Alma and never sent.
+
+    Args:
+        temp_dir (str): Temporary ingest directory
+        csv_filename (str): Name of the temporary CSV (default: every .csv in temp_dir)
+
+    Returns:
+        list: (local path, relative key) tuples
+    """
+    items = []
+    if csv_filename:
+        csv_names = [csv_filename]
+    else:
+        csv_names = sorted(name for name in os.listdir(temp_dir)
+                           if name.lower().endswith(".csv") and name.lower() != "values.csv")
+    for name in csv_names:
+        path = os.path.join(temp_dir, name)
+        if os.path.isfile(path):
+            items.append((path, name))
+
+    for folder in ("OBJS", "TN"):
+        folder_path = os.path.join(temp_dir, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for root, dirs, files in os.walk(folder_path):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                if os.path.isfile(path):  # Skips broken links
+                    items.append((path, os.path.relpath(path, folder_path).replace(os.sep, "/")))
+    return items
+
+
+class UploadCheckpoint:
+    """
+    Append-only record of finished uploads, one JSON object per line:
+    {"key", "size", "mtime", "etag"}. The last line for a key wins.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+                    except (ValueError, KeyError):
+                        continue  # Partially written last line
+
+    def is_done(self, key, size, mtime):
+        """Return True if key was uploaded from a file of this size and mtime."""
+        entry = self.entries.get(key)
+        return bool(entry) and entry["size"] == size and entry["mtime"] == mtime
+
+    def record(self, key, size, mtime, etag):
+        entry = {"key": key, "size": size, "mtime": mtime, "etag": etag}
+        with self._lock:
+            self.entries[key] = entry
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+
+
+class Uploader:
+    """
+    Uploads a list of files to a transport with a bounded worker pool.
+    """
+
+    def __init__(self, transport, prefix="", workers=UPLOAD_WORKERS, part_size=PART_SIZE,
+                 multipart_threshold=MULTIPART_THRESHOLD, checkpoint_path=None,
+                 max_retries=MAX_RETRIES, retry_delay=RETRY_DELAY, progress=None):
+        """
+        Initialize the uploader.
+
+        Args:
+            transport: S3Transport, LocalTransport or compatible object
+            prefix (str): Key prefix, e.g. alma_prefix(profile_id, import_id)
+            workers (int): Concurrent uploads
+            part_size (int): Multipart part size in bytes
+            multipart_threshold (int): Files at least this large use multipart uploads
+            checkpoint_path (str): Checkpoint file (None disables resume)
+            max_retries (int): Retries per object or part after a failure
+            retry_delay (float): Delay before the first retry, doubled per retry
+            progress (callable): Called as progress(stats) after each object,
+                from worker threads
+        """
+        self.transport = transport
+        self.prefix = prefix
+        self.workers = workers
+        self.part_size = part_size
+        self.multipart_threshold = multipart_threshold
+        self.checkpoint = UploadCheckpoint(checkpoint_path)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.progress = progress
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def cancel(self):
+        """Stop starting new objects; uploads in progress finish."""
+        self.cancel_event.set()
+
+    def _retry(self, what, func, *args):
+        """Call func, retrying with exponential backoff."""
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt == self.max_retries or self.cancel_event.is_set():
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                logger.warning(f"Upload of {what} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+
+    def _upload_multipart(self, key, path):
+        upload_id = self._retry(key, self.transport.create_multipart_upload, key)
+        try:
+            part_etags = []
+            with open(path, "rb") as f:
+                for number, data in enumerate(iter(lambda: f.read(self.part_size), b""), 1):
+                    if self.cancel_event.is_set():
+                        raise RuntimeError("Upload cancelled")
+                    part_etags.append(self._retry(f"{key} part {number}", self.transport.upload_part,
+                                                  key, upload_id, number, data))
+            return self._retry(key, self.transport.complete_multipart_upload, key, upload_id, part_etags)
+        except BaseException:
+            try:
+                self.transport.abort_multipart_upload(key, upload_id)
+            except Exception as e:
+                logger.warning(f"Failed to abort multipart upload of {key}: {e}")
+            raise
+
+    def _upload_one(self, path, key, remote):
+        """Upload one file unless it is already there. Returns "uploaded" or "skipped"."""
+        stat = os.stat(path)
+        size, mtime = stat.st_size, int(stat.st_mtime)
+        if self.checkpoint.is_done(key, size, mtime):
+            return "skipped", size
+        if key in remote and remote[key][0] == size:
+            etag = local_etag(path, self.part_size, self.multipart_threshold)
+            if remote[key][1] == etag:
+                self.checkpoint.record(key, size, mtime, etag)
+                return "skipped", size
+
+        if size >= self.multipart_threshold:
+            etag = self._upload_multipart(key, path)
+        else:
+            etag = self._retry(key, self.transport.put_object, key, path)
+        self.checkpoint.record(key, size, mtime, etag)
+        instrumentation.emit("upload.object", key=key, bytes=size)
+        return "uploaded", size
+
+    def _run_item(self, path, relative_key, remote):
+        key = self.prefix + relative_key
+        if self.cancel_event.is_set():
+            return
+        try:
+            outcome, size = self._upload_one(path, key, remote)
+        except Exception as e:
+            logger.error(f"Failed to upload {path} to {key}: {e}")
+            instrumentation.emit("upload.failed", key=key, error=str(e))
+            with self._lock:
+                self.stats["failed"].append((path, str(e)))
+        else:
+            with self._lock:
+                self.stats[outcome] += 1
+                self.stats["bytes_done"] += size
+                if outcome == "uploaded":
+                    self.stats["bytes_sent"] += size
+        self._report()
+
+    def _report(self):
+        with self._lock:
+            elapsed = max(time.perf_counter() - self._start, 1e-9)
+            self.stats["elapsed_s"] = elapsed
+            self.stats["objects_per_s"] = self.stats["uploaded"] / elapsed
+            self.stats["mb_per_s"] = self.stats["bytes_sent"] / elapsed / (1024 * 1024)
+            snapshot = dict(self.stats, failed=list(self.stats["failed"]))
+        if self.progress:
+            try:
+                self.progress(snapshot)
+            except Exception as e:
+                logger.warning(f"Upload progress callback failed: {e}")
+
+    def run(self, items):
+        """
+        Upload items, skipping those already uploaded.
+
+        Args:
+            items (list): (local path, relative key) tuples, e.g. from collect_upload_items()
+
+        Returns:
+            dict: Counts ("total", "uploaded", "skipped", "failed" [(path, error)],
+                  "retries"), bytes ("total_bytes", "bytes_done", "bytes_sent") and
+                  rates ("elapsed_s", "objects_per_s", "mb_per_s"); "cancelled" is
+                  True if cancel() was called
+        """
+        total_bytes = 0
+        for path, _ in items:
+            try:
+                total_bytes += os.path.getsize(path)
+            except OSError:
+                pass
+        self.stats = {"total": len(items), "uploaded": 0, "skipped": 0, "failed": [], "retries": 0,
+                      "total_bytes": total_bytes, "bytes_done": 0, "bytes_sent": 0,
+                      "elapsed_s": 0.0, "objects_per_s": 0.0, "mb_per_s": 0.0}
+        self._start = time.perf_counter()
+
+        with instrumentation.stage("upload", objects=len(items), bytes=total_bytes,
+                                   target=f"{self.transport.describe()}/{self.prefix}") as upload_info:
+            remote = self._retry("object listing", self.transport.list_objects, self.prefix)
+            with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+                for path, relative_key in items:
+                    pool.submit(self._run_item, path, relative_key, remote)
+            self._report()
+            self.stats["cancelled"] = self.cancel_event.is_set()
+            upload_info.update(uploaded=self.stats["uploaded"], skipped=self.stats["skipped"],
+                               failed=len(self.stats["failed"]), retries=self.stats["retries"],
+                               mb_per_s=round(self.stats["mb_per_s"], 2))
+        return self.stats
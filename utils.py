@@ -1,7 +1,6 @@
 import flet as ft
 import os
 import utils
-from thumbnail import generate_thumbnail
 # from azure.identity import DefaultAzureCredential
 # from azure.storage.blob import BlobServiceClient
 import json
@@ -9,6 +8,7 @@ import sys
 import logging
 import time
 from difflib import SequenceMatcher
+import instrumentation
 
 # Unique ID generation
 # ----------------------------------------------------------------------
@@ -31,9 +31,12 @@ def generate_unique_id(page):
     # Initialize the set of generated IDs in session if not present
     if not hasattr(page.session, 'generated_ids'):
         page.session.generated_ids = set()
+    if not hasattr(page.session, 'last_generated_epoch'):
+        page.session.last_generated_epoch = 0
     
-    # Start with current epoch time
-    epoch_time = int(time.time())
+    # Start with current epoch time, or just past the highest ID issued so far,
+    # so bulk merges don't re-probe every ID already handed out (O(n) per call)
+    epoch_time = max(int(time.time()), page.session.last_generated_epoch + 1)
     unique_id = f"dg_{epoch_time}"
     
     # Increment until we find a unique ID
@@ -43,6 +46,7 @@ def generate_unique_id(page):
     
     # Store the new ID in session
     page.session.generated_ids.add(unique_id)
+    page.session.last_generated_epoch = epoch_time
     
     return unique_id
 
@@ -112,6 +116,114 @@ def normalize_for_matching(value):
     value = value.lower()
     return value
 
+def score_normalized_match(normalized_target, normalized_candidate, target_label=None, candidate_label=None):
+    """
+    Score two already-normalized names, applying the numeric-only penalty.
+    
+    The score is the SequenceMatcher percentage. If the names score 90 or more
+    but differ only in their numbers (e.g. "file-52" vs "file-25"), 10 points
+    are subtracted so near-identical names with different numbers rank below
+    true matches.
+    
+    Args:
+        normalized_target (str): Output of normalize_for_matching() for the target
+        normalized_candidate (str): Output of normalize_for_matching() for the candidate
+        target_label (str): Original target name, used only for logging
+        candidate_label (str): Original candidate name, used only for logging
+        
+    Returns:
+        int: Match percentage (0-100)
+    """
+    import re
+    
+    ratio = calculate_string_similarity(normalized_candidate, normalized_target)
+    
+    # Check if difference is purely numeric and apply penalty
+    if ratio >= 90:
+        # Extract all numeric sequences from both NORMALIZED filenames
+        target_numbers = set(re.findall(r'\d+', normalized_target))
+        match_numbers = set(re.findall(r'\d+', normalized_candidate))
+        
+        # If they have different numbers but everything else matches closely
+        if target_numbers != match_numbers:
+            # Check if non-numeric parts are very similar
+            target_non_numeric = re.sub(r'\d+', '#', normalized_target)
+            match_non_numeric = re.sub(r'\d+', '#', normalized_candidate)
+            
+            # If non-numeric parts match exactly, this is likely a numeric-only difference
+            if target_non_numeric == match_non_numeric:
+                ratio = max(0, ratio - 10)
+                logging.info(f"Applied 10-point penalty for numeric-only difference: '{target_label or normalized_target}' vs '{candidate_label or normalized_candidate}' (ratio: {ratio + 10} -> {ratio})")
+    
+    return ratio
+
+# Targets scored per rapidfuzz.process.cdist call in assign_fuzzy_matches
+FUZZY_BLOCK_ROWS = 1024
+
+def assign_fuzzy_matches(targets, candidates, threshold=90):
+    """
+    Fuzzy-match two lists of names and assign each candidate to at most one target.
+    
+    Every target is scored against every candidate with the same rules as
+    perform_fuzzy_search (normalize_for_matching plus the numeric-only penalty).
+    Each name is normalized once, then all pairs are scored in batched
+    rapidfuzz.process.cdist calls (FUZZY_BLOCK_ROWS targets at a time) with
+    fuzz.ratio. That score (2 * LCS / total length) is never below the
+    SequenceMatcher percentage, so it is a safe
+    prefilter: only pairs reaching the threshold there get the full
+    score_normalized_match. Matches are then assigned best-first across all
+    pairs, so the highest scoring pair always wins and no two targets can
+    claim the same candidate.
+    
+    Args:
+        targets (list): Names to find matches for
+        candidates (list): Names that may be matched
+        threshold (int): The minimum match percentage to accept (0-100)
+        
+    Returns:
+        list: (target_index, candidate_index, score) tuples, best scores first
+    """
+    import numpy as np
+    from rapidfuzz import fuzz, process
+    
+    normalized_targets = [normalize_for_matching(t) for t in targets]
+    normalized_candidates = [normalize_for_matching(c) for c in candidates]
+    
+    scored_pairs = []
+    if not normalized_targets or not normalized_candidates:
+        return []
+    # Targets are scored in blocks so the score matrix stays small (uint8,
+    # FUZZY_BLOCK_ROWS x candidates); the cutoff is one point lower to
+    # allow for rounding in the uint8 scores
+    for block_start in range(0, len(normalized_targets), FUZZY_BLOCK_ROWS):
+        block = normalized_targets[block_start:block_start + FUZZY_BLOCK_ROWS]
+        upper_bounds = process.cdist(
+            block, normalized_candidates, scorer=fuzz.ratio, dtype=np.uint8,
+            score_cutoff=max(0, threshold - 1), workers=-1
+        )
+        for row, c_idx in zip(*np.nonzero(upper_bounds >= max(0, threshold - 1))):
+            t_idx = block_start + int(row)
+            c_idx = int(c_idx)
+            score = score_normalized_match(
+                normalized_targets[t_idx], normalized_candidates[c_idx],
+                target_label=targets[t_idx], candidate_label=candidates[c_idx]
+            )
+            if score >= threshold:
+                scored_pairs.append((score, t_idx, c_idx))
+    
+    # Best-first global assignment; ties resolve in input order
+    scored_pairs.sort(key=lambda pair: (-pair[0], pair[1], pair[2]))
+    assigned_targets = set()
+    assigned_candidates = set()
+    matches = []
+    for score, t_idx, c_idx in scored_pairs:
+        if t_idx in assigned_targets or c_idx in assigned_candidates:
+            continue
+        assigned_targets.add(t_idx)
+        assigned_candidates.add(c_idx)
+        matches.append((t_idx, c_idx, score))
+    return matches
+
 def perform_fuzzy_search(base_path, target_filename, threshold=90):
     """
     Recursively search for files in base_path and find the best match for target_filename
@@ -131,8 +243,6 @@ def perform_fuzzy_search(base_path, target_filename, threshold=90):
     Returns:
         tuple: (best_match_path, best_match_ratio) or (None, 0) if no match found
     """
-    import re
-    
     try:
         best_match_path = None
         best_match_ratio = 0
@@ -140,32 +250,23 @@ def perform_fuzzy_search(base_path, target_filename, threshold=90):
         # Normalize the target filename for matching
         normalized_target = normalize_for_matching(target_filename)
         
+        # Walk the tree first, then score, so each part is timed on its own
+        with instrumentation.timer("search.walk"):
+            candidates = [(root, filename) for root, dirs, files in os.walk(base_path) for filename in files]
+        instrumentation.count("search.candidates", len(candidates))
+        
         # Search through ALL files to find the absolute best match
         # Don't terminate early, even on 100% match, to ensure we find the best one
-        for root, dirs, files in os.walk(base_path):
-            for filename in files:
+        with instrumentation.timer("search.score"):
+            for root, filename in candidates:
                 # Normalize both filenames before comparison
                 normalized_candidate = normalize_for_matching(filename)
                 
-                # Calculate sequence-based similarity ratio on normalized names
-                ratio = calculate_string_similarity(normalized_candidate, normalized_target)
-                
-                # Check if difference is purely numeric and apply penalty
-                if ratio > 0:
-                    # Extract all numeric sequences from both NORMALIZED filenames
-                    target_numbers = set(re.findall(r'\d+', normalized_target))
-                    match_numbers = set(re.findall(r'\d+', normalized_candidate))
-                    
-                    # If they have different numbers but everything else matches closely
-                    if target_numbers != match_numbers and ratio >= 90:
-                        # Check if non-numeric parts are very similar
-                        target_non_numeric = re.sub(r'\d+', '#', normalized_target)
-                        match_non_numeric = re.sub(r'\d+', '#', normalized_candidate)
-                        
-                        # If non-numeric parts match exactly, this is likely a numeric-only difference
-                        if target_non_numeric == match_non_numeric:
-                            ratio = max(0, ratio - 10)
-                            logging.info(f"Applied 10-point penalty for numeric-only difference: '{target_filename}' vs '{filename}' (ratio: {ratio + 10} -> {ratio})")
+                # Sequence-based similarity with the numeric-only penalty
+                ratio = score_normalized_match(
+                    normalized_target, normalized_candidate,
+                    target_label=target_filename, candidate_label=filename
+                )
                 
                 # Update best match if this ratio is higher
                 if ratio > best_match_ratio:
@@ -202,27 +303,37 @@ def perform_fuzzy_search_batch(base_path, target_filenames, threshold=90, progre
         # Start with 0% progress
         progress_callback(0)
     
-    for index, filename in enumerate(target_filenames):
-        # Check for cancellation
-        if cancel_check and cancel_check():
-            logging.info("Fuzzy search cancelled by user")
-            return None
+    with instrumentation.stage("search", base_path=base_path, targets=total_files,
+                               threshold=threshold) as stage_info:
+        matched = 0
+        for index, filename in enumerate(target_filenames):
+            # Check for cancellation
+            if cancel_check and cancel_check():
+                logging.info("Fuzzy search cancelled by user")
+                stage_info.update(cancelled=True, searched=index, matched=matched)
+                return None
+                
+            logging.info(f"Searching for match to '{filename}' ({index + 1}/{total_files})")
             
-        logging.info(f"Searching for match to '{filename}' ({index + 1}/{total_files})")
-        
-        # Update progress after each file
-        if progress_callback:
-            progress = (index + 1) / total_files
-            progress_callback(progress)
+            # Update progress after each file
+            if progress_callback:
+                progress = (index + 1) / total_files
+                progress_callback(progress)
+                
+            target_start = time.perf_counter()
+            match_path, ratio = perform_fuzzy_search(base_path, filename, threshold)
+            results[filename] = (match_path, ratio)
+            is_match = bool(match_path) and ratio >= threshold
+            matched += is_match
+            instrumentation.emit("search.match", target=filename, match=match_path, ratio=ratio,
+                                 matched=is_match, duration_s=round(time.perf_counter() - target_start, 6))
             
-        match_path, ratio = perform_fuzzy_search(base_path, filename, threshold)
-        results[filename] = (match_path, ratio)
-        
-        # Log the result
-        if match_path and ratio >= threshold:
-            logging.info(f"Found match for '{filename}': {match_path} ({ratio}% match)")
-        else:
-            logging.info(f"No match found for '{filename}' meeting {threshold}% threshold")
+            # Log the result
+            if is_match:
+                logging.info(f"Found match for '{filename}': {match_path} ({ratio}% match)")
+            else:
+                logging.info(f"No match found for '{filename}' meeting {threshold}% threshold")
+        stage_info.update(searched=total_files, matched=matched)
     
     # Only show 100% if we completed the search (not cancelled)
     if progress_callback:
@@ -362,12 +473,68 @@ def show_message(page, text, is_error=False):
     page.update()
 
 
+# Verified CSV headings, cached in memory and invalidated by file mtime
+# ------------------------------------------------------------
+VERIFIED_HEADINGS_FILES = {
+    'Alma': os.path.join("_data", "verified_CSV_headings_for_Alma-D.csv"),
+    'CollectionBuilder': os.path.join("_data", "verified_CSV_headings_for_GCCB_projects.csv"),
+}
+
+# {verified_file: (mtime, headings_tuple)}
+_verified_headings_cache = {}
+
+
+def get_verified_headings(mode):
+    """
+    Get the verified CSV headings for a mode, in file order.
+    
+    The headings file is only re-read when its modification time changes,
+    so repeated validations cost one stat() call.
+    
+    Args:
+        mode: Either 'Alma' or 'CollectionBuilder'
+        
+    Returns:
+        tuple: The verified headings
+        
+    Raises:
+        KeyError: If mode is not a known mode
+        OSError: If the verified headings file cannot be read
+    """
+    import csv_io
+    
+    verified_file = VERIFIED_HEADINGS_FILES[mode]
+    mtime = os.path.getmtime(verified_file)
+    cached = _verified_headings_cache.get(verified_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    headings = tuple(csv_io.read_csv_header(verified_file))
+    _verified_headings_cache[verified_file] = (mtime, headings)
+    logging.info(f"Cached {len(headings)} verified headings from {verified_file}")
+    return headings
+
+
+def preload_verified_headings():
+    """Load every available verified headings file into the cache at startup."""
+    for mode, verified_file in VERIFIED_HEADINGS_FILES.items():
+        if os.path.exists(verified_file):
+            try:
+                get_verified_headings(mode)
+            except Exception as e:
+                logging.warning(f"Failed to preload verified headings for {mode}: {e}")
+
+
 # Validate CSV headings against verified heading files
 # ------------------------------------------------------------
 def validate_csv_headings(csv_file_path, mode):
     """
     Validate CSV file headings against verified heading files based on mode.
     
+    Only the header line of the CSV is read (with the stdlib csv module), and
+    the verified headings come from an in-memory cache, so validation does not
+    import pandas or parse any data rows.
+    
     Args:
         csv_file_path: Path to the CSV file to validate
         mode: Either 'Alma' or 'CollectionBuilder'
@@ -385,14 +552,11 @@ def validate_csv_headings(csv_file_path, mode):
           but extra headings are allowed (more permissive).
         - Order of headings does not matter, only the names.
     """
-    import pandas as pd
+    import csv_io
     
     # Determine which verified headings file to use
-    if mode == 'Alma':
-        verified_file = os.path.join("_data", "verified_CSV_headings_for_Alma-D.csv")
-    elif mode == 'CollectionBuilder':
-        verified_file = os.path.join("_data", "verified_CSV_headings_for_GCCB_projects.csv")
-    else:
+    verified_file = VERIFIED_HEADINGS_FILES.get(mode)
+    if verified_file is None:
         return (False, [], f"Invalid mode '{mode}'. Must be 'Alma' or 'CollectionBuilder'.")
     
     # Check if verified file exists
@@ -404,26 +568,21 @@ def validate_csv_headings(csv_file_path, mode):
         return (False, [], f"CSV file not found: {csv_file_path}")
     
     try:
-        # Read the verified headings (first row only)
-        verified_df = pd.read_csv(verified_file, nrows=0, dtype=str, keep_default_na=False)
-        verified_headings = set(verified_df.columns.tolist())
-        
-        # Read the CSV file headings (first row only) with multiple encodings
-        csv_df = None
-        encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'utf-16']
+        verified_headings = set(get_verified_headings(mode))
         
-        for encoding in encodings:
+        # Read the CSV file headings (first line only) with multiple encodings
+        csv_columns = None
+        for encoding in csv_io.CSV_ENCODINGS:
             try:
-                # Read all columns as strings to prevent scientific notation
-                csv_df = pd.read_csv(csv_file_path, nrows=0, encoding=encoding, dtype=str, keep_default_na=False)
+                csv_columns = csv_io.read_csv_header(csv_file_path, encoding=encoding)
                 break
             except (UnicodeDecodeError, UnicodeError):
                 continue
         
-        if csv_df is None:
+        if csv_columns is None:
             return (False, [], f"Could not read CSV file with any supported encoding")
         
-        csv_headings = set(csv_df.columns.tolist())
+        csv_headings = set(csv_columns)
         
         # Find headings in CSV that are NOT in verified list
         unmatched_headings = list(csv_headings - verified_headings)
@@ -2,38 +2,44 @@
 Views package for Manage Digital Ingest Application
 
 This package contains all view classes for the application.
+
+Classes are imported on first access (PEP 562 module __getattr__), so
+"from views import HomeView" only loads home_view and not every view and its
+dependencies (pandas, Pillow, PyMuPDF).
 """
 
-from .base_view import BaseView
-from .home_view import HomeView
-from .about_view import AboutView
-from .settings_view import SettingsView
-from .exit_view import ExitView
-from .file_selector_view import (
-    FileSelectorView,
-    FilePickerSelectorView,
-    CSVSelectorView
-)
-from .derivatives_view import DerivativesView
-from .storage_view import StorageView
-from .instructions_view import InstructionsView
-from .update_csv_view import UpdateCSVView
-from .log_view import LogView
-from .log_overlay import LogOverlay
-
-__all__ = [
-    'BaseView',
-    'HomeView',
-    'AboutView',
-    'SettingsView',
-    'ExitView',
-    'FileSelectorView',
-    'FilePickerSelectorView',
-    'CSVSelectorView',
-    'DerivativesView',
-    'StorageView',
-    'InstructionsView',
-    'UpdateCSVView',
-    'LogView',
-    'LogOverlay'
-]
\ No newline at end of file
+import importlib
+
+# Class name -> submodule that defines it
+_VIEW_MODULES = {
+    'BaseView': 'base_view',
+    'HomeView': 'home_view',
+    'AboutView': 'about_view',
+    'SettingsView': 'settings_view',
+    'ExitView': 'exit_view',
+    'FileSelectorView': 'file_selector_view',
+    'FilePickerSelectorView': 'file_selector_view',
+    'CSVSelectorView': 'file_selector_view',
+    'DerivativesView': 'derivatives_view',
+    'StorageView': 'storage_view',
+    'InstructionsView': 'instructions_view',
+    'UpdateCSVView': 'update_csv_view',
+    'LogView': 'log_view',
+    'LogOverlay': 'log_overlay',
+    'PagedDataTable': 'paged_table',
+}
+
+__all__ = list(_VIEW_MODULES)
+
+
+def __getattr__(name):
+    module_name = _VIEW_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,16 +1,26 @@
 """
 About View for Manage Digital Ingest Application
 
-This module contains the AboutView class for displaying application information
-and session data.
+This module contains the AboutView class for displaying application information,
+session data and the live performance table (per-stage timings from the
+instrumentation registry).
 """
 
 import flet as ft
 from views.base_view import BaseView
 import utils
 import logging
-import json
 import os
+import time
+from datetime import datetime
+import instrumentation
+import session_store
+
+# Seconds between refreshes of the performance table while the About view is shown
+PERF_REFRESH_INTERVAL = 1.0
+
+# Directory that receives exported performance snapshots
+METRICS_EXPORT_DIR = "logs"
 
 
 class AboutView(BaseView):
@@ -18,44 +28,27 @@ class AboutView(BaseView):
     About view class for displaying application information and demo logging.
     """
     
-    PERSISTENT_SESSION_FILE = "storage/data/persistent_session.json"
+    PERSISTENT_SESSION_FILE = session_store.PERSISTENT_SESSION_FILE
     
     def preserve_session(self, e):
         """
-        Save all session data to a persistent JSON file and protect temp directory.
+        Save all session data to persistent storage and protect temp directory.
+        Small values go to a JSON file; large collections go to side files that
+        are only rewritten when they changed (see session_store).
         """
         try:
             # Ensure storage/data directory exists
             os.makedirs(os.path.dirname(self.PERSISTENT_SESSION_FILE), exist_ok=True)
             
-            # Collect all session data
-            session_data = {}
-            for key in self.page.session.get_keys():
-                value = self.page.session.get(key)
-                # Convert to JSON-serializable format
-                if isinstance(value, (str, int, float, bool, type(None))):
-                    session_data[key] = value
-                elif isinstance(value, (list, dict)):
-                    session_data[key] = value
-                else:
-                    # For other types, convert to string representation
-                    session_data[key] = str(value)
+            key_count, files_written = session_store.preserve(self.page.session)
             
-            # Add a flag to mark temp directory as protected
             temp_directory = self.page.session.get("temp_directory")
-            if temp_directory:
-                session_data["_temp_protected"] = True
-            
-            # Save to JSON file
-            with open(self.PERSISTENT_SESSION_FILE, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2)
-            
-            self.logger.info(f"Preserved {len(session_data)} session keys to {self.PERSISTENT_SESSION_FILE}")
+            self.logger.info(f"Preserved {key_count} session keys to {self.PERSISTENT_SESSION_FILE} ({files_written} side files written)")
             if temp_directory:
                 self.logger.info(f"Protected temporary directory: {temp_directory}")
             
             self.page.snack_bar = ft.SnackBar(
-                content=ft.Text(f"Session preserved! {len(session_data)} keys saved."),
+                content=ft.Text(f"Session preserved! {key_count} keys saved."),
                 bgcolor=ft.Colors.GREEN_600
             )
             self.page.snack_bar.open = True
@@ -84,9 +77,8 @@ class AboutView(BaseView):
             for key in session_keys:
                 self.page.session.remove(key)
             
-            # Delete the persistent session file if it exists
-            if os.path.exists(self.PERSISTENT_SESSION_FILE):
-                os.remove(self.PERSISTENT_SESSION_FILE)
+            # Delete the persistent session files if they exist
+            if session_store.delete_preserved():
                 self.logger.info(f"Deleted persistent session file: {self.PERSISTENT_SESSION_FILE}")
             
             self.logger.info(f"Cleared {key_count} session keys - session reset to pristine state")
@@ -110,27 +102,17 @@ class AboutView(BaseView):
     @staticmethod
     def restore_session(page):
         """
-        Restore session data from persistent JSON file if it exists.
-        Should be called during app initialization.
+        Restore session data from persistent storage if it exists.
+        Should be called during app initialization. Large collections are
+        loaded on first access rather than here.
         
         Args:
             page: The Flet page object
         """
         try:
-            persistent_file = "storage/data/persistent_session.json"
-            if os.path.exists(persistent_file):
-                with open(persistent_file, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-                
-                # Restore all session keys
-                for key, value in session_data.items():
-                    if key != "_temp_protected":  # Don't restore the protection flag itself
-                        page.session.set(key, value)
-                
-                # Log restoration
+            session_data = session_store.restore(page.session)
+            if session_data is not None:
                 logger = logging.getLogger(__name__)
-                logger.info(f"Restored {len(session_data)} session keys from {persistent_file}")
-                
                 temp_dir = session_data.get("temp_directory")
                 if temp_dir and session_data.get("_temp_protected"):
                     logger.info(f"Restored protected temporary directory: {temp_dir}")
@@ -142,6 +124,135 @@ class AboutView(BaseView):
         
         return False
     
+    def build_performance_rows(self, snapshot, colors):
+        """
+        Create one table row per timer, followed by one per counter.
+        
+        Args:
+            snapshot (dict): instrumentation.get_metrics().snapshot()
+            colors (dict): Theme colors
+        
+        Returns:
+            list: ft.DataRow objects
+        """
+        def cell(value, bold=False):
+            return ft.DataCell(ft.Text(value, size=12, color=colors['container_text'],
+                                       weight=ft.FontWeight.BOLD if bold else None))
+        
+        def ms(seconds):
+            return "-" if seconds is None else f"{seconds * 1000:,.1f}"
+        
+        rows = []
+        for name, stats in snapshot["timers"].items():
+            rows.append(ft.DataRow(cells=[
+                cell(name, bold=True),
+                cell(f"{stats['calls']:,}"),
+                cell(f"{stats['total_s']:,.3f}"),
+                cell(ms(stats['mean_s'])),
+                cell(ms(stats['p50_s'])),
+                cell(ms(stats['p95_s'])),
+                cell(ms(stats['max_s'])),
+            ]))
+        for name, value in snapshot["counters"].items():
+            rows.append(ft.DataRow(cells=[cell(name, bold=True), cell(f"{value:,}")] + [cell("")] * 5))
+        return rows
+    
+    def refresh_performance(self, e=None):
+        """Redraw the performance table from the registry."""
+        colors = self.get_theme_colors()
+        metrics = instrumentation.get_metrics()
+        self.perf_version = metrics.version
+        snapshot = metrics.snapshot()
+        self.perf_table.rows = self.build_performance_rows(snapshot, colors)
+        since = datetime.fromtimestamp(snapshot["since"]).strftime("%Y-%m-%d %H:%M:%S")
+        if snapshot["timers"] or snapshot["counters"]:
+            self.perf_summary.value = f"Since {since}; times in milliseconds except Total"
+        else:
+            self.perf_summary.value = f"Nothing measured since {since} - run a search, derivatives or CSV update"
+        self.page.update()
+    
+    def follow_performance(self, table):
+        """
+        Refresh the performance table while it is shown and the registry changes.
+        
+        Runs in a background thread (page.run_thread).
+        
+        Args:
+            table (ft.DataTable): The table being followed
+        """
+        while True:
+            time.sleep(PERF_REFRESH_INTERVAL)
+            if self.page.route != "/about" or self.perf_table is not table:
+                return
+            if instrumentation.get_metrics().version == self.perf_version:
+                continue
+            try:
+                self.refresh_performance()
+            except Exception as ex:
+                self.logger.error(f"Error refreshing performance table: {ex}")
+                return
+    
+    def reset_performance(self, e):
+        """Clear all timers and counters."""
+        instrumentation.get_metrics().reset()
+        self.logger.info("Performance counters reset")
+        self.refresh_performance()
+    
+    def export_performance(self, e):
+        """Write the current timers and counters to logs/metrics-<timestamp>.json."""
+        path = os.path.join(METRICS_EXPORT_DIR, f"metrics-{datetime.now():%Y%m%d_%H%M%S}.json")
+        try:
+            instrumentation.get_metrics().export(path)
+        except OSError as ex:
+            self.logger.error(f"Error exporting performance data: {ex}")
+            self.show_snack(f"Export failed: {ex}", is_error=True)
+            return
+        self.logger.info(f"Exported performance data to {path}")
+        self.show_snack(f"Performance data exported to {path}")
+    
+    def build_performance_panel(self):
+        """Create the performance section: the live table and its buttons."""
+        colors = self.get_theme_colors()
+        self.perf_summary = ft.Text("", size=11, italic=True, color=colors['secondary_text'])
+        self.perf_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Stage")),
+                ft.DataColumn(ft.Text("Calls"), numeric=True),
+                ft.DataColumn(ft.Text("Total s"), numeric=True),
+                ft.DataColumn(ft.Text("Mean"), numeric=True),
+                ft.DataColumn(ft.Text("p50"), numeric=True),
+                ft.DataColumn(ft.Text("p95"), numeric=True),
+                ft.DataColumn(ft.Text("Max"), numeric=True),
+            ],
+            rows=[],
+            column_spacing=24,
+            data_row_min_height=28,
+            data_row_max_height=28,
+        )
+        metrics = instrumentation.get_metrics()
+        self.perf_version = metrics.version
+        self.perf_table.rows = self.build_performance_rows(metrics.snapshot(), colors)
+        self.perf_summary.value = "Times in milliseconds except Total"
+        
+        return ft.Column([
+            ft.Text("Performance", size=18, weight=ft.FontWeight.BOLD, color=colors['primary_text']),
+            self.perf_summary,
+            ft.Container(
+                content=ft.Column([self.perf_table], scroll=ft.ScrollMode.AUTO),
+                padding=10,
+                width=800,
+                height=300,
+                bgcolor=colors['container_bg'],
+                border=ft.border.all(1, colors['border']),
+                border_radius=8,
+            ),
+            ft.Row([
+                ft.ElevatedButton("Refresh", icon=ft.Icons.REFRESH, on_click=self.refresh_performance),
+                ft.ElevatedButton("Reset", icon=ft.Icons.RESTART_ALT, on_click=self.reset_performance),
+                ft.ElevatedButton("Export JSON", icon=ft.Icons.DOWNLOAD, on_click=self.export_performance),
+            ], alignment=ft.MainAxisAlignment.CENTER, spacing=10),
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=6)
+    
     def render(self) -> ft.Column:
         """
         Render the about view content.
@@ -172,9 +283,13 @@ class AboutView(BaseView):
 
         # Get all session keys and values
         for key in self.page.session.get_keys():
-            value = self.page.session.get(key)
-            # Don't truncate - show full values
-            value_str = str(value)
+            if session_store.is_loaded(self.page.session, key):
+                value = self.page.session.get(key)
+                # Don't truncate - show full values
+                value_str = str(value)
+            else:
+                # Preserved collections stay on disk until a view needs them
+                value_str = "(preserved collection - loads on first use)"
             session_lines.append(
                 ft.Column([
                     ft.Text(f"{key}:", size=14, weight=ft.FontWeight.BOLD, color=colors['primary_text']),
@@ -197,6 +312,10 @@ class AboutView(BaseView):
 
         # Read config from _data/config.json
         config = utils.read_config()
+        
+        # Live per-stage timings, refreshed in the background while shown
+        performance_panel = self.build_performance_panel()
+        self.page.run_thread(self.follow_performance, self.perf_table)
 
         return ft.Column(
             scroll=ft.ScrollMode.AUTO,
@@ -257,6 +376,8 @@ class AboutView(BaseView):
                         color=ft.Colors.WHITE
                     ),
                 ], alignment=ft.MainAxisAlignment.CENTER, spacing=10),
+                ft.Divider(height=15, color=colors['divider']),
+                performance_panel,
                 ft.Container(height=20),
             ],
         )
\ No newline at end of file
@@ -7,7 +7,10 @@ This module contains the DerivativesView class for creating file derivatives.
 import flet as ft
 from views.base_view import BaseView
 import os
-from thumbnail import generate_thumbnail, generate_pdf_thumbnail
+import time
+import instrumentation
+import jobs
+import pipeline
 
 
 class DerivativesView(BaseView):
@@ -21,6 +24,7 @@ class DerivativesView(BaseView):
         self.log_view = None
         self.processing = False
         self.cancel_processing = False
+        self.job = None
     
     def create_single_derivative(self, file_path, mode, derivative_type='thumbnail'):
         """
@@ -35,70 +39,19 @@ class DerivativesView(BaseView):
             tuple: (success: bool, result: str)
         """
         try:
-            # Check for spaces in the file path
-            if any(char.isspace() for char in file_path):
-                error_msg = f"File path '{file_path}' contains spaces! This should not happen with temp files."
+            if mode != 'Alma':
+                error_msg = f"Unsupported mode: {mode} (only 'Alma' supported)"
                 self.logger.error(error_msg)
                 return False, error_msg
             
-            # Parse file path components
-            dirname, basename = os.path.split(file_path)
-            root, ext = os.path.splitext(basename)
-            
-            # Determine the base temp directory (go up one level from OBJS)
-            if dirname.endswith('OBJS'):
-                temp_base_dir = os.path.dirname(dirname)
-            else:
-                temp_base_dir = dirname
-            
+            # Alma mode - thumbnail with .jpg.clientThumb extension in TN/ beside OBJS/
             self.logger.info(f"Processing file: {file_path}")
-            self.logger.info(f"Directory: {dirname}, Basename: {basename}, Root: {root}, Extension: {ext}")
-            self.logger.info(f"Temp base directory: {temp_base_dir}")
-            
-            if mode == 'Alma':
-                # Alma mode - create thumbnail with .jpg.clientThumb extension in TN/ directory
-                tn_dir = os.path.join(temp_base_dir, 'TN')
-                os.makedirs(tn_dir, exist_ok=True)
-                derivative_filename = f"{root}.jpg.clientThumb"
-                derivative_path = os.path.join(tn_dir, derivative_filename)
-                self.logger.info(f"Alma derivative path: {derivative_path}")
-                
-                # Define options for Alma thumbnails
-                options = {
-                    'trim': False,
-                    'height': 200,
-                    'width': 200,
-                    'quality': 85,
-                    'type': 'thumbnail'
-                }
-                
-                # Process based on file type
-                if ext.lower() in ['.tiff', '.tif', '.jpg', '.jpeg', '.png', '.gif', '.bmp']:
-                    success = generate_thumbnail(file_path, derivative_path, options)
-                    if success:
-                        self.logger.info(f"Created Alma thumbnail: {derivative_path}")
-                        return True, derivative_path
-                    else:
-                        error_msg = f"Failed to create Alma thumbnail: {derivative_path}"
-                        self.logger.error(error_msg)
-                        return False, error_msg
-                elif ext.lower() == '.pdf':
-                    success = generate_pdf_thumbnail(file_path, derivative_path, options)
-                    if success:
-                        self.logger.info(f"Created Alma PDF thumbnail: {derivative_path}")
-                        return True, derivative_path
-                    else:
-                        error_msg = f"Failed to create PDF thumbnail: {derivative_path}"
-                        self.logger.error(error_msg)
-                        return False, error_msg
-                else:
-                    error_msg = f"Unsupported file type for Alma: {ext}"
-                    self.logger.error(error_msg)
-                    return False, error_msg
+            success, result = pipeline.create_thumbnail(file_path)
+            if success:
+                self.logger.info(f"Created Alma thumbnail: {result}")
             else:
-                error_msg = f"Unsupported mode: {mode} (only 'Alma' supported)"
-                self.logger.error(error_msg)
-                return False, error_msg
+                self.logger.error(result)
+            return success, result
                 
         except Exception as e:
             error_msg = f"Exception in create_single_derivative: {str(e)}"
@@ -106,7 +59,16 @@ class DerivativesView(BaseView):
             return False, error_msg
     
     def create_derivatives_for_files(self):
-        """Process all selected files and create derivatives."""
+        """Create derivatives for all selected files as a background job."""
+        job = jobs.get_runner(self.page).submit_once("create_derivatives", "Create derivatives",
+                                                     self.run_create_derivatives)
+        if job is None:
+            self.show_snack("Derivative creation is already running", is_error=True)
+            return
+        self.job = job
+    
+    def run_create_derivatives(self, job):
+        """Process all selected files and create derivatives (runs as a job)."""
         colors = self.get_theme_colors()
         
         # Get current settings
@@ -165,9 +127,15 @@ class DerivativesView(BaseView):
         success_count = 0
         error_count = 0
         
+        # Stage events are written directly (rather than with
+        # instrumentation.stage) so the loop below keeps its shape
+        stage_start = time.perf_counter()
+        instrumentation.emit("derivatives.start", files=total_files, mode=current_mode)
+        
         for index, file_path in enumerate(selected_files):
-            # Check for cancellation
-            if self.cancel_processing:
+            # Check for cancellation (the view's Cancel button or the jobs panel)
+            if self.cancel_processing or job.cancelled:
+                self.cancel_processing = True
                 self.log_view.controls.append(ft.Text(
                     f"⚠️ Processing cancelled by user. Processed {processed_count}/{total_files} files.",
                     size=12,
@@ -177,6 +145,8 @@ class DerivativesView(BaseView):
                 self.logger.info(f"Processing cancelled by user at file {index + 1}/{total_files}")
                 break
                 
+            file_start = time.perf_counter()
+            errors_before = error_count
             try:
                 display_name = os.path.basename(file_path)
                 self.logger.info(f"Processing file {index + 1}/{total_files}: {file_path}")
@@ -249,7 +219,14 @@ class DerivativesView(BaseView):
                 self.logger.error(f"Exception processing {file_path}: {str(e)}")
                 self.page.update()
             
+            instrumentation.emit(
+                "derivatives.file", file=file_path, mode=current_mode,
+                status="ok" if error_count == errors_before else "error",
+                duration_s=round(time.perf_counter() - file_start, 6)
+            )
+            
             # Update progress
+            job.report((index + 1) / total_files, f"{index + 1}/{total_files} files")
             self.log_view.controls.append(
                 ft.Text(
                     f"Progress: {index + 1}/{total_files} files ({(index + 1)/total_files:.0%})",
@@ -259,6 +236,13 @@ class DerivativesView(BaseView):
             )
             self.page.update()
         
+        instrumentation.emit(
+            "derivatives.end", status="cancelled" if self.cancel_processing else "ok",
+            duration_s=round(time.perf_counter() - stage_start, 6),
+            processed=processed_count, succeeded=success_count, failed=error_count
+        )
+        instrumentation.get_event_log().flush()
+        
         # Final summary
         if not self.cancel_processing:
             summary_text = f"\n✅ Processing complete!\nTotal: {total_files} | Success: {success_count} | Errors: {error_count}"
@@ -291,6 +275,8 @@ class DerivativesView(BaseView):
         """Interrupt the current processing operation."""
         if self.processing:
             self.cancel_processing = True
+            if self.job:
+                self.job.cancel()
             self.logger.info("Processing interruption requested by user")
             
             # Update UI to show cancellation in progress
@@ -10,11 +10,17 @@ import flet as ft
 from views.base_view import BaseView
 import os
 import utils
-import re
+import csv_io
+import session_store
+import settings_store
+import jobs
+import objs_linker
+import pipeline
 import shutil
 import tempfile
-import uuid
-from datetime import datetime
+
+# Job key shared by the fuzzy search and the search-and-link workflow (see jobs.submit_once)
+FILE_SEARCH_JOB = "file_search"
 
 
 class FileSelectorView(BaseView):
@@ -34,10 +40,22 @@ class FileSelectorView(BaseView):
         super().__init__(page)
         self.selector_type = selector_type
     
+    def load_last_directory(self):
+        """Load the last used directory from persistent storage."""
+        directory = settings_store.get_settings().get("last_directory")
+        if directory and os.path.exists(directory):
+            return directory
+        return None
+    
+    def save_last_directory(self, directory):
+        """Save the last used directory to persistent storage."""
+        settings_store.get_settings().set("last_directory", directory)
+        self.logger.info(f"Saved last directory: {directory}")
+    
     def sanitize_file_path(self, file_path):
         """
         Sanitize a file path by replacing spaces with underscores and 
-        handling spaces adjacent to dashes.
+        handling spaces adjacent to dashes (see pipeline.sanitize_file_path).
         
         Args:
             file_path: The original file path
@@ -45,159 +63,101 @@ class FileSelectorView(BaseView):
         Returns:
             str: The sanitized file path
         """
-        if not file_path:
-            return file_path
-        
-        # Split path into directory and filename
-        directory, filename = os.path.split(file_path)
-        
-        # Apply sanitization rules to filename only
-        # Strip leading and trailing whitespace from the entire filename
-        filename = filename.strip()
-        
-        # Split filename and extension to handle them separately
-        name_part, ext_part = os.path.splitext(filename)
-        
-        # Strip the name part as well to handle trailing spaces before extension
-        name_part = name_part.strip()
-        
-        # Sanitize the name part (before extension)
-        # Replace space-dash-space pattern with double dash first
-        name_part = re.sub(r'\s+-\s+', '--', name_part)
-        
-        # Replace remaining space-dash and dash-space patterns with double dashes
-        name_part = re.sub(r'\s+-', '--', name_part)  # space followed by dash
-        name_part = re.sub(r'-\s+', '--', name_part)  # dash followed by space
-        
-        # Replace remaining spaces with underscores
-        name_part = re.sub(r'\s+', '_', name_part)
-        
-        # Reconstruct filename (extension is kept as-is after stripping)
-        sanitized_filename = name_part + ext_part.strip()
+        return pipeline.sanitize_file_path(file_path)
+    
+    def ensure_temp_directory(self):
+        """
+        Get the session's temporary directory, creating it and its OBJS/, TN/
+        and SMALL/ subdirectories if needed.
         
-        # Rejoin the path
-        return os.path.join(directory, sanitized_filename) if directory else sanitized_filename
+        Returns:
+            tuple: (temp_dir, objs_dir, tn_dir, small_dir)
+        """
+        # Check if temp directory already exists in session (e.g., from CSV selection)
+        temp_dir = self.page.session.get("temp_directory")
+        temp_was_already_set = bool(temp_dir) and os.path.exists(temp_dir)
+        
+        # Create a new storage/temp/file_selector_<id> directory, or verify the
+        # OBJS/, TN/ and SMALL/ subdirectories of the existing one
+        temp_dir, objs_dir, tn_dir, small_dir = pipeline.make_temp_directory(
+            temp_dir if temp_was_already_set else None)
+        if temp_was_already_set:
+            self.logger.info(f"Reusing existing temporary directory: {temp_dir}")
+        else:
+            self.logger.info(f"Created new temporary directory: {temp_dir}")
+        
+        # Only log directory structure if we just created it
+        if not temp_was_already_set:
+            self.logger.info(f"  - OBJS/: {objs_dir}")
+            self.logger.info(f"  - TN/: {tn_dir}")
+            self.logger.info(f"  - SMALL/: {small_dir}")
+        
+        self.page.session.set("temp_directory", temp_dir)
+        self.page.session.set("temp_objs_directory", objs_dir)
+        self.page.session.set("temp_tn_directory", tn_dir)
+        self.page.session.set("temp_small_directory", small_dir)
+        return temp_dir, objs_dir, tn_dir, small_dir
     
-    def copy_files_to_temp_directory(self, file_paths):
+    def materialize_objs(self, file_paths, placeholder_names=(), dry_run=False):
         """
-        Create symbolic links with sanitized names in a temporary directory that reference the original files.
+        Build OBJS/: symbolic links with sanitized names for matched files and
+        File-Not-Found placeholders for unmatched ones.
+        
+        The complete plan (every source, destination name and kind) is worked
+        out first and written to objs_plan.json in the temporary directory,
+        then carried out on a thread pool. With dry_run the plan is only
+        written, so it can be reviewed before anything is created.
         
         Args:
-            file_paths: List of file paths to link
+            file_paths: List of matched file paths to link
+            placeholder_names: Expected filenames that need a placeholder
+            dry_run: Only write the plan
             
         Returns:
-            tuple: (temp_file_paths: list, temp_file_info: list, temp_directory: str)
+            tuple: (temp_file_paths: list, temp_file_info: list, temp_directory: str,
+                    placeholder_paths: list)
         """
-        if not file_paths:
-            return [], [], None
+        if not file_paths and not placeholder_names:
+            return [], [], None, []
         
         try:
-            # Check if temp directory already exists in session (e.g., from CSV selection)
-            temp_dir = self.page.session.get("temp_directory")
-            
-            if not temp_dir or not os.path.exists(temp_dir):
-                # Create base temp directory if it doesn't exist
-                temp_base_dir = os.path.join(os.getcwd(), "storage", "temp")
-                os.makedirs(temp_base_dir, exist_ok=True)
-                
-                # Create a unique subdirectory for this session
-                session_id = datetime.now().strftime("%Y%m%d_%H%M%S") + "_" + str(uuid.uuid4())[:8]
-                temp_dir = os.path.join(temp_base_dir, f"file_selector_{session_id}")
-                os.makedirs(temp_dir, exist_ok=True)
-                
-                self.logger.info(f"Created new temporary directory: {temp_dir}")
-            else:
-                self.logger.info(f"Reusing existing temporary directory: {temp_dir}")
+            temp_dir = self.ensure_temp_directory()[0]
+            linked = pipeline.link_files(temp_dir, file_paths, placeholder_names, dry_run=dry_run)
+            if dry_run:
+                return [], [], temp_dir, []
             
-            # Create or verify OBJS subdirectory for source files
-            objs_dir = os.path.join(temp_dir, "OBJS")
-            os.makedirs(objs_dir, exist_ok=True)
-            
-            # Create or verify TN and SMALL subdirectories for derivatives
-            tn_dir = os.path.join(temp_dir, "TN")
-            small_dir = os.path.join(temp_dir, "SMALL")
-            os.makedirs(tn_dir, exist_ok=True)
-            os.makedirs(small_dir, exist_ok=True)
-            
-            # Only log directory structure if we just created it
-            temp_was_already_set = bool(self.page.session.get("temp_directory"))
-            if not temp_was_already_set:
-                self.logger.info(f"  - OBJS/: {objs_dir}")
-                self.logger.info(f"  - TN/: {tn_dir}")
-                self.logger.info(f"  - SMALL/: {small_dir}")
-            
-            temp_file_paths = []
-            temp_file_info = []
-            
-            for original_path in file_paths:
-                try:
-                    # Skip empty or None paths
-                    if not original_path or not os.path.exists(original_path):
-                        self.logger.warning(f"Skipping non-existent file: {original_path}")
-                        continue
-                    
-                    # Get the original filename
-                    original_filename = os.path.basename(original_path)
-                    
-                    # Sanitize the filename (already handles spaces and dashes)
-                    sanitized_filename = os.path.basename(self.sanitize_file_path(original_filename))
-                    
-                    # Create the destination path in OBJS subdirectory
-                    temp_file_path = os.path.join(objs_dir, sanitized_filename)
-                    
-                    # Handle filename collisions
-                    counter = 1
-                    base_name, ext = os.path.splitext(sanitized_filename)
-                    while os.path.exists(temp_file_path):
-                        sanitized_filename = f"{base_name}_{counter}{ext}"
-                        temp_file_path = os.path.join(objs_dir, sanitized_filename)
-                        counter += 1
-                    
-                    # Create symbolic link instead of copying the file
-                    os.symlink(os.path.abspath(original_path), temp_file_path)
-                    
-                    # Store the paths and info
-                    temp_file_paths.append(temp_file_path)
-                    temp_file_info.append({
-                        'original_path': original_path,
-                        'original_filename': original_filename,
-                        'temp_path': temp_file_path,
-                        'sanitized_filename': sanitized_filename
-                    })
-                    
-                    self.logger.info(f"Created symbolic link '{sanitized_filename}' -> '{original_path}' in OBJS/")
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to create symbolic link for file {original_path}: {str(e)}")
-                    continue
+            temp_file_info = linked["temp_file_info"]
+            temp_file_paths = [info['temp_path'] for info in temp_file_info]
             
             # Store in session
-            self.page.session.set("temp_directory", temp_dir)
-            self.page.session.set("temp_objs_directory", objs_dir)
-            self.page.session.set("temp_tn_directory", tn_dir)
-            self.page.session.set("temp_small_directory", small_dir)
             self.page.session.set("temp_files", temp_file_paths)
             self.page.session.set("temp_file_info", temp_file_info)
-            
-            self.logger.info(f"Successfully created {len(temp_file_paths)} symbolic links in OBJS/ directory")
-            return temp_file_paths, temp_file_info, temp_dir
+            return temp_file_paths, temp_file_info, temp_dir, linked["placeholder_paths"]
             
         except Exception as e:
-            self.logger.error(f"Failed to create temporary directory or symbolic links: {str(e)}")
-            return [], [], None
+            self.logger.error(f"Failed to create temporary directory or OBJS/ entries: {str(e)}")
+            return [], [], None, []
+    
+    def copy_files_to_temp_directory(self, file_paths):
+        """
+        Create symbolic links with sanitized names in a temporary directory that reference the original files.
+        
+        Args:
+            file_paths: List of file paths to link
+            
+        Returns:
+            tuple: (temp_file_paths: list, temp_file_info: list, temp_directory: str)
+        """
+        temp_file_paths, temp_file_info, temp_dir, _ = self.materialize_objs(file_paths)
+        return temp_file_paths, temp_file_info, temp_dir
     
     def clear_temp_directory(self):
         """Clear the temporary directory and session data."""
         # Check if temp directory is protected
-        import json
         try:
-            persistent_file = "storage/data/persistent_session.json"
-            if os.path.exists(persistent_file):
-                with open(persistent_file, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-                    if session_data.get("_temp_protected"):
-                        self.logger.info("Temporary directory is protected - skipping deletion")
-                        return
+            if session_store.is_temp_protected():
+                self.logger.info("Temporary directory is protected - skipping deletion")
+                return
         except Exception as e:
             self.logger.warning(f"Could not check temp directory protection: {e}")
         
@@ -217,7 +177,7 @@ class FileSelectorView(BaseView):
     def handle_unmatched_file(self, filename, temp_dir):
         """
         Handle an unmatched file by creating a placeholder File-Not-Found file
-        and updating the CSV with ATTENTION! prefix.
+        (a reflink or hard link to the asset where possible).
         
         Args:
             filename: The expected filename from the CSV
@@ -227,44 +187,25 @@ class FileSelectorView(BaseView):
             str: Path to the created placeholder file, or None if failed
         """
         try:
-            # Determine file extension
-            _, ext = os.path.splitext(filename)
-            ext = ext.lower()
-            
-            # Map extension to source File-Not-Found asset
-            assets_dir = os.path.join(os.getcwd(), "assets")
-            
-            if ext in ['.pdf']:
-                source_file = os.path.join(assets_dir, "File-Not-Found.pdf")
-            elif ext in ['.tif', '.tiff']:
-                source_file = os.path.join(assets_dir, "File-Not-Found.tif")
-            elif ext in ['.jpg', '.jpeg']:
-                source_file = os.path.join(assets_dir, "File-Not-Found.jpg")
-            elif ext in ['.png']:
-                source_file = os.path.join(assets_dir, "File-Not-Found.png")
-            else:
-                # Default to JPG for unknown formats
-                source_file = os.path.join(assets_dir, "File-Not-Found.jpg")
-                self.logger.warning(f"Unknown extension '{ext}' for '{filename}', using .jpg placeholder")
-            
-            # Verify source file exists
-            if not os.path.exists(source_file):
-                self.logger.error(f"Source placeholder file not found: {source_file}")
-                return None
-            
-            # Create OBJS directory if it doesn't exist
             objs_dir = os.path.join(temp_dir, "OBJS")
-            os.makedirs(objs_dir, exist_ok=True)
+            plan = objs_linker.build_plan(objs_dir, placeholder_names=[filename], sanitize=pipeline.sanitize_file_name,
+                                          assets_dir=os.path.join(os.getcwd(), "assets"))
+            if not plan.entries:
+                self.logger.error(f"No placeholder planned for '{filename}': {plan.skipped}")
+                return None
             
-            # Sanitize the destination filename
-            sanitized_filename = os.path.basename(self.sanitize_file_path(filename))
-            dest_file = os.path.join(objs_dir, sanitized_filename)
+            entry = plan.entries[0]
+            if not os.path.exists(entry["source"]):
+                self.logger.error(f"Source placeholder file not found: {entry['source']}")
+                return None
             
-            # Copy the placeholder file with the expected name
-            shutil.copy2(source_file, dest_file)
+            result = objs_linker.execute(plan, workers=1)
+            if result["failed"]:
+                raise RuntimeError(result["failed"][0][1])
             
-            self.logger.info(f"Created placeholder file: {sanitized_filename} (from {os.path.basename(source_file)})")
-            return dest_file
+            self.logger.info(f"Created placeholder file: {entry['name']} "
+                             f"({entry['method']} of {os.path.basename(entry['source'])})")
+            return entry["dest"]
             
         except Exception as e:
             self.logger.error(f"Error creating placeholder file for '{filename}': {str(e)}")
@@ -281,45 +222,35 @@ class FileSelectorView(BaseView):
         Returns:
             bool: True if update was successful, False otherwise
         """
-        try:
-            import pandas as pd
-            
-            # Read the CSV file
-            df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        return self.update_csv_titles_for_unmatched(csv_path, [filename]) is not None
+    
+    def update_csv_titles_for_unmatched(self, csv_path, filenames):
+        """
+        Prepend "ATTENTION! " to the dc:title of every unmatched file's row,
+        reading and writing the CSV once.
+        
+        Args:
+            csv_path: Path to the CSV file
+            filenames: The filenames to search for in file_name_1 column
             
-            # Find the row with this filename in file_name_1
+        Returns:
+            int: Number of titles changed, or None if the CSV could not be updated
+        """
+        try:
+            df = csv_io.read_csv_strings(csv_path)
             if 'file_name_1' not in df.columns or 'dc:title' not in df.columns:
                 self.logger.error(f"CSV missing required columns (file_name_1 or dc:title)")
-                return False
-            
-            # Get first column name for comment checking
-            first_column = df.columns[0]
-            
-            # Find matching row (excluding comment rows)
-            mask = (df['file_name_1'] == filename) & (~df[first_column].str.startswith('#', na=False))
+                return None
             
-            if mask.any():
-                row_idx = df[mask].index[0]
-                current_title = df.at[row_idx, 'dc:title']
-                
-                # Only prepend if not already there
-                if not current_title.startswith("ATTENTION! "):
-                    df.at[row_idx, 'dc:title'] = f"ATTENTION! {current_title}"
-                    
-                    # Save the updated CSV with minimal quoting
-                    df.to_csv(csv_path, index=False, quoting=0)
-                    self.logger.info(f"Updated dc:title for '{filename}' with ATTENTION! prefix")
-                    return True
-                else:
-                    self.logger.info(f"dc:title for '{filename}' already has ATTENTION! prefix")
-                    return True
-            else:
-                self.logger.warning(f"Could not find '{filename}' in CSV file_name_1 column")
-                return False
+            changed = pipeline.mark_unmatched_titles(df, filenames)
+            if changed:
+                # Save the updated CSV with minimal quoting
+                df.to_csv(csv_path, index=False, quoting=0)
+            return changed
                 
         except Exception as e:
-            self.logger.error(f"Error updating CSV title for '{filename}': {str(e)}")
-            return False
+            self.logger.error(f"Error updating CSV titles for unmatched files: {str(e)}")
+            return None
     
     def render(self) -> ft.Column:
         """
@@ -353,50 +284,6 @@ class FilePickerSelectorView(FileSelectorView):
         self.selected_files_list = None
         self.temp_status_container = None  # Store reference to temp status display
     
-    def load_last_directory(self):
-        """Load the last used directory from persistent storage."""
-        try:
-            import json
-            import os
-            persistent_path = os.path.join("_data", "persistent.json")
-            if os.path.exists(persistent_path):
-                with open(persistent_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    directory = data.get("last_directory")
-                    if directory and os.path.exists(directory):
-                        return directory
-        except Exception as e:
-            self.logger.warning(f"Failed to load last directory: {e}")
-        return None
-    
-    def save_last_directory(self, directory):
-        """Save the last used directory to persistent storage."""
-        try:
-            import json
-            import os
-            persistent_path = os.path.join("_data", "persistent.json")
-            os.makedirs("_data", exist_ok=True)
-            
-            # Load existing data to preserve other settings
-            existing_data = {}
-            if os.path.exists(persistent_path):
-                try:
-                    with open(persistent_path, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                except Exception:
-                    self.logger.warning("Failed to read existing persistent data")
-            
-            # Update only the last_directory field
-            existing_data["last_directory"] = directory
-            
-            # Write back to file
-            with open(persistent_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, indent=2)
-            
-            self.logger.info(f"Saved last directory: {directory}")
-        except Exception as e:
-            self.logger.error(f"Failed to save last directory: {e}")
-    
     def render(self) -> ft.Column:
         """
         Render the file picker selector view content.
@@ -694,50 +581,6 @@ class CSVSelectorView(FileSelectorView):
         self.results_display_container = None
         self.search_container = None
     
-    def load_last_directory(self):
-        """Load the last used directory from persistent storage."""
-        try:
-            import json
-            import os
-            persistent_path = os.path.join("_data", "persistent.json")
-            if os.path.exists(persistent_path):
-                with open(persistent_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    directory = data.get("last_directory")
-                    if directory and os.path.exists(directory):
-                        return directory
-        except Exception as e:
-            self.logger.warning(f"Failed to load last directory: {e}")
-        return None
-    
-    def save_last_directory(self, directory):
-        """Save the last used directory to persistent storage."""
-        try:
-            import json
-            import os
-            persistent_path = os.path.join("_data", "persistent.json")
-            os.makedirs("_data", exist_ok=True)
-            
-            # Load existing data
-            existing_data = {}
-            if os.path.exists(persistent_path):
-                try:
-                    with open(persistent_path, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                except Exception:
-                    self.logger.warning("Failed to read existing persistent data")
-            
-            # Update last_directory
-            existing_data["last_directory"] = directory
-            
-            # Write back
-            with open(persistent_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, indent=2)
-            
-            self.logger.info(f"Saved last directory: {directory}")
-        except Exception as e:
-            self.logger.error(f"Failed to save last directory: {e}")
-    
     def copy_csv_to_temp(self, source_path):
         """
         Copy CSV file to temporary directory with human-readable timestamp.
@@ -749,52 +592,9 @@ class CSVSelectorView(FileSelectorView):
             str: Path to the copied CSV file, or None if copy failed
         """
         try:
-            # Get temp directory from session, or create a new one if it doesn't exist
-            temp_dir = self.page.session.get("temp_directory")
-            
-            if not temp_dir or not os.path.exists(temp_dir):
-                # Create a new temp directory structure
-                temp_base_dir = os.path.join(os.getcwd(), "storage", "temp")
-                os.makedirs(temp_base_dir, exist_ok=True)
-                
-                # Create a unique subdirectory for this session
-                session_id = datetime.now().strftime("%Y%m%d_%H%M%S") + "_" + str(uuid.uuid4())[:8]
-                temp_dir = os.path.join(temp_base_dir, f"file_selector_{session_id}")
-                os.makedirs(temp_dir, exist_ok=True)
-                
-                # Create subdirectories
-                objs_dir = os.path.join(temp_dir, "OBJS")
-                tn_dir = os.path.join(temp_dir, "TN")
-                small_dir = os.path.join(temp_dir, "SMALL")
-                os.makedirs(objs_dir, exist_ok=True)
-                os.makedirs(tn_dir, exist_ok=True)
-                os.makedirs(small_dir, exist_ok=True)
-                
-                # Store in session
-                self.page.session.set("temp_directory", temp_dir)
-                self.page.session.set("temp_objs_directory", objs_dir)
-                self.page.session.set("temp_tn_directory", tn_dir)
-                self.page.session.set("temp_small_directory", small_dir)
-                
-                self.logger.info(f"Created temporary directory structure: {temp_dir}")
-            
-            # Get the base filename and sanitize it
-            base_name = os.path.basename(source_path)
-            name, ext = os.path.splitext(base_name)
-            sanitized_name = utils.sanitize_filename(name)
-            
-            # Add human-readable timestamp: YYYYMMDD_HHMMSS
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            new_filename = f"{sanitized_name}_{timestamp}{ext}"
-            
-            # Create the destination path
-            dest_path = os.path.join(temp_dir, new_filename)
-            
-            # Copy the file
-            shutil.copy2(source_path, dest_path)
-            self.logger.info(f"Copied CSV file to: {dest_path}")
-            
-            return dest_path
+            # Use the session's temp directory, creating it if it doesn't exist
+            temp_dir = self.ensure_temp_directory()[0]
+            return pipeline.copy_csv_to_temp(source_path, temp_dir)
             
         except Exception as e:
             self.logger.error(f"Failed to copy CSV file: {e}")
@@ -804,39 +604,39 @@ class CSVSelectorView(FileSelectorView):
         """
         Read CSV or Excel file and extract column headers.
         
+        For CSV files only the header line is read, so pandas is not needed.
+        
         Returns:
             tuple: (columns: list, error: str)
         """
         try:
-            import pandas as pd
-            
             # Determine file type and read accordingly
             if file_path.lower().endswith('.csv'):
                 # Try multiple encodings for CSV files
-                encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'utf-16']
-                df = None
+                encodings = csv_io.CSV_ENCODINGS
+                columns = None
                 last_error = None
                 
                 for encoding in encodings:
                     try:
-                        # Read all columns as strings to prevent scientific notation and type conversion
-                        df = pd.read_csv(file_path, encoding=encoding, dtype=str, keep_default_na=False)
+                        columns = csv_io.read_csv_header(file_path, encoding=encoding)
                         self.logger.info(f"Successfully read CSV with encoding: {encoding}")
                         break
                     except (UnicodeDecodeError, UnicodeError):
                         last_error = f"Failed with encoding {encoding}"
                         continue
                 
-                if df is None:
+                if columns is None:
                     return None, f"Could not read CSV file with any standard encoding. Last error: {last_error}"
                     
             elif file_path.lower().endswith(('.xlsx', '.xls')):
+                import pandas as pd
                 df = pd.read_excel(file_path)
+                # Get column names
+                columns = list(df.columns)
             else:
                 return None, f"Unsupported file format: {file_path}"
             
-            # Get column names
-            columns = list(df.columns)
             self.logger.info(f"Found {len(columns)} columns in file: {columns}")
             
             return columns, None
@@ -855,63 +655,16 @@ class CSVSelectorView(FileSelectorView):
             list: Non-empty values from the column
         """
         try:
-            import pandas as pd
-            import os
-            
-            file_ext = os.path.splitext(file_path)[1].lower()
             self.logger.info(f"Reading CSV file to extract column data: {file_path}")
-            
-            if file_ext == '.csv':
-                # Try multiple encodings for CSV files
-                encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'utf-16']
-                df = None
-                
-                for encoding in encodings:
-                    try:
-                        # Read all columns as strings to prevent scientific notation and type conversion
-                        df = pd.read_csv(file_path, encoding=encoding, dtype=str, keep_default_na=False)
-                        self.logger.info(f"Successfully read CSV with encoding: {encoding}")
-                        break
-                    except (UnicodeDecodeError, UnicodeError):
-                        continue
-                
-                if df is None:
-                    raise ValueError("Could not read CSV file with any standard encoding")
-                    
-            elif file_ext in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path)
-            else:
-                raise ValueError(f"Unsupported file format: {file_ext}")
-            
-            # Extract non-empty values from the selected column
-            if column_name in df.columns:
-                # First, filter out rows where the first column starts with '#' (comment rows)
-                first_column = df.columns[0]  # Get the name of the first column
-                if first_column in df.columns:
-                    # Convert first column to string and check for comment marker
-                    comment_mask = df[first_column].astype(str).str.strip().str.startswith('#')
-                    # Filter out comment rows from the entire dataframe
-                    filtered_df = df[~comment_mask]
-                    
-                    # Log how many comment rows were filtered
-                    comment_count = comment_mask.sum()
-                    if comment_count > 0:
-                        self.logger.info(f"Filtered out {comment_count} comment rows starting with '#' in column '{first_column}'")
-                else:
-                    # If for some reason we can't find the first column, use original dataframe
-                    filtered_df = df
-                    comment_count = 0
-                
-                # Now extract values from the target column in the filtered dataframe
-                column_values = filtered_df[column_name].dropna().astype(str).str.strip()
-                # Filter out empty strings after stripping
-                non_empty_values = column_values[column_values != ''].tolist()
-                
-                self.logger.info(f"Extracted {len(non_empty_values)} values from column '{column_name}' (after filtering {comment_count} comment rows)")
-                return non_empty_values
-            else:
+            df = pipeline.read_csv(file_path)
+            if column_name not in df.columns:
                 self.logger.error(f"Column '{column_name}' not found in CSV file")
                 return []
+            
+            # Comment rows (first column starts with '#') are skipped
+            non_empty_values = pipeline.extract_column_values(df, column_name)
+            self.logger.info(f"Extracted {len(non_empty_values)} values from column '{column_name}'")
+            return non_empty_values
                 
         except ImportError:
             self.logger.error("Pandas library not available for reading CSV data")
@@ -1674,7 +1427,15 @@ class CSVSelectorView(FileSelectorView):
             self.auto_perform_workflow(e.path)
     
     def auto_perform_workflow(self, search_dir):
-        """Automatically perform fuzzy search and link creation."""
+        """Automatically perform fuzzy search and link creation as a background job."""
+        # Shares its key with do_fuzzy_search: both write the search results to the session
+        job = jobs.get_runner(self.page).submit_once(FILE_SEARCH_JOB, "Search and link files",
+                                                     self.run_auto_workflow, search_dir)
+        if job is None:
+            self.show_snack("A file search is already running", is_error=True)
+    
+    def run_auto_workflow(self, job, search_dir):
+        """Perform fuzzy search and link creation (runs as a job)."""
         selected_files = self.page.session.get("selected_file_paths") or []
         
         if not selected_files:
@@ -1700,7 +1461,7 @@ class CSVSelectorView(FileSelectorView):
             self.logger.info(f"Auto-workflow: Starting fuzzy search for {len(selected_files)} files")
             
             # Call the fuzzy search logic (extracted from do_fuzzy_search)
-            results = self.perform_fuzzy_search_workflow(search_dir, selected_files)
+            results = self.perform_fuzzy_search_workflow(search_dir, selected_files, job)
             
             if results is None:  # Search was cancelled or failed
                 progress_dialog.open = False
@@ -1708,48 +1469,28 @@ class CSVSelectorView(FileSelectorView):
                 return
             
             # Create symbolic links for matched files and placeholder files for unmatched
+            job.report(0.9, "Creating links and placeholders")
             matched_files = self.page.session.get("selected_file_paths") or []
             full_path_files = [f for f in matched_files if f and os.path.isabs(f) and os.path.exists(f)]
             
             # Get unmatched files
             unmatched_filenames = self.page.session.get("unmatched_filenames") or []
             
-            # Handle matched files
-            if full_path_files:
-                self.logger.info(f"Auto-workflow: Creating symbolic links for {len(full_path_files)} matched files")
-                temp_files, temp_file_info, temp_dir = self.copy_files_to_temp_directory(full_path_files)
-            else:
-                # No matched files, but we may still need to create temp directory for placeholders
-                temp_files = []
-                temp_file_info = []
-                temp_dir = self.page.session.get("temp_directory")
-                if not temp_dir:
-                    # Create temp directory structure
-                    temp_base_dir = os.path.join(os.getcwd(), "storage", "temp")
-                    os.makedirs(temp_base_dir, exist_ok=True)
-                    session_id = datetime.now().strftime("%Y%m%d_%H%M%S") + "_" + str(uuid.uuid4())[:8]
-                    temp_dir = os.path.join(temp_base_dir, f"file_selector_{session_id}")
-                    os.makedirs(temp_dir, exist_ok=True)
-                    self.page.session.set("temp_directory", temp_dir)
-                    self.logger.info(f"Created temporary directory for placeholders: {temp_dir}")
-            
-            # Handle unmatched files - create placeholders and update CSV
-            placeholder_count = 0
-            csv_file = self.page.session.get("temp_csv_file")
+            # Link matched files and create placeholders for unmatched ones in one plan
+            placeholder_names = [info.get('filename', '') for info in unmatched_filenames if info.get('filename')]
+            self.logger.info(f"Auto-workflow: Creating symbolic links for {len(full_path_files)} matched files "
+                             f"and {len(placeholder_names)} placeholders")
+            temp_files, temp_file_info, temp_dir, placeholder_paths = self.materialize_objs(
+                full_path_files, placeholder_names)
+            temp_files = temp_files + placeholder_paths
+            placeholder_count = len(placeholder_paths)
             
-            for unmatched_info in unmatched_filenames:
-                filename = unmatched_info.get('filename', '')
-                if filename:
-                    # Create placeholder file
-                    placeholder_path = self.handle_unmatched_file(filename, temp_dir)
-                    
-                    if placeholder_path:
-                        temp_files.append(placeholder_path)
-                        placeholder_count += 1
-                        
-                        # Update CSV with ATTENTION! prefix if we have a CSV file
-                        if csv_file and os.path.exists(csv_file):
-                            self.update_csv_title_for_unmatched(csv_file, filename)
+            # Update CSV with ATTENTION! prefix for unmatched files if we have a CSV file
+            csv_file = self.page.session.get("temp_csv_file")
+            if csv_file and os.path.exists(csv_file):
+                created_names = {os.path.basename(path) for path in placeholder_paths}
+                self.update_csv_titles_for_unmatched(
+                    csv_file, [name for name in placeholder_names if pipeline.sanitize_file_name(name) in created_names])
             
             # Update selected_file_paths to point to all temp files (matched + placeholders)
             self.page.session.set("selected_file_paths", temp_files)
@@ -1801,86 +1542,65 @@ class CSVSelectorView(FileSelectorView):
             self.page.snack_bar.open = True
             self.page.update()
     
-    def perform_fuzzy_search_workflow(self, search_dir, selected_files):
+    def perform_fuzzy_search_workflow(self, search_dir, selected_files, job=None):
         """Perform the fuzzy search workflow and return results."""
         try:
-            # Define progress callback (simplified for auto mode)
+            # Define progress callback: the search is most of the workflow's job
             def update_progress(progress):
-                # Could add more detailed progress tracking here if needed
-                pass
+                if job:
+                    job.report(progress * 0.9, f"Searching: {progress:.0%}")
             
-            # Define cancel check
+            # Define cancel check (the jobs panel can cancel the workflow)
             def check_cancel():
-                return False  # No cancellation in auto mode
+                return bool(job and job.cancelled)
             
-            # Perform the fuzzy search
-            results = utils.perform_fuzzy_search_batch(
+            # Perform the fuzzy search and sort the results into matched and unmatched
+            matches = pipeline.match_files(
                 search_dir, 
                 selected_files,
-                threshold=90,
+                threshold=pipeline.MATCH_THRESHOLD,
                 progress_callback=update_progress,
                 cancel_check=check_cancel
             )
             
-            if results is None:
+            if matches is None:
                 return None
             
-            # Process results (same logic as in do_fuzzy_search)
-            matched_paths = []
-            matched_ratios = []
-            unmatched_filenames = []
-            csv_filenames_for_matched = []  # Track CSV filenames for successfully matched files
-            matches_found = 0
-            original_count = len(selected_files)
-            
-            for filename in selected_files:
-                match_path, ratio = results.get(filename, (None, 0))
-                self.logger.info(f"Processing '{filename}': match_path={match_path}, ratio={ratio}")
-                
-                if match_path and ratio >= 90:
-                    matched_paths.append(match_path)
-                    matched_ratios.append(ratio)
-                    csv_filenames_for_matched.append(filename)  # Store original CSV filename
-                    matches_found += 1
-                    self.logger.info(f"Auto-workflow: Found match for '{filename}': {match_path} ({ratio}% match)")
-                else:
-                    matched_paths.append(None)
-                    # Store unmatched filename with best match info (filename, best_path, best_ratio)
-                    unmatched_filenames.append({
-                        'filename': filename,
-                        'best_path': match_path,
-                        'best_ratio': ratio
-                    })
-                    # Log unmatched files with severity based on fuzzy score
-                    if ratio == 0:
-                        self.logger.error(f"Auto-workflow: No match found for '{filename}' (0% match)")
-                    elif ratio < 50:
-                        self.logger.error(f"Auto-workflow: No match found for '{filename}' ({ratio}% match - very low)")
-                    elif ratio < 90:
-                        self.logger.warning(f"Auto-workflow: No match found for '{filename}' ({ratio}% match - below 90% threshold)")
-                    else:
-                        self.logger.warning(f"Auto-workflow: HIGH RATIO BUT NO PATH for '{filename}' ({ratio}% match, path={match_path})")
-            
-            # Store search statistics
-            self.page.session.set("original_filename_count", original_count)
-            self.page.session.set("matched_file_count", matches_found)
-            self.page.session.set("matched_ratios", matched_ratios)
-            self.page.session.set("unmatched_filenames", unmatched_filenames)
-            self.page.session.set("search_completed", True)
-            
-            # Update session with matched paths and CSV filenames
-            self.page.session.set("selected_file_paths", [p for p in matched_paths if p is not None])
-            self.page.session.set("csv_filenames_for_matched", csv_filenames_for_matched)
-            
-            self.logger.info(f"Auto-workflow: Fuzzy search completed. Found {matches_found} matches out of {len(selected_files)} files")
-            return results
+            self.store_search_results(selected_files, matches)
+            self.logger.info(f"Auto-workflow: Fuzzy search completed. Found {len(matches['matched_paths'])} matches out of {len(selected_files)} files")
+            return matches
             
         except Exception as e:
             self.logger.error(f"Error during automatic fuzzy search: {str(e)}")
             return None
     
+    def store_search_results(self, selected_files, matches):
+        """
+        Store fuzzy search results (from pipeline.match_files) in the session.
+        
+        Args:
+            selected_files: The filenames that were searched for
+            matches: The match_files() result
+        """
+        # Search statistics for UI display
+        self.page.session.set("original_filename_count", len(selected_files))
+        self.page.session.set("matched_file_count", len(matches["matched_paths"]))
+        self.page.session.set("matched_ratios", matches["matched_ratios"])
+        self.page.session.set("unmatched_filenames", matches["unmatched"])
+        self.page.session.set("search_completed", True)
+        
+        # Matched paths replace the original filenames; the CSV filename of each
+        # match is kept for the Update CSV view
+        self.page.session.set("selected_file_paths", matches["matched_paths"])
+        self.page.session.set("csv_filenames_for_matched", matches["csv_filenames_for_matched"])
+    
     def do_fuzzy_search(self, e):
-        """Perform fuzzy search using utils.perform_fuzzy_search_batch."""
+        """Perform fuzzy search as a background job."""
+        if jobs.get_runner(self.page).submit_once(FILE_SEARCH_JOB, "Fuzzy search", self.run_fuzzy_search) is None:
+            self.show_snack("A file search is already running", is_error=True)
+    
+    def run_fuzzy_search(self, job):
+        """Perform fuzzy search using utils.perform_fuzzy_search_batch (runs as a job)."""
         search_dir = self.page.session.get("search_directory")
         selected_files = self.page.session.get("selected_file_paths") or []
         
@@ -1905,7 +1625,7 @@ class CSVSelectorView(FileSelectorView):
         cancel_button = ft.ElevatedButton(
             "Cancel Search",
             icon=ft.Icons.CANCEL,
-            on_click=lambda _: self.page.session.set("cancel_search", True),
+            on_click=lambda _: job.cancel(),
             bgcolor=ft.Colors.RED_400
         )
         
@@ -1936,6 +1656,7 @@ class CSVSelectorView(FileSelectorView):
                 files_done = int(progress * len(selected_files))
                 progress_text.value = f"Search Progress: {files_done}/{len(selected_files)} files processed ({progress:.0%})"
                 progress_bar.value = progress
+                job.report(progress, f"{files_done}/{len(selected_files)} files")
                 self.logger.info(f"Progress update: {files_done}/{len(selected_files)} files ({progress:.0%})")
                 self.page.update()
             except Exception as e:
@@ -1944,15 +1665,14 @@ class CSVSelectorView(FileSelectorView):
         # Define cancel check
         def check_cancel():
             """Check if search should be cancelled"""
-            cancel = self.page.session.get("cancel_search")
-            return cancel if cancel is not None else False
+            return bool(self.page.session.get("cancel_search")) or job.cancelled
         
         try:
             # Perform the fuzzy search with progress tracking and cancellation support
-            results = utils.perform_fuzzy_search_batch(
+            matches = pipeline.match_files(
                 search_dir, 
                 selected_files,
-                threshold=90,
+                threshold=pipeline.MATCH_THRESHOLD,
                 progress_callback=update_progress,
                 cancel_check=check_cancel
             )
@@ -1962,7 +1682,7 @@ class CSVSelectorView(FileSelectorView):
             self.page.update()
             
             # If search was cancelled
-            if results is None:
+            if matches is None:
                 self.logger.info("Fuzzy search was cancelled by user")
                 self.page.snack_bar = ft.SnackBar(
                     content=ft.Text("Search cancelled by user"),
@@ -1972,51 +1692,9 @@ class CSVSelectorView(FileSelectorView):
                 self.page.update()
                 return
             
-            # Process results and update session with matched paths
-            matched_paths = []
-            matched_ratios = []
-            unmatched_filenames = []
-            matches_found = 0
-            original_count = len(selected_files)
-            
-            for filename in selected_files:
-                match_path, ratio = results.get(filename, (None, 0))
-                if match_path and ratio >= 90:
-                    # Store the original matched path (don't sanitize here)
-                    matched_paths.append(match_path)
-                    matched_ratios.append(ratio)
-                    matches_found += 1
-                    self.logger.info(f"Found match for '{filename}': {match_path} ({ratio}% match)")
-                else:
-                    matched_paths.append(None)
-                    # Store unmatched filename with best match info (filename, best_path, best_ratio)
-                    unmatched_filenames.append({
-                        'filename': filename,
-                        'best_path': match_path,
-                        'best_ratio': ratio
-                    })
-                    # Log unmatched files with severity based on fuzzy score
-                    if ratio == 0:
-                        self.logger.error(f"No match found for '{filename}' (0% match)")
-                    elif ratio < 50:
-                        self.logger.error(f"No match found for '{filename}' ({ratio}% match - very low)")
-                    elif ratio < 90:
-                        self.logger.warning(f"No match found for '{filename}' ({ratio}% match - below 90% threshold)")
-                    else:
-                        self.logger.info(f"No match found for '{filename}' meeting 90% threshold")
-            
-            # Store search statistics for UI display
-            self.page.session.set("original_filename_count", original_count)
-            self.page.session.set("matched_file_count", matches_found)
-            self.page.session.set("matched_ratios", matched_ratios)
-            self.page.session.set("unmatched_filenames", unmatched_filenames)
-            self.page.session.set("search_completed", True)
-            
-            # Update session with matched paths (replaces the original filenames)
-            self.page.session.set("selected_file_paths", [p for p in matched_paths if p is not None])
-            
-            # Log completion
-            self.logger.info(f"Fuzzy search completed. Found {matches_found} matches out of {len(selected_files)} files")
+            # Update session with matched paths and search statistics
+            self.store_search_results(selected_files, matches)
+            matches_found = len(matches["matched_paths"])
             
             # Show success message
             self.page.snack_bar = ft.SnackBar(
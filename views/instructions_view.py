@@ -8,7 +8,9 @@ and scripts based on the current mode.
 import flet as ft
 from views.base_view import BaseView
 import os
+import time
 import utils
+import settings_store
 
 
 class InstructionsView(BaseView):
@@ -190,6 +192,111 @@ class InstructionsView(BaseView):
             self.logger.error(f"Error generating upload script: {ex}")
             self.show_snack(f"Error: {ex}", is_error=True)
     
+    UPLOAD_UPDATE_INTERVAL = 0.25  # Seconds between progress redraws
+    
+    def upload_to_alma(self, e):
+        """Upload the temp CSV, OBJS/ and TN/ to Alma's S3 storage in the app, with progress."""
+        import uploader
+        
+        temp_dir = self.page.session.get("temp_directory")
+        if not temp_dir or not os.path.isdir(temp_dir):
+            self.show_snack("No temporary directory found. Please select files first.", is_error=True)
+            return
+        
+        profile_id = self.profile_id_input.value.strip() if self.profile_id_input and self.profile_id_input.value else ""
+        import_id = self.import_id_input.value.strip() if self.import_id_input and self.import_id_input.value else ""
+        if not profile_id or not import_id:
+            self.show_snack("Enter both the Profile ID and the Import ID before uploading.", is_error=True)
+            return
+        
+        settings = settings_store.get_settings()
+        try:
+            transport = uploader.make_transport(settings.get("upload_target"))
+        except Exception as ex:
+            self.logger.error(f"Cannot start upload: {ex}")
+            self.show_snack(f"Cannot start upload: {ex}", is_error=True)
+            return
+        
+        items = uploader.collect_upload_items(temp_dir, self.page.session.get("temp_csv_filename"))
+        if not items:
+            self.show_snack("Nothing to upload in the temporary directory.", is_error=True)
+            return
+        
+        colors = self.get_theme_colors()
+        progress_text = ft.Text(f"Preparing {len(items)} files...", size=14, color=colors['primary_text'])
+        rate_text = ft.Text("", size=12, color=colors['secondary_text'])
+        progress_bar = ft.ProgressBar(width=400, value=0)
+        last_update = [0.0]
+        
+        def on_progress(stats):
+            now = time.monotonic()
+            if now - last_update[0] < self.UPLOAD_UPDATE_INTERVAL:
+                return
+            last_update[0] = now
+            done = stats["uploaded"] + stats["skipped"] + len(stats["failed"])
+            progress_bar.value = stats["bytes_done"] / stats["total_bytes"] if stats["total_bytes"] else done / stats["total"]
+            progress_text.value = (f"{done}/{stats['total']} files "
+                                   f"({stats['uploaded']} uploaded, {stats['skipped']} already there, "
+                                   f"{len(stats['failed'])} failed)")
+            rate_text.value = (f"{stats['mb_per_s']:.1f} MB/s, {stats['objects_per_s']:.1f} files/s, "
+                               f"{stats['retries']} retries")
+            self.page.update()
+        
+        upload = uploader.Uploader(
+            transport,
+            prefix=uploader.alma_prefix(profile_id, import_id),
+            workers=int(settings.get("upload_workers", uploader.UPLOAD_WORKERS)),
+            checkpoint_path=os.path.join(temp_dir, uploader.UPLOAD_CHECKPOINT),
+            progress=on_progress
+        )
+        cancel_button = ft.ElevatedButton(
+            "Cancel Upload",
+            icon=ft.Icons.CANCEL,
+            on_click=lambda _: upload.cancel(),
+            bgcolor=ft.Colors.RED_400
+        )
+        progress_dialog = ft.AlertDialog(
+            title=ft.Text("Uploading to Alma"),
+            content=ft.Column([
+                progress_text,
+                progress_bar,
+                rate_text,
+                ft.Container(height=10),
+                cancel_button
+            ], tight=True, height=170),
+            modal=True
+        )
+        self.page.overlay.append(progress_dialog)
+        progress_dialog.open = True
+        self.page.update()
+        
+        def run_upload():
+            self.logger.info(f"Uploading {len(items)} files to {transport.describe()}/{upload.prefix}")
+            try:
+                stats = upload.run(items)
+            except Exception as ex:
+                progress_dialog.open = False
+                self.page.update()
+                self.logger.error(f"Upload failed: {ex}")
+                self.show_snack(f"Upload failed: {ex}", is_error=True)
+                return
+            
+            progress_dialog.open = False
+            self.page.update()
+            summary = (f"{stats['uploaded']} uploaded, {stats['skipped']} already there, "
+                       f"{len(stats['failed'])} failed in {stats['elapsed_s']:.1f}s "
+                       f"({stats['mb_per_s']:.1f} MB/s)")
+            self.logger.info(f"Upload finished: {summary}")
+            if stats.get("cancelled"):
+                self.show_snack(f"Upload cancelled: {summary}. Upload again to resume.", is_error=True)
+            elif stats["failed"]:
+                self.show_snack(f"Upload incomplete: {summary}. Upload again to retry the failed files.",
+                                is_error=True)
+            else:
+                self.show_snack(f"✓ Upload complete: {summary}", is_error=False)
+        
+        self.page.run_thread(run_upload)
+    
     def copy_to_clipboard(self, e, text):
         """Copy text to clipboard."""
         self.page.set_clipboard(text)
@@ -240,7 +347,7 @@ class InstructionsView(BaseView):
                         color=colors['primary_text']
                     ),
                     ft.Text(
-                        "Generate a bash script to upload files to Alma's AWS S3 storage",
+                        "Upload files to Alma's AWS S3 storage, or generate a bash script to do it yourself",
                         size=13,
                         color=colors['secondary_text']
                     ),
@@ -269,15 +376,27 @@ class InstructionsView(BaseView):
                         color=colors['secondary_text']
                     ),
                     ft.Container(
-                        content=ft.ElevatedButton(
-                            text="Generate Upload Script",
-                            icon=ft.Icons.TERMINAL,
-                            on_click=self.generate_upload_script,
-                            style=ft.ButtonStyle(
-                                color=ft.Colors.WHITE,
-                                bgcolor=ft.Colors.GREEN_700
-                            )
-                        ),
+                        content=ft.Row([
+                            ft.ElevatedButton(
+                                text="Generate Upload Script",
+                                icon=ft.Icons.TERMINAL,
+                                on_click=self.generate_upload_script,
+                                style=ft.ButtonStyle(
+                                    color=ft.Colors.WHITE,
+                                    bgcolor=ft.Colors.GREEN_700
+                                )
+                            ),
+                            ft.ElevatedButton(
+                                text="Upload Now",
+                                icon=ft.Icons.CLOUD_UPLOAD,
+                                on_click=self.upload_to_alma,
+                                style=ft.ButtonStyle(
+                                    color=ft.Colors.WHITE,
+                                    bgcolor=ft.Colors.BLUE_700
+                                ),
+                                tooltip="Upload in the app; re-run to resume after a failure (needs both IDs)"
+                            ),
+                        ], spacing=10),
                         margin=ft.margin.only(top=10, bottom=5)
                     ),
                 ], spacing=5),
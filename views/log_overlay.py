@@ -8,6 +8,20 @@ in an overlay dialog.
 import flet as ft
 import logging
 import os
+import time
+import weakref
+import jobs
+from logger import LOG_FILE, LogFollower
+
+# Seconds between log polls while "Follow" is on
+FOLLOW_INTERVAL = 1.0
+
+# Minimum seconds between jobs panel redraws
+JOBS_REFRESH_INTERVAL = 0.5
+
+# One LogFollower per page, outside page.session so preserving the session
+# does not save it
+_followers = weakref.WeakKeyDictionary()
 
 
 class LogOverlay:
@@ -24,6 +38,7 @@ class LogOverlay:
         """
         self.page = page
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.log_column = None  # Log lines of the most recently created overlay
     
     def get_theme_colors(self):
         """Get theme-appropriate colors based on current theme mode"""
@@ -49,16 +64,124 @@ class LogOverlay:
                 'container_text': ft.Colors.BLACK,
             }
     
+    def get_log_follower(self, max_lines=100):
+        """
+        Get the page's LogFollower, creating it on first use.
+        
+        The follower is shared by every overlay on the page, so reopening or
+        refreshing the overlay only reads what was appended to mdi.log since.
+        
+        Args:
+            max_lines (int): Number of recent lines to keep
+            
+        Returns:
+            LogFollower: The follower for mdi.log
+        """
+        follower = _followers.get(self.page)
+        if follower is None or follower.max_lines != max_lines:
+            follower = _followers[self.page] = LogFollower(LOG_FILE, max_lines)
+        return follower
+    
     def read_recent_logs(self, max_lines=100):
         """Read the most recent log entries from mdi.log"""
         try:
-            with open("mdi.log", "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                # Return the last max_lines entries
-                return lines[-max_lines:] if len(lines) > max_lines else lines
+            follower = self.get_log_follower(max_lines)
+            follower.poll()
+            return list(follower.lines)
         except Exception as e:
             return [f"Error reading log file: {str(e)}\\n"]
     
+    def build_log_controls(self, log_entries, colors):
+        """Create one Text control per non-blank log entry."""
+        log_controls = []
+        for entry in log_entries:
+            entry = entry.strip()
+            if entry:
+                log_controls.append(ft.Text(entry, size=11, color=colors['primary_text']))
+        return log_controls
+    
+    def follow_logs(self, log_overlay, log_column, colors):
+        """
+        Append new log lines to an open overlay until it closes or Follow is turned off.
+        
+        Runs in a background thread (page.run_thread).
+        
+        Args:
+            log_overlay (ft.AlertDialog): The overlay being followed
+            log_column (ft.Column): The column showing the log lines
+            colors (dict): Theme colors
+        """
+        follower = self.get_log_follower()
+        while True:
+            time.sleep(FOLLOW_INTERVAL)
+            if not (self.page.session.get("_log_follow")
+                    and self.page.session.get("_log_overlay") is log_overlay and log_overlay.open):
+                return
+            try:
+                if follower.poll():
+                    log_column.controls = self.build_log_controls(follower.lines, colors)
+                    log_column.update()
+            except Exception as e:
+                self.logger.error(f"Error following log file: {e}")
+                return
+    
+    def build_job_controls(self, runner, colors):
+        """Create one row per running, queued or recently finished job."""
+        job_controls = []
+        for job in runner.jobs():
+            active = job.status in (jobs.RUNNING, jobs.QUEUED)
+            status = f"{job.status}, {job.elapsed:.0f}s" if job.started else job.status
+            if job.error:
+                status += f": {job.error}"
+            elif job.message:
+                status += f" - {job.message}"
+            job_controls.append(ft.Column([
+                ft.Row([
+                    ft.Text(f"#{job.id} {job.name}", size=12, weight=ft.FontWeight.BOLD,
+                            color=colors['container_text'], expand=True),
+                    ft.IconButton(
+                        icon=ft.Icons.CANCEL,
+                        icon_size=16,
+                        tooltip="Cancel job",
+                        visible=active and not job.cancelled,
+                        on_click=lambda e, job=job: job.cancel()
+                    ),
+                ], spacing=4),
+                ft.ProgressBar(
+                    value=job.progress if job.status == jobs.RUNNING else (1.0 if not active else 0.0),
+                    width=440,
+                    color=ft.Colors.RED if job.status == jobs.FAILED else ft.Colors.BLUE,
+                    bgcolor=colors['container_bg']
+                ),
+                ft.Text(status, size=11, color=colors['secondary_text']),
+            ], spacing=2))
+        return job_controls or [ft.Text("No background jobs", size=12, color=colors['secondary_text'])]
+    
+    def watch_jobs(self, log_overlay, jobs_column, colors):
+        """
+        Redraw jobs_column when a job changes, while log_overlay is open.
+        
+        Args:
+            log_overlay (ft.AlertDialog): The overlay showing the jobs
+            jobs_column (ft.Column): The column listing the jobs
+            colors (dict): Theme colors
+        """
+        runner = jobs.get_runner(self.page)
+        last_redraw = [0.0]
+        
+        def on_job_change(job):
+            if self.page.session.get("_log_overlay") is not log_overlay or not log_overlay.open:
+                runner.unsubscribe(on_job_change)
+                return
+            now = time.monotonic()
+            if job.status not in jobs.FINISHED_STATES and now - last_redraw[0] < JOBS_REFRESH_INTERVAL:
+                return
+            last_redraw[0] = now
+            jobs_column.controls = self.build_job_controls(runner, colors)
+            jobs_column.update()
+        
+        runner.subscribe(on_job_change)
+    
     def create_overlay(self):
         """Create the log viewer as an overlay dialog"""
         
@@ -75,11 +198,21 @@ class LogOverlay:
         log_entries = self.read_recent_logs(100)  # Get last 100 log entries
         
         # Create log display controls
-        log_controls = []
-        for entry in log_entries:
-            entry = entry.strip()
-            if entry:
-                log_controls.append(ft.Text(entry, size=11, color=colors['primary_text']))
+        log_controls = self.build_log_controls(log_entries, colors)
+        following = bool(self.page.session.get("_log_follow"))
+        log_column = ft.Column(
+            controls=log_controls or [
+                ft.Text("No log entries found", size=12, color=colors['secondary_text'])
+            ],
+            scroll=ft.ScrollMode.AUTO,
+            auto_scroll=following,
+            spacing=1
+        )
+        self.log_column = log_column
+        
+        # Create the jobs panel
+        runner = jobs.get_runner(self.page)
+        jobs_column = ft.Column(self.build_job_controls(runner, colors), scroll=ft.ScrollMode.AUTO, spacing=6)
         
         # Create status information
         status_info = []
@@ -122,7 +255,7 @@ class LogOverlay:
             icon=ft.Icons.CANCEL,
             bgcolor=ft.Colors.RED_600,
             color="white",
-            visible=search_in_progress,
+            visible=search_in_progress or bool(runner.active()),
             on_click=on_cancel_click
         )
         
@@ -138,12 +271,27 @@ class LogOverlay:
             on_click=on_refresh_click
         )
         
+        # Create follow switch: poll for new log lines while the overlay is open
+        def on_follow_change(e):
+            self.page.session.set("_log_follow", e.control.value)
+            log_column.auto_scroll = e.control.value
+            log_column.update()
+            if e.control.value:
+                self.page.run_thread(self.follow_logs, log_overlay, log_column, colors)
+        
+        follow_switch = ft.Switch(
+            label="Follow",
+            value=following,
+            tooltip="Show new log entries as they are written",
+            on_change=on_follow_change
+        )
+        
         # Create the overlay dialog
         log_overlay = ft.AlertDialog(
             modal=False,  # Allow interaction with background
             title=ft.Row([
                 ft.Text("Process Log & Progress", size=18, weight=ft.FontWeight.BOLD),
-                refresh_button
+                ft.Row([follow_switch, refresh_button], spacing=4)
             ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
             content=ft.Container(
                 content=ft.Column([
@@ -167,18 +315,27 @@ class LogOverlay:
                         margin=ft.margin.symmetric(vertical=4)
                     ),
                     
+                    # Jobs section
+                    ft.Container(
+                        content=ft.Column([
+                            ft.Text("Background Jobs", 
+                                   size=16, weight=ft.FontWeight.BOLD, color=colors['container_text']),
+                            ft.Container(content=jobs_column, height=110),
+                        ], spacing=6),
+                        padding=ft.padding.all(8),
+                        border=ft.border.all(1, colors['border']),
+                        border_radius=8,
+                        bgcolor=colors['container_bg'],
+                        margin=ft.margin.symmetric(vertical=4)
+                    ),
+                    
                     # Log display section
                     ft.Container(
                         content=ft.Column([
                             ft.Text("Application Logs", 
                                    size=16, weight=ft.FontWeight.BOLD, color=colors['container_text']),
                             ft.Container(
-                                content=ft.Column(
-                                    controls=log_controls,
-                                    scroll=ft.ScrollMode.AUTO,
-                                    spacing=1
-                                ) if log_controls else ft.Text("No log entries found", 
-                                                              size=12, color=colors['secondary_text']),
+                                content=log_column,
                                 height=188,
                                 border=ft.border.all(1, colors['border']),
                                 border_radius=5,
@@ -195,7 +352,7 @@ class LogOverlay:
                     
                 ], spacing=8),
                 width=500,
-                height=400
+                height=560
             ),
             actions=[
                 ft.TextButton("Close", on_click=lambda e: self.close())
@@ -203,6 +360,7 @@ class LogOverlay:
             actions_alignment=ft.MainAxisAlignment.END,
         )
         
+        self.watch_jobs(log_overlay, jobs_column, colors)
         return log_overlay
     
     def show(self):
@@ -217,6 +375,10 @@ class LogOverlay:
         log_overlay.open = True
         self.page.update()
         self.logger.info("Opened log overlay")
+        
+        # Resume following if it was on when the overlay was last open
+        if self.page.session.get("_log_follow"):
+            self.page.run_thread(self.follow_logs, log_overlay, self.log_column, self.get_theme_colors())
     
     def close(self):
         """Close the log overlay dialog"""
@@ -234,6 +396,7 @@ class LogOverlay:
         """Cancel the current process"""
         self.page.session.set("cancel_search", True)
         self.page.session.set("search_in_progress", False)
+        jobs.get_runner(self.page).cancel_all()
         self.logger.warning("Process cancelled by user")
         
         # Refresh the overlay if it's open, otherwise do nothing
@@ -5,15 +5,166 @@ This module contains the LogView class for displaying logs.
 """
 
 import flet as ft
+import logging
+from datetime import datetime
 from views.base_view import BaseView
 from views.log_overlay import LogOverlay
+import log_store
 
 
 class LogView(BaseView):
     """
     Log view class for displaying application logs.
+
+    Besides opening the live log overlay, the view browses the rotated log
+    history: one segment a page at a time, the errors or warnings of the last
+    run, or the records in a time range. Segments are only read when shown.
     """
     
+    PAGE_LINES = 200
+    TIME_INPUT_FORMAT = "%Y-%m-%d %H:%M"
+    LEVEL_OPTIONS = {"All": logging.NOTSET, "Warnings": logging.WARNING, "Errors": logging.ERROR}
+
+    def __init__(self, page: ft.Page):
+        """Initialize the log view."""
+        super().__init__(page)
+        self.segments = []
+        self.segment = None
+        self.page_offsets = [0]  # Start offset of each page seen so far in the segment
+        self.next_offset = None
+        self.results_column = None
+        self.status_text = None
+        self.segment_dropdown = None
+        self.from_field = None
+        self.to_field = None
+        self.level_dropdown = None
+
+    def show_lines(self, lines, status):
+        """Replace the results with the given log lines."""
+        colors = self.get_theme_colors()
+        self.results_column.controls = [
+            ft.Text(line.rstrip("\n"), size=11, color=colors['primary_text'], selectable=True)
+            for line in lines
+        ] or [ft.Text("No log entries found", size=12, color=colors['secondary_text'])]
+        self.status_text.value = status
+        self.page.update()
+
+    def describe_segment(self, segment):
+        """Dropdown label for a segment: name, start time and size."""
+        start = segment.start_time
+        started = datetime.fromtimestamp(start).strftime("%Y-%m-%d %H:%M") if start else "unknown"
+        return f"{segment.name} (from {started}, {segment.size / 1024:,.0f} KB)"
+
+    def show_segment_page(self):
+        """Read and show the current page of the selected segment."""
+        try:
+            lines, self.next_offset = self.segment.read_lines(self.page_offsets[-1], self.PAGE_LINES)
+        except Exception as ex:
+            self.logger.error(f"Failed to read log segment {self.segment.path}: {ex}")
+            self.show_snack(f"Failed to read log segment: {ex}", is_error=True)
+            return
+        more = "" if self.next_offset is None else ", more follow"
+        self.show_lines(lines, f"{self.segment.name}: page {len(self.page_offsets)}{more}")
+
+    def on_segment_change(self, e):
+        self.segment = next((s for s in self.segments if s.path == e.control.value), None)
+        self.page_offsets = [0]
+        if self.segment:
+            self.show_segment_page()
+
+    def on_next_page(self, e):
+        if self.segment and self.next_offset is not None:
+            self.page_offsets.append(self.next_offset)
+            self.show_segment_page()
+
+    def on_prev_page(self, e):
+        if self.segment and len(self.page_offsets) > 1:
+            self.page_offsets.pop()
+            self.show_segment_page()
+
+    def on_last_run(self, e, min_level):
+        """Show the records at or above min_level since the current run started."""
+        try:
+            records = log_store.last_run_records(min_level, self.segments)
+        except Exception as ex:
+            self.logger.error(f"Failed to read log index: {ex}")
+            self.show_snack(f"Failed to read log index: {ex}", is_error=True)
+            return
+        self.segment = None
+        lines = [line for record in records for line in record.splitlines()]
+        self.show_lines(lines, f"{len(records)} {logging.getLevelName(min_level)} or worse records in the last run")
+
+    def on_time_range(self, e):
+        """Show the records between the From and To times."""
+        try:
+            start = datetime.strptime(self.from_field.value.strip(), self.TIME_INPUT_FORMAT).timestamp()
+            end_text = (self.to_field.value or "").strip()
+            end = datetime.strptime(end_text, self.TIME_INPUT_FORMAT).timestamp() + 59.999 \
+                if end_text else datetime.now().timestamp()
+        except (AttributeError, ValueError):
+            self.show_snack("Enter times as YYYY-MM-DD HH:MM", is_error=True)
+            return
+        min_level = self.LEVEL_OPTIONS.get(self.level_dropdown.value, logging.NOTSET)
+        try:
+            lines = log_store.records_between(start, end, min_level, self.PAGE_LINES * 5, self.segments)
+        except Exception as ex:
+            self.logger.error(f"Failed to search logs: {ex}")
+            self.show_snack(f"Failed to search logs: {ex}", is_error=True)
+            return
+        self.segment = None
+        self.show_lines(lines, f"{len(lines)} lines between {self.from_field.value.strip()} and "
+                               f"{end_text or 'now'}")
+
+    def build_history_section(self):
+        """Create the log history browser."""
+        colors = self.get_theme_colors()
+        self.segments = log_store.list_segments()
+
+        self.segment_dropdown = ft.Dropdown(
+            label="Log segment",
+            width=520,
+            dense=True,
+            text_size=12,
+            options=[ft.dropdown.Option(key=s.path, text=self.describe_segment(s)) for s in self.segments],
+            on_change=self.on_segment_change
+        )
+        self.from_field = ft.TextField(label="From", hint_text="YYYY-MM-DD HH:MM", width=170, dense=True, text_size=12)
+        self.to_field = ft.TextField(label="To (blank = now)", hint_text="YYYY-MM-DD HH:MM", width=170,
+                                     dense=True, text_size=12)
+        self.level_dropdown = ft.Dropdown(
+            label="Level", width=130, dense=True, text_size=12, value="All",
+            options=[ft.dropdown.Option(name) for name in self.LEVEL_OPTIONS]
+        )
+        self.status_text = ft.Text("", size=12, italic=True, color=colors['secondary_text'])
+        self.results_column = ft.Column([], scroll=ft.ScrollMode.AUTO, spacing=1)
+
+        return ft.Column([
+            ft.Text("Log History", size=18, weight=ft.FontWeight.BOLD),
+            ft.Row([
+                ft.ElevatedButton("Errors in last run", icon=ft.Icons.ERROR_OUTLINE,
+                                  on_click=lambda e: self.on_last_run(e, logging.ERROR)),
+                ft.ElevatedButton("Warnings in last run", icon=ft.Icons.WARNING_AMBER,
+                                  on_click=lambda e: self.on_last_run(e, logging.WARNING)),
+            ], spacing=10),
+            ft.Row([self.from_field, self.to_field, self.level_dropdown,
+                    ft.ElevatedButton("Search", icon=ft.Icons.SEARCH, on_click=self.on_time_range)],
+                   spacing=10),
+            ft.Row([
+                self.segment_dropdown,
+                ft.IconButton(ft.Icons.CHEVRON_LEFT, tooltip="Previous page", on_click=self.on_prev_page),
+                ft.IconButton(ft.Icons.CHEVRON_RIGHT, tooltip="Next page", on_click=self.on_next_page),
+            ], spacing=2),
+            self.status_text,
+            ft.Container(
+                content=self.results_column,
+                height=400,
+                border=ft.border.all(1, colors['border']),
+                border_radius=5,
+                padding=6,
+                bgcolor=colors['markdown_bg']
+            ),
+        ], spacing=8)
+
     def render(self) -> ft.Column:
         """
         Render the log view content.
@@ -42,4 +193,6 @@ class LogView(BaseView):
                 icon=ft.Icons.VISIBILITY,
                 on_click=lambda e: log_overlay.show()
             ),
+            ft.Divider(),
+            self.build_history_section(),
         ], alignment=ft.MainAxisAlignment.CENTER, spacing=8)
\ No newline at end of file
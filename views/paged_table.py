@@ -0,0 +1,359 @@
+"""
+Paged Data Table Module for Manage Digital Ingest Application
+
+This module contains the PagedDataTable class, a DataTable wrapper that only
+builds Flet rows for the page currently on screen. The underlying DataFrame is
+never copied; each page is sliced from it on demand, so render time and the
+size of each client update stay constant no matter how large the CSV is.
+"""
+
+import flet as ft
+import logging
+import math
+import numpy as np
+import pandas as pd
+
+
+class PagedDataTable:
+    """
+    Handles a paginated, filterable view of a DataFrame.
+
+    Features:
+    - First/previous/next/last buttons and a jump-to-page field
+    - Row filter: case-insensitive substring match on one column (or all columns)
+    - Optional boolean cell mask for highlighting changed cells and rows
+    - Linked tables that mirror this table's current page (e.g. Before/After)
+    """
+
+    DEFAULT_PAGE_SIZE = 100
+    ALL_COLUMNS = "(all columns)"
+
+    def __init__(self, page: ft.Page, colors: dict, page_size: int = DEFAULT_PAGE_SIZE,
+                 show_navigation: bool = True, highlight_color=ft.Colors.GREEN_700, **table_kwargs):
+        """
+        Initialize the paged table.
+
+        Args:
+            page (ft.Page): The Flet page object
+            colors (dict): Theme colors from BaseView.get_theme_colors()
+            page_size (int): Number of rows rendered per page
+            show_navigation (bool): Show paging and filter controls. Linked
+                follower tables set this to False.
+            highlight_color: Text color for cells flagged in the cell mask
+            **table_kwargs: Extra ft.DataTable styling options
+        """
+        self.page = page
+        self.colors = colors
+        self.page_size = page_size
+        self.show_navigation = show_navigation
+        self.highlight_color = highlight_color
+        self.table_kwargs = table_kwargs
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.df = None
+        self.cell_mask = None
+        self.base_positions = None  # Row positions eligible for display
+        self.positions = None  # base_positions after the column filter
+        self.current_page = 0
+        self.linked_tables = []
+
+        self.filter_column = self.ALL_COLUMNS
+        self.filter_text = ""
+
+        self._control = None
+        self.table = None
+        self.status_text = None
+        self.jump_field = None
+        self.filter_dropdown = None
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+
+    def set_data(self, df, cell_mask=None, row_positions=None):
+        """
+        Point the table at a DataFrame and show its first page.
+
+        Args:
+            df (pd.DataFrame): The data to display, or None to clear the table
+            cell_mask (numpy.ndarray): Optional boolean array shaped like df;
+                True cells are highlighted and their rows tinted
+            row_positions: Optional positional row subset to display
+                (e.g. only changed rows). Defaults to every row.
+        """
+        self.df = df
+        self.cell_mask = cell_mask
+        if df is None:
+            self.base_positions = np.arange(0)
+        elif row_positions is None:
+            self.base_positions = np.arange(len(df))
+        else:
+            self.base_positions = np.asarray(row_positions, dtype=np.intp)
+
+        # Keep the column filter only if the column still exists
+        if df is None or self.filter_column not in df.columns:
+            self.filter_column = self.ALL_COLUMNS
+        self._apply_filter()
+        self.current_page = 0
+        self._refresh_filter_options()
+        self._render_page()
+
+    def link(self, other):
+        """
+        Make another PagedDataTable follow this table's page and filter.
+
+        The other table must wrap a DataFrame with the same row positions.
+
+        Args:
+            other (PagedDataTable): The follower table
+        """
+        self.linked_tables.append(other)
+        other.show_navigation = False
+
+    @property
+    def page_count(self):
+        """Number of pages for the current filter (at least 1)."""
+        total = 0 if self.positions is None else len(self.positions)
+        return max(1, math.ceil(total / self.page_size))
+
+    def _apply_filter(self):
+        """Recompute the displayed row positions from the base rows and the filter."""
+        if self.df is None or not self.filter_text:
+            self.positions = self.base_positions
+            return
+
+        subset = self.df.iloc[self.base_positions]
+        if self.filter_column in subset.columns:
+            columns = [self.filter_column]
+        else:
+            columns = list(subset.columns)
+
+        matches = np.zeros(len(subset), dtype=bool)
+        for column in columns:
+            series = subset[column]
+            if not pd.api.types.is_string_dtype(series.dtype):
+                series = series.astype(str)
+            matches |= series.str.contains(
+                self.filter_text, case=False, regex=False, na=False
+            ).to_numpy(dtype=bool)
+        self.positions = self.base_positions[matches]
+
+    def _page_positions(self):
+        """Row positions for the current page."""
+        start = self.current_page * self.page_size
+        return self.positions[start:start + self.page_size]
+
+    @staticmethod
+    def _format(value):
+        """Display text for a cell value; missing values show as blank."""
+        if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NA:
+            return ''
+        return str(value)
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def _build_columns(self):
+        """Create the DataColumn headers."""
+        if self.df is None or len(self.df.columns) == 0:
+            return [ft.DataColumn(ft.Text("No Data", size=12))]
+        return [
+            ft.DataColumn(ft.Text(str(col), weight=ft.FontWeight.BOLD, size=12))
+            for col in self.df.columns
+        ]
+
+    def _build_rows(self, positions):
+        """Create DataRows for the given row positions only."""
+        if self.df is None or len(positions) == 0:
+            return []
+
+        page_slice = self.df.iloc[positions]
+        rows = []
+        for i, values in enumerate(page_slice.itertuples(index=False, name=None)):
+            row_mask = self.cell_mask[positions[i]] if self.cell_mask is not None else None
+            cells = []
+            for col_idx, value in enumerate(values):
+                if row_mask is not None and row_mask[col_idx]:
+                    cells.append(ft.DataCell(ft.Text(
+                        self._format(value), size=11, weight=ft.FontWeight.BOLD, color=self.highlight_color
+                    )))
+                else:
+                    cells.append(ft.DataCell(ft.Text(self._format(value), size=11)))
+            row_changed = row_mask is not None and bool(row_mask.any())
+            rows.append(ft.DataRow(
+                cells=cells,
+                color=ft.Colors.with_opacity(0.08, self.highlight_color) if row_changed else None
+            ))
+        return rows
+
+    def show_positions(self, positions):
+        """
+        Render exactly the given row positions (used by linked follower tables).
+
+        Args:
+            positions: Positional row indexes to render
+        """
+        if self.table is None:
+            return
+        self.table.columns = self._build_columns()
+        self.table.rows = self._build_rows(positions)
+
+    def _status_message(self):
+        """Text such as 'Rows 101-200 of 5,000 (page 2 of 50)'."""
+        total = len(self.positions) if self.positions is not None else 0
+        if total == 0:
+            return "No rows to display"
+        start = self.current_page * self.page_size
+        end = min(start + self.page_size, total)
+        message = f"Rows {start + 1:,}-{end:,} of {total:,} (page {self.current_page + 1} of {self.page_count})"
+        if self.df is not None and total != len(self.df):
+            message += f" - {len(self.df):,} rows total"
+        return message
+
+    def _render_page(self):
+        """Rebuild only the visible rows and update the navigation controls."""
+        if self.table is None:
+            return
+
+        self.current_page = min(max(self.current_page, 0), self.page_count - 1)
+        positions = self._page_positions() if self.positions is not None else np.arange(0)
+        self.table.columns = self._build_columns()
+        self.table.rows = self._build_rows(positions)
+        for other in self.linked_tables:
+            other.show_positions(positions)
+
+        if self.status_text:
+            self.status_text.value = self._status_message()
+        if self.jump_field:
+            self.jump_field.value = str(self.current_page + 1)
+
+    def _update(self):
+        """Push the current page to the client, if the control is on screen."""
+        if self._control is not None and self._control.page:
+            self._control.update()
+            for other in self.linked_tables:
+                if other._control is not None and other._control.page:
+                    other._control.update()
+
+    def _refresh_filter_options(self):
+        """Sync the filter column dropdown with the current DataFrame columns."""
+        if self.filter_dropdown is None:
+            return
+        columns = [] if self.df is None else [str(col) for col in self.df.columns]
+        self.filter_dropdown.options = [ft.dropdown.Option(self.ALL_COLUMNS)] + [
+            ft.dropdown.Option(col) for col in columns
+        ]
+        self.filter_dropdown.value = self.filter_column
+
+    # ------------------------------------------------------------------
+    # Navigation handlers
+    # ------------------------------------------------------------------
+
+    def go_to_page(self, page_index):
+        """
+        Show the page with the given zero-based index (clamped to the valid range).
+
+        Args:
+            page_index (int): Zero-based page number
+        """
+        self.current_page = page_index
+        self._render_page()
+        self._update()
+
+    def on_first(self, e):
+        self.go_to_page(0)
+
+    def on_prev(self, e):
+        self.go_to_page(self.current_page - 1)
+
+    def on_next(self, e):
+        self.go_to_page(self.current_page + 1)
+
+    def on_last(self, e):
+        self.go_to_page(self.page_count - 1)
+
+    def on_jump(self, e):
+        """Jump to the 1-based page number typed in the page field."""
+        try:
+            self.go_to_page(int(e.control.value) - 1)
+        except (TypeError, ValueError):
+            self.jump_field.value = str(self.current_page + 1)
+            self._update()
+
+    def on_filter_column_change(self, e):
+        self.filter_column = e.control.value or self.ALL_COLUMNS
+        self._on_filter_change()
+
+    def on_filter_text_change(self, e):
+        self.filter_text = (e.control.value or "").strip()
+        self._on_filter_change()
+
+    def _on_filter_change(self):
+        """Re-filter and return to the first page."""
+        self._apply_filter()
+        self.current_page = 0
+        self._render_page()
+        self._update()
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+
+    @property
+    def control(self) -> ft.Column:
+        """
+        The Flet control for this table, built on first access.
+
+        Returns:
+            ft.Column: Navigation/filter bar (unless disabled) above the table
+        """
+        if self._control is not None:
+            return self._control
+
+        table_style = dict(
+            border=ft.border.all(1, self.colors['border']),
+            border_radius=10,
+            horizontal_lines=ft.BorderSide(1, self.colors['border']),
+            heading_row_color=ft.Colors.GREY_200,
+            column_spacing=10,
+            data_row_min_height=30,
+            data_row_max_height=35,
+            heading_row_height=40,
+        )
+        table_style.update(self.table_kwargs)
+        self.table = ft.DataTable(columns=self._build_columns(), rows=[], **table_style)
+
+        controls = []
+        if self.show_navigation:
+            self.status_text = ft.Text("", size=12, italic=True, color=self.colors['secondary_text'])
+            self.jump_field = ft.TextField(
+                value="1", width=60, dense=True, text_size=12,
+                keyboard_type=ft.KeyboardType.NUMBER, on_submit=self.on_jump,
+                tooltip="Page number"
+            )
+            self.filter_dropdown = ft.Dropdown(
+                label="Filter column", width=200, dense=True, text_size=12,
+                on_change=self.on_filter_column_change
+            )
+            self._refresh_filter_options()
+            controls.append(ft.Row([
+                ft.IconButton(ft.Icons.FIRST_PAGE, tooltip="First page", on_click=self.on_first),
+                ft.IconButton(ft.Icons.CHEVRON_LEFT, tooltip="Previous page", on_click=self.on_prev),
+                self.jump_field,
+                ft.IconButton(ft.Icons.CHEVRON_RIGHT, tooltip="Next page", on_click=self.on_next),
+                ft.IconButton(ft.Icons.LAST_PAGE, tooltip="Last page", on_click=self.on_last),
+                self.status_text,
+            ], spacing=2, vertical_alignment=ft.CrossAxisAlignment.CENTER))
+            controls.append(ft.Row([
+                self.filter_dropdown,
+                ft.TextField(
+                    label="Contains", value=self.filter_text, width=220, dense=True, text_size=12,
+                    on_submit=self.on_filter_text_change, on_blur=self.on_filter_text_change
+                ),
+            ], spacing=10))
+
+        controls.append(ft.Row([self.table], scroll=ft.ScrollMode.AUTO))
+        self._control = ft.Column(controls, spacing=5)
+        self._render_page()
+        return self._control
@@ -7,8 +7,12 @@ application settings and configurations.
 
 import flet as ft
 from views.base_view import BaseView
-import json
 import os
+import time
+import session_store
+import settings_store
+import temp_gc
+import jobs
 
 
 class SettingsView(BaseView):
@@ -20,44 +24,22 @@ class SettingsView(BaseView):
     # Application mode constant - fixed for Alma Edition
     APP_MODE = "Alma"
     
+    # Temp directories listed in the storage panel, largest first
+    STORAGE_LIST_LIMIT = 15
+    
+    def __init__(self, page: ft.Page):
+        """Initialize the settings view."""
+        super().__init__(page)
+        self.storage_summary = None
+        self.storage_list = None
+    
     def load_persistent_settings(self):
-        """Load settings from persistent.json"""
-        try:
-            persistent_path = os.path.join("_data", "persistent.json")
-            if os.path.exists(persistent_path):
-                with open(persistent_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data
-        except Exception as e:
-            self.logger.warning(f"Failed to load persistent settings: {e}")
-        return {}
+        """Load settings from persistent.json (served from the settings cache)"""
+        return settings_store.get_settings().all()
     
     def save_persistent_settings(self, settings):
-        """Save settings to persistent.json"""
-        try:
-            persistent_path = os.path.join("_data", "persistent.json")
-            # Ensure the _data directory exists
-            os.makedirs("_data", exist_ok=True)
-            
-            # Load existing data to preserve other settings
-            existing_data = {}
-            if os.path.exists(persistent_path):
-                try:
-                    with open(persistent_path, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                except Exception:
-                    self.logger.warning("Failed to read existing persistent data")
-            
-            # Update with new settings
-            existing_data.update(settings)
-            
-            # Write back to file
-            with open(persistent_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, indent=2)
-            
-            self.logger.info(f"Saved persistent settings: {settings}")
-        except Exception as e:
-            self.logger.error(f"Failed to save persistent settings: {e}")
+        """Save settings to persistent.json (debounced by the settings store)"""
+        settings_store.get_settings().update(settings)
     
     def clear_session(self, e):
         """
@@ -76,11 +58,9 @@ class SettingsView(BaseView):
             for key in session_keys:
                 self.page.session.remove(key)
             
-            # Delete the persistent session file if it exists
-            persistent_session_file = AboutView.PERSISTENT_SESSION_FILE
-            if os.path.exists(persistent_session_file):
-                os.remove(persistent_session_file)
-                self.logger.info(f"Deleted persistent session file: {persistent_session_file}")
+            # Delete the persistent session files if they exist
+            if session_store.delete_preserved():
+                self.logger.info(f"Deleted persistent session file: {AboutView.PERSISTENT_SESSION_FILE}")
             
             self.logger.info(f"Cleared {key_count} session keys - session reset to pristine state")
             
@@ -103,6 +83,122 @@ class SettingsView(BaseView):
             self.page.snack_bar.open = True
             self.page.update()
     
+    def refresh_storage_usage(self, e=None):
+        """Scan storage/temp in the background and show the result in the storage panel."""
+        self.storage_summary.value = "Scanning storage/temp..."
+        self.page.update()
+        self.page.run_thread(self.show_storage_usage)
+    
+    def show_storage_usage(self):
+        """Fill the storage panel from a fresh scan. Runs in a background thread."""
+        colors = self.get_theme_colors()
+        try:
+            current = self.page.session.get("temp_directory")
+            index = temp_gc.scan_temp_root(protected=temp_gc.protected_paths(current))
+        except Exception as ex:
+            self.logger.error(f"Failed to scan temp directories: {ex}")
+            self.storage_summary.value = f"Failed to scan storage/temp: {ex}"
+            self.page.update()
+            return
+        
+        total = sum(item["size"] for item in index)
+        quota_gb = temp_gc.get_policy()["quota_gb"]
+        self.storage_summary.value = (f"{len(index)} temp directories, {total / 1024 ** 3:,.2f} GB "
+                                      f"of {quota_gb:g} GB quota")
+        now = time.time()
+        rows = []
+        for item in sorted(index, key=lambda item: item["size"], reverse=True)[:self.STORAGE_LIST_LIMIT]:
+            flag = " (protected)" if item["protected"] else ""
+            rows.append(ft.Text(
+                f"{item['name']}: {item['size'] / 1024 ** 2:,.1f} MB, {item['files']} files, "
+                f"last used {(now - item['last_used']) / 86400:.1f} days ago{flag}",
+                size=11, color=colors['secondary_text'], selectable=True
+            ))
+        if len(index) > self.STORAGE_LIST_LIMIT:
+            rows.append(ft.Text(f"... and {len(index) - self.STORAGE_LIST_LIMIT} more",
+                                size=11, italic=True, color=colors['secondary_text']))
+        self.storage_list.controls = rows
+        self.page.update()
+    
+    def clean_up_temp(self, e):
+        """Apply the age and quota policies to storage/temp now."""
+        self.storage_summary.value = "Cleaning up storage/temp..."
+        self.page.update()
+        
+        def run():
+            try:
+                report = temp_gc.collect(current_temp_dir=self.page.session.get("temp_directory"))
+            except Exception as ex:
+                self.logger.error(f"Temp cleanup failed: {ex}")
+                self.show_snack(f"Temp cleanup failed: {ex}", is_error=True)
+                return
+            message = (f"Deleted {len(report['deleted'])} temp directories, "
+                       f"freed {report['freed_bytes'] / 1024 ** 2:,.1f} MB")
+            if report["failed"]:
+                message += f" ({len(report['failed'])} could not be deleted)"
+            self.logger.info(message)
+            self.show_snack(message, is_error=bool(report["failed"]))
+            self.show_storage_usage()
+        
+        self.page.run_thread(run)
+    
+    def build_storage_panel(self):
+        """Create the storage usage panel for storage/temp with the cleanup policy settings."""
+        colors = self.get_theme_colors()
+        policy = temp_gc.get_policy()
+        
+        def on_policy_change(e):
+            key = e.control.data
+            if key == "temp_gc_enabled":
+                value = e.control.value
+            else:
+                try:
+                    value = float(e.control.value)
+                    if value <= 0:
+                        raise ValueError
+                except (TypeError, ValueError):
+                    self.show_snack("Enter a positive number", is_error=True)
+                    return
+            self.save_persistent_settings({key: value})
+            self.logger.info(f"Temp cleanup setting {key} = {value}")
+        
+        self.storage_summary = ft.Text("", size=12, color=colors['primary_text'])
+        self.storage_list = ft.Column([], spacing=1)
+        
+        return ft.Container(
+            content=ft.Column([
+                ft.Text("Storage Usage", size=16, weight=ft.FontWeight.BOLD, color=colors['primary_text']),
+                ft.Text(
+                    "Old run directories in storage/temp are deleted automatically; the current and "
+                    "preserved sessions' directories are always kept",
+                    size=12, italic=True, color=colors['secondary_text']
+                ),
+                ft.Row([
+                    ft.Switch(label="Automatic cleanup", value=policy["enabled"], data="temp_gc_enabled",
+                              on_change=on_policy_change),
+                    ft.TextField(label="Max age (days)", value=f"{policy['max_age_days']:g}", width=130,
+                                 dense=True, data="temp_gc_max_age_days", on_blur=on_policy_change,
+                                 on_submit=on_policy_change),
+                    ft.TextField(label="Quota (GB)", value=f"{policy['quota_gb']:g}", width=110, dense=True,
+                                 data="temp_gc_quota_gb", on_blur=on_policy_change, on_submit=on_policy_change),
+                    ft.TextField(label="Quota idle (hours)", value=f"{policy['quota_min_idle_hours']:g}", width=140,
+                                 dense=True, data="temp_gc_quota_min_idle_hours", on_blur=on_policy_change,
+                                 on_submit=on_policy_change),
+                ], spacing=10, alignment=ft.MainAxisAlignment.CENTER),
+                self.storage_summary,
+                self.storage_list,
+                ft.Row([
+                    ft.TextButton("Refresh", icon=ft.Icons.REFRESH, on_click=self.refresh_storage_usage),
+                    ft.ElevatedButton("Clean Up Now", icon=ft.Icons.CLEANING_SERVICES, on_click=self.clean_up_temp),
+                ], spacing=10, alignment=ft.MainAxisAlignment.CENTER),
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=6),
+            padding=ft.padding.all(8),
+            border=ft.border.all(1, colors['border']),
+            border_radius=10,
+            margin=ft.margin.symmetric(vertical=4),
+            bgcolor=colors['container_bg']
+        )
+    
     def render(self) -> ft.Column:
         """
         Render the settings view content.
@@ -227,12 +323,43 @@ class SettingsView(BaseView):
             bgcolor=colors['container_bg']
         )
         
+        # Number of long operations (searches, derivatives, merges) run at once
+        def on_max_jobs_change(e):
+            self.save_persistent_settings({"max_concurrent_jobs": int(e.control.value)})
+            self.logger.info(f"Max concurrent background jobs: {e.control.value}")
+        
+        jobs_settings_container = ft.Container(
+            content=ft.Row([
+                ft.Icon(name=ft.Icons.WORK_HISTORY_OUTLINED, size=20, color=colors['container_text']),
+                ft.Text("Background jobs at once:", size=16, weight=ft.FontWeight.BOLD,
+                        color=colors['container_text']),
+                ft.Dropdown(
+                    value=str(persistent_settings.get("max_concurrent_jobs", jobs.DEFAULT_MAX_CONCURRENCY)),
+                    options=[ft.dropdown.Option(str(n)) for n in range(1, 5)],
+                    on_change=on_max_jobs_change,
+                    width=90
+                )
+            ], alignment=ft.MainAxisAlignment.CENTER, spacing=8),
+            padding=ft.padding.all(8),
+            border=ft.border.all(1, colors['border']),
+            border_radius=10,
+            margin=ft.margin.symmetric(vertical=4),
+            bgcolor=colors['container_bg']
+        )
+        
+        # Storage usage is filled in by a background scan once the page is shown
+        storage_panel = self.build_storage_panel()
+        self.page.run_thread(self.show_storage_usage)
+        
         return ft.Column([
             *self.create_page_header("Settings Page", include_log_button=False),
             mode_settings_container,
             file_selector_settings_container,
             ft.Divider(height=15, color=colors['divider']),
             theme_settings_container,
+            jobs_settings_container,
+            ft.Divider(height=15, color=colors['divider']),
+            storage_panel,
             ft.Divider(height=15, color=colors['divider']),
             ft.Container(
                 content=ft.Column([
@@ -3,22 +3,28 @@ CSV Generator view for creating CSV rows from selected files.
 """
 import os
 import json
-import csv
 import flet as ft
 import pandas as pd
 from datetime import datetime
 
 import utils
+import csv_io
+import jobs
+from generated_rows import GeneratedRows, SESSION_KEY as GENERATED_ROWS_KEY
 from .base_view import BaseView
+from .paged_table import PagedDataTable
 
 
 class StorageView(BaseView):
     
+    # Minimum score for the fuzzy tier of merge_metadata (same default as the file search)
+    FUZZY_MERGE_THRESHOLD = 90
+    
     def __init__(self, page: ft.Page):
         """Initialize the CSV generator view."""
         super().__init__(page)
         self.csv_data_table = None
-        self.generated_csv_data = []
+        self.generated_csv_data = GeneratedRows()
         self.generated_rows_text = None
         self.export_button = None
         self.clear_button = None
@@ -27,14 +33,11 @@ class StorageView(BaseView):
         self.metadata_df = None
     
     def load_csv_headings(self):
-        """Load CSV headings from verified headings file."""
+        """Load CSV headings from the cached verified headings file."""
         try:
-            headings_file = "_data/verified_CSV_headings_for_Alma-D.csv"
-            with open(headings_file, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                headings = next(reader)
-                self.logger.info(f"Loaded {len(headings)} CSV headings from {headings_file}")
-                return headings
+            headings = list(utils.get_verified_headings('Alma'))
+            self.logger.info(f"Loaded {len(headings)} CSV headings from {utils.VERIFIED_HEADINGS_FILES['Alma']}")
+            return headings
         except Exception as e:
             self.logger.error(f"Failed to load CSV headings: {e}")
             return []
@@ -54,27 +57,9 @@ class StorageView(BaseView):
             self.show_snack("Failed to load CSV headings", is_error=True)
             return
         
-        # Generate rows
-        self.generated_csv_data = []
-        
-        for file_path in file_paths:
-            # Create a row dictionary with all headings as keys
-            row = {heading: "" for heading in headings}
-            
-            # Populate basic fields from filename
-            filename = os.path.basename(file_path)
-            name_without_ext = os.path.splitext(filename)[0]
-            
-            # Set file_name_1 to the filename
-            if 'file_name_1' in row:
-                row['file_name_1'] = filename
-            
-            # Set dc:title to filename without extension
-            if 'dc:title' in row:
-                row['dc:title'] = name_without_ext
-            
-            # Add to generated data
-            self.generated_csv_data.append(row)
+        # Generate rows: file_name_1 is the filename, dc:title the filename
+        # without extension; every other heading starts empty
+        self.generated_csv_data = GeneratedRows.from_file_paths(file_paths, headings)
         
         self.logger.info(f"Generated {len(self.generated_csv_data)} CSV rows")
         
@@ -107,7 +92,7 @@ class StorageView(BaseView):
         """Save generated CSV data to session storage."""
         try:
             # Save to session storage
-            self.page.session.set("generated_csv_rows", self.generated_csv_data)
+            self.page.session.set(GENERATED_ROWS_KEY, self.generated_csv_data.to_session())
             self.logger.info(f"Saved {len(self.generated_csv_data)} rows to session storage")
         except Exception as e:
             self.logger.error(f"Failed to save generated CSV data: {e}")
@@ -116,15 +101,13 @@ class StorageView(BaseView):
         """Load generated CSV data from session storage."""
         try:
             # Load from session storage
-            session_data = self.page.session.get("generated_csv_rows")
-            if session_data:
-                self.generated_csv_data = session_data
+            session_data = self.page.session.get(GENERATED_ROWS_KEY)
+            self.generated_csv_data = GeneratedRows.from_session(session_data)
+            if self.generated_csv_data:
                 self.logger.info(f"Loaded {len(self.generated_csv_data)} rows from session storage")
-            else:
-                self.generated_csv_data = []
         except Exception as e:
             self.logger.error(f"Failed to load generated CSV data: {e}")
-            self.generated_csv_data = []
+            self.generated_csv_data = GeneratedRows()
     
     def on_metadata_csv_result(self, e: ft.FilePickerResultEvent):
         """Handle metadata CSV file selection."""
@@ -132,7 +115,7 @@ class StorageView(BaseView):
             self.metadata_csv_path = e.files[0].path
             try:
                 # Load the metadata CSV
-                self.metadata_df = pd.read_csv(self.metadata_csv_path, dtype=str, keep_default_na=False)
+                self.metadata_df = csv_io.read_csv_strings(self.metadata_csv_path)
                 self.logger.info(f"Loaded metadata CSV with {len(self.metadata_df)} rows and {len(self.metadata_df.columns)} columns")
                 self.show_snack(f"Loaded metadata CSV: {os.path.basename(self.metadata_csv_path)}")
                 
@@ -167,8 +150,79 @@ class StorageView(BaseView):
             allow_multiple=False
         )
     
+    @staticmethod
+    def build_match_indexes(values):
+        """
+        Build hash indexes for matching generated rows against a metadata column.
+        
+        Args:
+            values: The metadata match column (pandas Series)
+            
+        Returns:
+            tuple: (exact_index, normalized_index) dicts mapping the raw value and
+                   the utils.normalize_for_matching() value to the position of the
+                   first metadata row holding it
+        """
+        exact_index = {}
+        normalized_index = {}
+        for position, value in enumerate(values.tolist()):
+            # NaN never compares equal, so it can only match after normalization
+            if not pd.isna(value):
+                exact_index.setdefault(value, position)
+            normalized_index.setdefault(utils.normalize_for_matching(value), position)
+        return exact_index, normalized_index
+    
+    def merge_metadata_row(self, row_position, position, merge_columns, metadata_values):
+        """
+        Copy metadata values from one matched metadata row into a generated row.
+        
+        dc:title always overwrites; other fields are only filled if empty. A new
+        originating_system_id and matching Handle URL are assigned.
+        
+        Args:
+            row_position: Position of the generated row (updated in place)
+            position: Position of the matched row in metadata_df
+            merge_columns: Metadata columns that also exist in generated rows
+            metadata_values: Dict mapping each merge column to its list of values
+            
+        Returns:
+            int: Number of fields merged into the row
+        """
+        rows = self.generated_csv_data
+        row_fields_merged = 0
+        for col in merge_columns:
+            value = metadata_values[col][position]
+            if pd.notna(value) and value:
+                # Special handling for dc:title - always overwrite from metadata
+                if col == 'dc:title':
+                    rows.set(row_position, col, str(value))
+                    row_fields_merged += 1
+                # Only populate other fields if the generated row value is empty
+                elif not rows.get(row_position, col):
+                    rows.set(row_position, col, str(value))
+                    row_fields_merged += 1
+        
+        # Generate unique ID for originating_system_id
+        if rows.has_column('originating_system_id'):
+            unique_id = utils.generate_unique_id(self.page)
+            rows.set(row_position, 'originating_system_id', unique_id)
+            
+            # Convert to Handle URL for dc:identifier
+            if rows.has_column('dc:identifier'):
+                # Extract numeric portion (e.g., "dg_1234567890" -> "1234567890")
+                numeric_part = unique_id.split('_')[-1] if '_' in unique_id else unique_id
+                rows.set(row_position, 'dc:identifier', f"http://hdl.handle.net/11084/{numeric_part}")
+                row_fields_merged += 2  # Count both originating_system_id and dc:identifier
+        
+        return row_fields_merged
+    
     def merge_metadata(self, e):
-        """Merge metadata from uploaded CSV into generated rows."""
+        """Merge metadata from uploaded CSV into generated rows as a background job."""
+        if jobs.get_runner(self.page).submit_once("merge_metadata", "Merge metadata", self.run_merge_metadata) is None:
+            self.show_snack("A metadata merge is already running", is_error=True)
+    
+    def run_merge_metadata(self, job):
+        """Merge metadata from uploaded CSV into generated rows (runs as a job)."""
         self.logger.info(f"merge_metadata called - metadata_df is None: {self.metadata_df is None}, generated_csv_data count: {len(self.generated_csv_data)}")
         
         if self.metadata_df is None or not self.generated_csv_data:
@@ -195,69 +249,91 @@ class StorageView(BaseView):
             self.logger.info(f"Starting merge with match column: {match_column}")
             self.logger.info(f"Metadata CSV columns: {list(self.metadata_df.columns)}")
             
-            merged_count = 0
-            fields_merged = 0
+            # Build both lookup indexes once: raw value -> first row position, and
+            # normalized value -> first row position (first match wins, as before)
+            exact_index, normalized_index = self.build_match_indexes(self.metadata_df[match_column])
+            
+            # Pull metadata columns into plain lists once, so matched rows are read
+            # by position instead of slicing the DataFrame per row
+            merge_columns = [col for col in self.metadata_df.columns if self.generated_csv_data.has_column(col)]
+            metadata_values = {col: self.metadata_df[col].tolist() for col in merge_columns}
+            
+            # Tiers 1 and 2: exact match, then normalized match
+            matches = []  # (generated row position, metadata position)
+            unmatched_rows = []  # (generated row position, match value)
+            normalized_matches = 0
             
             self.logger.info(f"Processing {len(self.generated_csv_data)} generated rows")
             
-            for row in self.generated_csv_data:
-                # Try to find a match value in the generated row
-                # Start with file_name_1 (always present in generated rows)
-                match_value = None
-                if 'file_name_1' in row and row['file_name_1']:
-                    match_value = row['file_name_1']
-                
+            for row_position, match_value in enumerate(self.generated_csv_data.column('file_name_1')):
+                # Match on file_name_1 (always present in generated rows)
                 if not match_value:
                     continue
                 
-                # Normalize the match value for flexible matching
-                normalized_match = utils.normalize_for_matching(match_value)
-                
-                # Try exact match first
-                matching_rows = self.metadata_df[self.metadata_df[match_column] == match_value]
-                
-                # If no exact match, try normalized matching
-                if matching_rows.empty:
-                    # Find rows where normalized metadata value matches normalized generated value
-                    metadata_normalized = self.metadata_df[match_column].apply(utils.normalize_for_matching)
-                    
-                    matching_rows = self.metadata_df[
-                        metadata_normalized == normalized_match
-                    ]
-                    if not matching_rows.empty:
-                        self.logger.info(f"Matched '{match_value}' using normalized comparison")
+                # Try exact match first, then normalized matching
+                position = exact_index.get(match_value)
+                if position is None:
+                    position = normalized_index.get(utils.normalize_for_matching(match_value))
+                    if position is not None:
+                        normalized_matches += 1
+                        self.logger.debug(f"Matched '{match_value}' using normalized comparison")
                 
-                if not matching_rows.empty:
-                    metadata_row = matching_rows.iloc[0]
-                    
-                    # Merge metadata into generated row
-                    row_fields_merged = 0
-                    for col in self.metadata_df.columns:
-                        if col in row and pd.notna(metadata_row[col]) and metadata_row[col]:
-                            # Special handling for dc:title - always overwrite from metadata
-                            if col == 'dc:title':
-                                row[col] = str(metadata_row[col])
-                                row_fields_merged += 1
-                            # Only populate other fields if the generated row value is empty
-                            elif not row[col]:
-                                row[col] = str(metadata_row[col])
-                                row_fields_merged += 1
-                    
-                    # Generate unique ID for originating_system_id
-                    if 'originating_system_id' in row:
-                        unique_id = utils.generate_unique_id(self.page)
-                        row['originating_system_id'] = unique_id
-                        
-                        # Convert to Handle URL for dc:identifier
-                        if 'dc:identifier' in row:
-                            # Extract numeric portion (e.g., "dg_1234567890" -> "1234567890")
-                            numeric_part = unique_id.split('_')[-1] if '_' in unique_id else unique_id
-                            row['dc:identifier'] = f"http://hdl.handle.net/11084/{numeric_part}"
-                            row_fields_merged += 2  # Count both originating_system_id and dc:identifier
-                    
-                    if row_fields_merged > 0:
-                        fields_merged += row_fields_merged
-                        merged_count += 1
+                if position is not None:
+                    matches.append((row_position, position))
+                else:
+                    unmatched_rows.append((row_position, match_value))
+            
+            if normalized_matches:
+                self.logger.info(f"Matched {normalized_matches} rows using normalized comparison")
+            
+            job.report(0.4, f"{len(matches)} exact or normalized matches")
+            if job.cancelled:
+                self.show_snack("Merge cancelled - nothing was changed", is_error=True)
+                return
+            
+            # Tier 3: fuzzy match what is left on both sides, one metadata record per row
+            fuzzy_report = []
+            if unmatched_rows:
+                claimed = {position for _, position in matches}
+                match_values = self.metadata_df[match_column].tolist()
+                open_positions = [
+                    position for position, value in enumerate(match_values)
+                    if position not in claimed and pd.notna(value) and value
+                ]
+                fuzzy_matches = utils.assign_fuzzy_matches(
+                    [match_value for _, match_value in unmatched_rows],
+                    [str(match_values[position]) for position in open_positions],
+                    threshold=self.FUZZY_MERGE_THRESHOLD
+                )
+                for row_idx, candidate_idx, score in fuzzy_matches:
+                    row_position, match_value = unmatched_rows[row_idx]
+                    position = open_positions[candidate_idx]
+                    matches.append((row_position, position))
+                    fuzzy_report.append({
+                        'file_name_1': match_value,
+                        'metadata_value': str(match_values[position]),
+                        'score': score,
+                    })
+                    self.logger.info(f"Fuzzy matched '{match_value}' to '{match_values[position]}' ({score}% match)")
+                self.logger.info(
+                    f"Fuzzy tier matched {len(fuzzy_matches)} of {len(unmatched_rows)} remaining rows "
+                    f"against {len(open_positions)} unclaimed metadata rows (threshold {self.FUZZY_MERGE_THRESHOLD}%)"
+                )
+            if job.cancelled:
+                self.show_snack("Merge cancelled - nothing was changed", is_error=True)
+                return
+            job.report(0.8, f"Merging {len(matches)} matched rows")
+            
+            # Keep the fuzzy pairs and their scores for review
+            self.page.session.set("metadata_fuzzy_matches", fuzzy_report)
+            
+            merged_count = 0
+            fields_merged = 0
+            for row_position, position in matches:
+                row_fields_merged = self.merge_metadata_row(row_position, position, merge_columns, metadata_values)
+                if row_fields_merged > 0:
+                    fields_merged += row_fields_merged
+                    merged_count += 1
             
             self.logger.info(f"Merged metadata for {merged_count} rows ({fields_merged} total fields)")
             
@@ -265,7 +341,10 @@ class StorageView(BaseView):
             self.save_generated_csv()
             self.display_csv_data()
             
-            self.show_snack(f"Merged {fields_merged} fields across {merged_count} of {len(self.generated_csv_data)} rows")
+            message = f"Merged {fields_merged} fields across {merged_count} of {len(self.generated_csv_data)} rows"
+            if fuzzy_report:
+                message += f" ({len(fuzzy_report)} fuzzy matches - review scores in the log)"
+            self.show_snack(message)
             
         except Exception as ex:
             self.logger.error(f"Failed to merge metadata: {ex}")
@@ -275,40 +354,20 @@ class StorageView(BaseView):
         """Display the generated CSV data in a table."""
         if not self.generated_csv_data:
             if self.csv_data_table:
-                self.csv_data_table.rows = []
+                self.csv_data_table.set_data(None)
                 self.page.update()
             return
         
-        # Convert to DataFrame for easier display
-        df = pd.DataFrame(self.generated_csv_data)
-        
         # Get only non-empty columns for display
-        non_empty_cols = [col for col in df.columns if df[col].notna().any() and (df[col] != '').any()]
+        non_empty_cols = self.generated_csv_data.non_empty_columns()
         
         if not non_empty_cols:
             # Show at least the first few columns if all are empty
-            non_empty_cols = df.columns[:5].tolist()
-        
-        # Create table
-        colors = self.get_theme_colors()
-        
-        # Create columns for DataTable
-        columns = [ft.DataColumn(ft.Text(col, size=12, weight=ft.FontWeight.BOLD)) 
-                  for col in non_empty_cols]
-        
-        # Create rows for DataTable
-        rows = []
-        for idx, row in df.iterrows():
-            cells = []
-            for col in non_empty_cols:
-                value = str(row[col]) if pd.notna(row[col]) and row[col] != '' else ''
-                cells.append(ft.DataCell(ft.Text(value, size=11)))
-            rows.append(ft.DataRow(cells=cells))
+            non_empty_cols = self.generated_csv_data.headings[:5]
         
-        # Update the data table
+        # Only the visible page is rendered; the pager slices df on demand
         if self.csv_data_table:
-            self.csv_data_table.columns = columns
-            self.csv_data_table.rows = rows
+            self.csv_data_table.set_data(self.generated_csv_data.to_dataframe(non_empty_cols))
             self.page.update()
     
     def on_save_directory_result(self, e: ft.FilePickerResultEvent):
@@ -323,7 +382,7 @@ class StorageView(BaseView):
                 csv_path = os.path.join(save_dir, csv_filename)
                 
                 # Write to CSV
-                df = pd.DataFrame(self.generated_csv_data)
+                df = self.generated_csv_data.to_dataframe()
                 df.to_csv(csv_path, index=False, encoding='utf-8', quoting=0)
                 
                 self.logger.info(f"Exported CSV to: {csv_path}")
@@ -351,8 +410,8 @@ class StorageView(BaseView):
     
     def clear_csv_data(self, e):
         """Clear the generated CSV data."""
-        self.generated_csv_data = []
-        self.page.session.set("generated_csv_rows", [])
+        self.generated_csv_data = GeneratedRows()
+        self.page.session.set(GENERATED_ROWS_KEY, self.generated_csv_data.to_session())
         self.display_csv_data()
         
         # Update the generated rows count
@@ -388,19 +447,15 @@ class StorageView(BaseView):
         file_paths = self.page.session.get("selected_file_paths") or []
         file_count = len(file_paths)
         
-        # Create data table
-        self.csv_data_table = ft.DataTable(
-            columns=[ft.DataColumn(ft.Text("No Data", size=12))],
-            rows=[],
-            border=ft.border.all(1, colors['border']),
+        # Create paged data table
+        self.csv_data_table = PagedDataTable(
+            self.page,
+            colors,
             border_radius=5,
             vertical_lines=ft.BorderSide(1, colors['border']),
-            horizontal_lines=ft.BorderSide(1, colors['border']),
             heading_row_color=colors['container_bg'],
-            heading_row_height=40,
             data_row_min_height=35,
             data_row_max_height=35,
-            column_spacing=10,
         )
         
         # Display existing data if available
@@ -529,7 +584,7 @@ class StorageView(BaseView):
                         ft.Container(height=5),
                         ft.Container(
                             content=ft.Column([
-                                self.csv_data_table
+                                self.csv_data_table.control
                             ], scroll=ft.ScrollMode.AUTO),
                             border=ft.border.all(1, colors['border']),
                             border_radius=5,
@@ -7,11 +7,60 @@ matched filenames and metadata.
 
 import flet as ft
 from views.base_view import BaseView
+from views.paged_table import PagedDataTable
 import os
-import shutil
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import utils
+import csv_io
+import jobs
+import pipeline
+
+
+def _column_changes(before, after):
+    """
+    Compare two columns position by position.
+    
+    Returns a boolean NumPy array, True where the values differ. Missing values
+    on both sides count as equal; a value on only one side counts as a change.
+    """
+    if before.dtype != after.dtype:
+        # Mixed dtypes (e.g. Arrow strings vs object after an edit): compare as text
+        before = before.astype(str)
+        after = after.astype(str)
+    before = before.reset_index(drop=True)
+    after = after.reset_index(drop=True)
+    changed = before.ne(after).to_numpy(dtype=bool, na_value=True)
+    both_missing = (before.isna() & after.isna()).to_numpy(dtype=bool)
+    return changed & ~both_missing
+
+
+def compute_change_mask(before, after):
+    """
+    Build a boolean (rows x columns) mask of cells that differ between two DataFrames.
+    
+    Each column is compared in a single vectorized operation (an Arrow compute
+    kernel for Arrow-backed string columns), instead of reading cells one at a
+    time. Rows are matched by position and columns by name; rows or columns
+    that only exist in ``after`` count as changed.
+    
+    Args:
+        before: The original DataFrame
+        after: The edited DataFrame
+        
+    Returns:
+        numpy.ndarray: Boolean array shaped like ``after``, True where a cell changed
+    """
+    rows, cols = after.shape
+    mask = np.ones((rows, cols), dtype=bool)
+    shared_rows = min(rows, len(before))
+    for col_idx, column in enumerate(after.columns):
+        if column in before.columns:
+            mask[:shared_rows, col_idx] = _column_changes(
+                before[column].iloc[:shared_rows], after[column].iloc[:shared_rows]
+            )
+    return mask
 
 
 class UpdateCSVView(BaseView):
@@ -30,6 +79,34 @@ class UpdateCSVView(BaseView):
         self.selected_column = None
         self.data_table = None
         self.edits_applied = False  # Track whether any edits have been applied
+        self._change_mask = None  # Cached cell-level diff, cleared on every edit
+        self.show_changed_only = False  # Before/After view filter
+    
+    def get_change_mask(self):
+        """
+        Get the boolean change mask (rows x columns) between original and current data.
+        
+        The mask is computed once and reused until the next edit invalidates it.
+        
+        Returns:
+            numpy.ndarray: True where a cell differs from the original, or None if no data
+        """
+        if self.csv_data is None or self.csv_data_original is None:
+            return None
+        if self._change_mask is None:
+            self._change_mask = compute_change_mask(self.csv_data_original, self.csv_data)
+        return self._change_mask
+    
+    def invalidate_change_mask(self):
+        """Discard the cached change mask after csv_data or csv_data_original changes."""
+        self._change_mask = None
+    
+    def refresh_data_table(self):
+        """Re-render the Before/After tables in place, if they are on screen."""
+        if self.data_table:
+            new_table = self.render_data_table()
+            self.data_table.content = new_table.content
+            self.data_table.update()
     
     def copy_csv_to_temp(self, source_path):
         """
@@ -50,23 +127,8 @@ class UpdateCSVView(BaseView):
                 os.makedirs(temp_dir, exist_ok=True)
                 self.page.session.set("temp_directory", temp_dir)
             
-            # Get the base filename and sanitize it
-            base_name = os.path.basename(source_path)
-            name, ext = os.path.splitext(base_name)
-            sanitized_name = utils.sanitize_filename(name)
-            
-            # Add timestamp
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            new_filename = f"{sanitized_name}_{timestamp}{ext}"
-            
-            # Create the destination path
-            dest_path = os.path.join(temp_dir, new_filename)
-            
-            # Copy the file
-            shutil.copy2(source_path, dest_path)
-            self.logger.info(f"Copied CSV file to: {dest_path}")
-            
-            return dest_path
+            # Copy as <sanitized name>_<timestamp><ext>
+            return pipeline.copy_csv_to_temp(source_path, temp_dir)
             
         except Exception as e:
             self.logger.error(f"Error copying CSV to temp: {e}")
@@ -89,9 +151,10 @@ class UpdateCSVView(BaseView):
             for encoding in encodings:
                 try:
                     # Read all columns as strings to prevent scientific notation and type conversion
-                    self.csv_data = pd.read_csv(csv_path, encoding=encoding, dtype=str, keep_default_na=False)
+                    self.csv_data = csv_io.read_csv_strings(csv_path, encoding=encoding)
                     # Store a copy of the original data for comparison
                     self.csv_data_original = self.csv_data.copy()
+                    self.invalidate_change_mask()
                     self.csv_path = csv_path
                     self.logger.info(f"Loaded CSV with {len(self.csv_data)} rows and {len(self.csv_data.columns)} columns")
                     return True
@@ -136,9 +199,9 @@ class UpdateCSVView(BaseView):
         """
         try:
             if self.csv_data is not None and self.temp_csv_path:
-                # Save with minimal quoting (only quote fields when necessary)
-                # quoting=csv.QUOTE_MINIMAL (0) - only quote fields containing special characters
-                self.csv_data.to_csv(self.temp_csv_path, index=False, encoding='utf-8', quoting=0)
+                # Stream to a sibling temp file and rename, with minimal quoting
+                # (only quote fields containing special characters)
+                csv_io.write_csv_atomic(self.csv_data, self.temp_csv_path)
                 self.logger.info(f"Saved CSV data to: {self.temp_csv_path} ({len(self.csv_data)} rows)")
                 return True
             return False
@@ -159,28 +222,9 @@ class UpdateCSVView(BaseView):
         """
         try:
             if self.csv_data is not None:
-                # Remove comment rows before saving
-                first_column = self.csv_data.columns[0]
-                mask = ~self.csv_data[first_column].astype(str).str.startswith('#', na=False)
-                csv_data_filtered = self.csv_data[mask].copy()
-                
-                comment_count = len(self.csv_data) - len(csv_data_filtered)
-                if comment_count > 0:
-                    self.logger.info(f"Removing {comment_count} comment row(s) from values.csv")
-                
-                # Blank out collection_id column for all rows EXCEPT the last one (self-referential CSV row)
-                if 'collection_id' in csv_data_filtered.columns and len(csv_data_filtered) > 0:
-                    # Store the last row's collection_id value
-                    last_collection_id = csv_data_filtered.iloc[-1]['collection_id']
-                    # Blank out all collection_id values
-                    csv_data_filtered['collection_id'] = ''
-                    # Restore the last row's collection_id
-                    csv_data_filtered.iloc[-1, csv_data_filtered.columns.get_loc('collection_id')] = last_collection_id
-                    self.logger.info(f"Blanked out collection_id column in values.csv (except last row: {last_collection_id})")
-                
-                # Save with minimal quoting
-                csv_data_filtered.to_csv(values_csv_path, index=False, encoding='utf-8', quoting=0)
-                self.logger.info(f"Saved values.csv to: {values_csv_path} ({len(csv_data_filtered)} rows)")
+                # Comment rows are removed and collection_id is kept only on the
+                # last row (the self-referential CSV row)
+                pipeline.write_values_csv(self.csv_data, values_csv_path)
                 return True
             return False
         except Exception as e:
@@ -202,6 +246,7 @@ class UpdateCSVView(BaseView):
         try:
             if self.csv_data is not None:
                 self.csv_data.at[row_index, column_name] = new_value
+                self.invalidate_change_mask()
                 self.logger.info(f"Updated cell [{row_index}, {column_name}] = {new_value}")
                 return True
             return False
@@ -210,11 +255,21 @@ class UpdateCSVView(BaseView):
             return False
     
     def apply_all_updates(self, e):
+        """Apply all CSV updates (see run_all_updates) as a background job."""
+        if jobs.get_runner(self.page).submit_once("update_csv", "Apply CSV updates", self.run_all_updates) is None:
+            self.show_snack("CSV updates are already running", is_error=True)
+    
+    def run_all_updates(self, job):
         """
+        Runs as a job. The steps run in pipeline.apply_alma_updates, which
+        is not cancellable once it has started.
+        
         Combined function that:
         1. Applies matched filenames to existing rows
         2. Appends a new row for the CSV file itself
-        3. Populates dginfo field for all rows with temp CSV filename
+        3. Fills IDs and identifiers and links compound parents and children
+        4. Populates dginfo field for all rows with temp CSV filename
+        5. Saves the CSV and values.csv
         """
         try:
             # Get session data
@@ -256,263 +311,38 @@ class UpdateCSVView(BaseView):
                 self.page.update()
                 return
             
-            # Step 1: Update existing rows with matched sanitized filenames
-            updates = 0
-            
-            # Log initial state for debugging
-            self.logger.info(f"Starting Step 1: Current mode = {current_mode}")
-            self.logger.info(f"Column name to match: {column_name}")
-            self.logger.info(f"temp_file_info count: {len(temp_file_info) if temp_file_info else 0}")
-            self.logger.info(f"csv_filenames_for_matched count: {len(csv_filenames_for_matched) if csv_filenames_for_matched else 0}")
-            self.logger.info(f"CSV columns available: {list(self.csv_data.columns)}")
-            
-            # Get first column name for comment checking
-            first_column = self.csv_data.columns[0]
-            
-            if temp_file_info and csv_filenames_for_matched:
-                for idx, file_info in enumerate(temp_file_info):
-                    sanitized_filename = file_info.get('sanitized_filename', '')
-                    
-                    # Get the corresponding CSV filename if available
-                    if idx < len(csv_filenames_for_matched):
-                        csv_filename = csv_filenames_for_matched[idx]
-                    else:
-                        # Fall back to original_filename for file picker workflow
-                        csv_filename = file_info.get('original_filename', '')
-                    
-                    self.logger.info(f"Processing file {idx}: csv_filename='{csv_filename}', sanitized='{sanitized_filename}'")
-                    
-                    # Find the row with this CSV filename (excluding comment rows)
-                    mask = ((self.csv_data[column_name] == csv_filename) & 
-                           (~self.csv_data[first_column].str.startswith('#', na=False)))
-                    self.logger.info(f"Mask matches: {mask.sum()} rows")
-                    
-                    if mask.any():
-                        row_idx = self.csv_data[mask].index[0]
-                        self.logger.info(f"Found match at row index: {row_idx}")
-                        
-                        # In Alma mode, replace with sanitized filename
-                        self.csv_data.at[row_idx, column_name] = sanitized_filename
-                        self.logger.info(f"Updated CSV: '{csv_filename}' -> '{sanitized_filename}'")
-                        
-                        updates += 1
-                    else:
-                        self.logger.warning(f"No match found for csv_filename: '{csv_filename}'")
-            else:
-                self.logger.warning(f"Missing data - temp_file_info: {temp_file_info is not None}, csv_filenames_for_matched: {csv_filenames_for_matched is not None}")
-            
-            # Step 2: Append a new row for the CSV file itself (Alma mode only)
-            if current_mode == "Alma":
-                # Generate unique ID
-                unique_id = utils.generate_unique_id(self.page)
-                
-                # Create new row with all empty values first
-                new_row = {col: '' for col in self.csv_data.columns}
-                
-                # Extract numeric portion for Handle URL (e.g., "dg_1234567890" -> "1234567890")
-                numeric_part = unique_id.split('_')[-1] if '_' in unique_id else unique_id
-                handle_url = f"http://hdl.handle.net/11084/{numeric_part}"
-                
-                # Populate specific columns
-                new_row['originating_system_id'] = unique_id
-                new_row['dc:identifier'] = handle_url  # Use Handle URL format in Alma mode
-                new_row['collection_id'] = '81342586470004641'  # Self-referential row has collection_id
-                new_row['dc:type'] = 'Dataset'  # CSV file is a dataset
-                
-                # Use the sanitized temp CSV filename for both dc:title and file_name_1
-                new_row['dc:title'] = temp_csv_filename
-                new_row['file_name_1'] = temp_csv_filename
-                
-                # Append the new row to the DataFrame
-                import pandas as pd
-                new_row_df = pd.DataFrame([new_row])
-                self.csv_data = pd.concat([self.csv_data, new_row_df], ignore_index=True)
-                
-                # Also update the original to match (so comparison logic doesn't break)
-                self.csv_data_original = pd.concat([self.csv_data_original, new_row_df], ignore_index=True)
-                
-                self.logger.info(f"Appended new row with ID: {unique_id}")
-            
-            # Step 3: Fill empty originating_system_id cells with unique IDs (Alma mode only)
-            if current_mode == "Alma":
-                filled_ids = 0
-                if 'originating_system_id' in self.csv_data.columns:
-                    for idx in range(len(self.csv_data)):
-                        # Skip comment rows
-                        if self.is_comment_row(idx):
-                            continue
-                        
-                        cell_value = self.csv_data.at[idx, 'originating_system_id']
-                        # Check if empty (empty string, None, or NaN)
-                        if pd.isna(cell_value) or str(cell_value).strip() == '':
-                            new_id = utils.generate_unique_id(self.page)
-                            self.csv_data.at[idx, 'originating_system_id'] = new_id
-                            # Also update dc:identifier if it exists and is empty
-                            if 'dc:identifier' in self.csv_data.columns:
-                                dc_id_value = self.csv_data.at[idx, 'dc:identifier']
-                                if pd.isna(dc_id_value) or str(dc_id_value).strip() == '':
-                                    # In Alma mode, use Handle URL format
-                                    numeric_part = new_id.split('_')[-1] if '_' in new_id else new_id
-                                    self.csv_data.at[idx, 'dc:identifier'] = f"http://hdl.handle.net/11084/{numeric_part}"
-                            filled_ids += 1
-                            self.logger.info(f"Generated ID {new_id} for row {idx}")
-                    if filled_ids > 0:
-                        self.logger.info(f"Filled {filled_ids} empty originating_system_id cell(s)")
+            # Pair each matched file's CSV filename with its sanitized OBJS/ name
+            renames = []
+            for idx, file_info in enumerate(temp_file_info):
+                if idx < len(csv_filenames_for_matched):
+                    csv_filename = csv_filenames_for_matched[idx]
                 else:
-                    self.logger.warning("originating_system_id column not found in CSV")
-            
-            # Step 3.5: In Alma mode, convert dc:identifier to Handle URL format
-            if current_mode == "Alma" and 'dc:identifier' in self.csv_data.columns and 'originating_system_id' in self.csv_data.columns:
-                handle_count = 0
-                for idx in range(len(self.csv_data)):
-                    # Skip comment rows
-                    if self.is_comment_row(idx):
-                        continue
-                    
-                    orig_id = self.csv_data.at[idx, 'originating_system_id']
-                    # Extract numeric portion from originating_system_id (e.g., "dg_1234567890" -> "1234567890")
-                    if not pd.isna(orig_id) and str(orig_id).strip() != '':
-                        orig_id_str = str(orig_id).strip()
-                        # Extract numeric part (everything after last underscore or the whole thing if no underscore)
-                        if '_' in orig_id_str:
-                            numeric_part = orig_id_str.split('_')[-1]
-                        else:
-                            numeric_part = orig_id_str
-                        
-                        # Only proceed if we have a numeric part
-                        if numeric_part.isdigit():
-                            handle_url = f"http://hdl.handle.net/11084/{numeric_part}"
-                            self.csv_data.at[idx, 'dc:identifier'] = handle_url
-                            handle_count += 1
-                
-                if handle_count > 0:
-                    self.logger.info(f"Set {handle_count} dc:identifier cell(s) to Handle URL format")
-            
-            # Step 3.6: Blank out collection_id for all rows except the last one (self-referential CSV row)
-            if current_mode == "Alma" and 'collection_id' in self.csv_data.columns:
-                # Blank out all rows except the last one
-                for idx in range(len(self.csv_data) - 1):  # Exclude last row
-                    # Skip comment rows
-                    if self.is_comment_row(idx):
-                        continue
-                    self.csv_data.at[idx, 'collection_id'] = ''
-                self.logger.info(f"Blanked out collection_id for {len(self.csv_data) - 1} rows (keeping last row's value)")
-            
-            # Step 3.65: Process Alma compound parent/child relationships
-            if current_mode == "Alma" and 'compoundrelationship' in self.csv_data.columns:
-                compound_updates = 0
-                self.logger.info("Processing Alma compound parent/child relationships...")
-                
-                idx = 0
-                while idx < len(self.csv_data):
-                    # Skip comment rows
-                    if self.is_comment_row(idx):
-                        idx += 1
-                        continue
-                    
-                    compound = str(self.csv_data.at[idx, 'compoundrelationship']).strip()
-                    
-                    # Check if this is a parent
-                    if compound.startswith('parent'):
-                        parent_idx = idx
-                        parent_pid = self.csv_data.at[parent_idx, 'originating_system_id']
-                        self.logger.info(f"Found parent at row {idx} with originating_system_id: {parent_pid}")
-                        
-                        # Set parent's group_id to its own originating_system_id
-                        if 'group_id' in self.csv_data.columns:
-                            self.csv_data.at[parent_idx, 'group_id'] = parent_pid
-                            self.logger.info(f"  Set parent group_id to: {parent_pid}")
-                        
-                        # Initialize parent's TOC and dginfo
-                        toc = ""
-                        dginfo_list = []
-                        
-                        # Count and process children
-                        child_count = 0
-                        child_idx = idx + 1
-                        
-                        # Loop through following rows to find children
-                        while child_idx < len(self.csv_data):
-                            # Skip comment rows
-                            if self.is_comment_row(child_idx):
-                                child_idx += 1
-                                continue
-                            
-                            child_compound = str(self.csv_data.at[child_idx, 'compoundrelationship']).strip()
-                            
-                            if not child_compound.startswith('child'):
-                                break  # End of children
-                            
-                            child_count += 1
-                            
-                            # Get child information
-                            child_title = str(self.csv_data.at[child_idx, 'dc:title']) if 'dc:title' in self.csv_data.columns else ''
-                            child_type = str(self.csv_data.at[child_idx, 'dc:type']) if 'dc:type' in self.csv_data.columns else ''
-                            
-                            # Build TOC entry
-                            if child_title and child_type:
-                                toc += f"{child_title} ({child_type}) | "
-                            elif child_title:
-                                toc += f"{child_title} | "
-                            
-                            # Set child's group_id to parent's originating_system_id
-                            if 'group_id' in self.csv_data.columns:
-                                self.csv_data.at[child_idx, 'group_id'] = parent_pid
-                            
-                            # Set child rep_label and rep_public_note
-                            if 'rep_label' in self.csv_data.columns:
-                                self.csv_data.at[child_idx, 'rep_label'] = child_title
-                            if 'rep_public_note' in self.csv_data.columns:
-                                self.csv_data.at[child_idx, 'rep_public_note'] = child_type
-                            
-                            self.logger.info(f"  Processed child at row {child_idx}: {child_title}")
-                            child_idx += 1
-                        
-                        # Validate we have at least 2 children
-                        if child_count < 2:
-                            error_msg = f"*ERROR* Parent at row {parent_idx} has only {child_count} child(ren), need at least 2!"
-                            self.logger.error(error_msg)
-                            if 'mms_id' in self.csv_data.columns:
-                                self.csv_data.at[parent_idx, 'mms_id'] = "*ERROR* Too few children!"
-                        else:
-                            # Update parent record
-                            if 'dcterms:tableOfContents' in self.csv_data.columns:
-                                self.csv_data.at[parent_idx, 'dcterms:tableOfContents'] = toc.rstrip(' | ')
-                                self.logger.info(f"  Set parent TOC: {toc.rstrip(' | ')}")
-                            
-                            # Set parent dc:type to 'compound'
-                            if 'dc:type' in self.csv_data.columns:
-                                self.csv_data.at[parent_idx, 'dc:type'] = 'compound'
-                                self.logger.info(f"  Set parent dc:type to 'compound'")
-                            
-                            # Clear parent dcterms:type.dcterms:DCMIType
-                            if 'dcterms:type.dcterms:DCMIType' in self.csv_data.columns:
-                                self.csv_data.at[parent_idx, 'dcterms:type.dcterms:DCMIType'] = ''
-                            
-                            compound_updates += 1
-                        
-                        # Skip past the children we just processed
-                        idx = child_idx - 1
-                    
-                    idx += 1
-                
-                if compound_updates > 0:
-                    self.logger.info(f"Processed {compound_updates} compound parent/child group(s)")
-                else:
-                    self.logger.info("No compound parent/child relationships found")
-            
-            # Step 3.7: CollectionBuilder parent/child logic removed (Alma-only app)
-            
-            # Step 4: Populate dginfo field for ALL rows with temp CSV filename
+                    # Fall back to original_filename for file picker workflow
+                    csv_filename = file_info.get('original_filename', '')
+                renames.append((csv_filename, file_info.get('sanitized_filename', '')))
+            self.logger.info(f"Applying updates in {current_mode} mode: {len(renames)} matched file(s) "
+                             f"in column '{column_name}'")
+            
+            # Steps 1-4: filenames, the CSV's own row, IDs and identifiers,
+            # collection_id, compound relationships and dginfo
+            self.csv_data, counts = pipeline.apply_alma_updates(
+                self.csv_data, temp_csv_filename, renames, column_name, current_mode,
+                new_id=lambda: utils.generate_unique_id(self.page),
+                progress_callback=job.report
+            )
+            updates = counts["renamed"]
+            filled_ids = counts["filled_ids"]
+            
+            # Keep the original in step with the appended row and dginfo, so
+            # neither shows up as a change
+            if counts["csv_row"] is not None:
+                self.csv_data_original = pd.concat(
+                    [self.csv_data_original, pd.DataFrame([counts["csv_row"]])], ignore_index=True)
             if 'dginfo' in self.csv_data.columns:
-                self.csv_data['dginfo'] = temp_csv_filename
-                # Also update original so dginfo doesn't show as changed
                 self.csv_data_original['dginfo'] = temp_csv_filename
-                self.logger.info(f"Set dginfo field to '{temp_csv_filename}' for all {len(self.csv_data)} rows")
-            else:
-                self.logger.warning("dginfo column not found in CSV")
             
             # Save the updated CSV (keeps comment rows)
+            self.invalidate_change_mask()
             self.save_csv_data()
             self.edits_applied = True
             
@@ -527,10 +357,7 @@ class UpdateCSVView(BaseView):
                     self.logger.error(f"Error creating values.csv: {e}")
             
             # Update the data table display
-            if self.data_table:
-                new_table = self.render_data_table()
-                self.data_table.content = new_table.content
-                self.data_table.update()
+            self.refresh_data_table()
             
             # Success message
             message_parts = []
@@ -616,14 +443,12 @@ class UpdateCSVView(BaseView):
             self.csv_data_original = pd.concat([self.csv_data_original, new_row_df], ignore_index=True)
             
             # Save the updated CSV
+            self.invalidate_change_mask()
             self.save_csv_data()
             self.edits_applied = True
             
             # Update the data table display
-            if self.data_table:
-                new_table = self.render_data_table()
-                self.data_table.content = new_table.content
-                self.data_table.update()
+            self.refresh_data_table()
             
             self.logger.info(f"Appended new row with ID: {unique_id}")
             self.page.snack_bar = ft.SnackBar(
@@ -659,50 +484,27 @@ class UpdateCSVView(BaseView):
                 padding=20
             )
         
-        # Limit to first 5 rows for display
-        display_data_before = self.csv_data_original.head(5)
-        display_data_after = self.csv_data.head(5)
+        # Only the visible page of each table is ever built (see PagedDataTable)
+        change_mask = self.get_change_mask() if self.edits_applied else None
+        changed_rows = change_mask.any(axis=1) if change_mask is not None else None
+        row_positions = None
+        if changed_rows is not None and self.show_changed_only:
+            row_positions = np.flatnonzero(changed_rows)
         
         # Create "Before" table
-        before_columns = [
-            ft.DataColumn(ft.Text(col, weight=ft.FontWeight.BOLD, size=12))
-            for col in display_data_before.columns
-        ]
-        
-        before_rows = []
-        for idx, row in display_data_before.iterrows():
-            cells = [
-                ft.DataCell(ft.Text(str(val), size=11))
-                for val in row
-            ]
-            before_rows.append(ft.DataRow(cells=cells))
-        
-        before_table = ft.DataTable(
-            columns=before_columns,
-            rows=before_rows,
-            border=ft.border.all(1, colors['border']),
-            border_radius=10,
-            horizontal_lines=ft.BorderSide(1, colors['border']),
-            heading_row_color=ft.Colors.GREY_200,
-            column_spacing=10,
-            data_row_min_height=30,
-            data_row_max_height=35,
-            heading_row_height=40,
-        )
+        before_pager = PagedDataTable(self.page, colors, show_navigation=not self.edits_applied)
+        before_control = before_pager.control
+        before_pager.set_data(self.csv_data_original, row_positions=row_positions)
         
         # If no edits have been applied yet, show only the Before table full-width
         if not self.edits_applied:
             return ft.Container(
                 content=ft.Column([
-                    ft.Text(f"Showing first 5 of {len(self.csv_data)} rows",
-                           size=12, italic=True, color=colors['secondary_text']),
                     ft.Container(
                         content=ft.Column([
                             ft.Text("CSV Data:", size=14, weight=ft.FontWeight.BOLD, color=colors['primary_text']),
                             ft.Container(
-                                content=ft.Column([
-                                    ft.Row([before_table], scroll=ft.ScrollMode.AUTO)
-                                ], scroll=ft.ScrollMode.AUTO),
+                                content=ft.Column([before_control], scroll=ft.ScrollMode.AUTO),
                                 border=ft.border.all(1, colors['border']),
                                 border_radius=10,
                                 padding=10,
@@ -724,65 +526,37 @@ class UpdateCSVView(BaseView):
             )
         
         # After edits have been applied, show Before/After comparison
-        # Count total changes across all rows (not just displayed ones)
-        total_changes = 0
-        for idx in range(len(self.csv_data)):
-            for col in self.csv_data.columns:
-                original_val = str(self.csv_data_original.iloc[idx][col])
-                current_val = str(self.csv_data.iloc[idx][col])
-                if original_val != current_val:
-                    total_changes += 1
-        
-        # Create "After" table with changed cells highlighted
-        after_columns = [
-            ft.DataColumn(ft.Text(col, weight=ft.FontWeight.BOLD, size=12))
-            for col in display_data_after.columns
-        ]
+        # Totals come from the cached mask, so they cover all rows, not just displayed ones
+        total_changes = int(change_mask.sum())
+        changed_row_count = int(changed_rows.sum())
         
-        after_rows = []
-        for idx, row in display_data_after.iterrows():
-            cells = []
-            for col_idx, (col, val) in enumerate(row.items()):
-                # Check if value changed from original
-                original_val = display_data_before.iloc[idx, col_idx]
-                if str(val) != str(original_val):
-                    # Highlight changed cells with bold green text
-                    cells.append(
-                        ft.DataCell(
-                            ft.Text(str(val), size=11, weight=ft.FontWeight.BOLD, color=ft.Colors.GREEN_700)
-                        )
-                    )
-                else:
-                    cells.append(ft.DataCell(ft.Text(str(val), size=11)))
-            after_rows.append(ft.DataRow(cells=cells))
-        
-        after_table = ft.DataTable(
-            columns=after_columns,
-            rows=after_rows,
-            border=ft.border.all(1, colors['border']),
-            border_radius=10,
-            horizontal_lines=ft.BorderSide(1, colors['border']),
-            heading_row_color=ft.Colors.GREY_200,
-            column_spacing=10,
-            data_row_min_height=30,
-            data_row_max_height=35,
-            heading_row_height=40,
-        )
+        # "After" table drives navigation and filtering; "Before" mirrors its page
+        after_pager = PagedDataTable(self.page, colors)
+        after_pager.link(before_pager)
+        after_control = after_pager.control
+        after_pager.set_data(self.csv_data, cell_mask=change_mask, row_positions=row_positions)
+        
+        def on_changed_only_toggle(e):
+            self.show_changed_only = e.control.value
+            self.refresh_data_table()
         
         # Create side-by-side layout with scrolling
         return ft.Container(
             content=ft.Column([
-                ft.Text(f"Showing first 5 of {len(self.csv_data)} rows",
-                       size=12, italic=True, color=colors['secondary_text']),
+                ft.Row([
+                    ft.Switch(
+                        label=f"Show changed rows only ({changed_row_count})",
+                        value=self.show_changed_only,
+                        on_change=on_changed_only_toggle
+                    ),
+                ]),
                 ft.Row([
                     # Before table
                     ft.Container(
                         content=ft.Column([
                             ft.Text("Before:", size=14, weight=ft.FontWeight.BOLD, color=colors['primary_text']),
                             ft.Container(
-                                content=ft.Column([
-                                    ft.Row([before_table], scroll=ft.ScrollMode.AUTO)
-                                ], scroll=ft.ScrollMode.AUTO),
+                                content=ft.Column([before_control], scroll=ft.ScrollMode.AUTO),
                                 border=ft.border.all(1, colors['border']),
                                 border_radius=10,
                                 padding=10,
@@ -795,9 +569,7 @@ class UpdateCSVView(BaseView):
                         content=ft.Column([
                             ft.Text("After:", size=14, weight=ft.FontWeight.BOLD, color=ft.Colors.GREEN_700),
                             ft.Container(
-                                content=ft.Column([
-                                    ft.Row([after_table], scroll=ft.ScrollMode.AUTO)
-                                ], scroll=ft.ScrollMode.AUTO),
+                                content=ft.Column([after_control], scroll=ft.ScrollMode.AUTO),
                                 border=ft.border.all(2, ft.Colors.GREEN_700),
                                 border_radius=10,
                                 padding=10,
@@ -805,11 +577,11 @@ class UpdateCSVView(BaseView):
                         ], spacing=5),
                         expand=1
                     ),
-                ], spacing=10, expand=True),
+                ], spacing=10, expand=True, vertical_alignment=ft.CrossAxisAlignment.START),
                 # Show change count
                 ft.Container(
                     content=ft.Text(
-                        f"Total changes: {total_changes} cell{'s' if total_changes != 1 else ''} modified across {len(self.csv_data)} rows",
+                        f"Total changes: {total_changes} cell{'s' if total_changes != 1 else ''} modified in {changed_row_count} of {len(self.csv_data)} rows",
                         size=13,
                         weight=ft.FontWeight.BOLD,
                         color=ft.Colors.GREEN_700 if total_changes > 0 else colors['secondary_text']
@@ -0,0 +1,269 @@
+"""
+Drop-Folder Watcher for Manage Digital Ingest
+
+Watches a drop folder and ingests batches as they land, without anyone
+clicking through the views. A batch is a CSV in the top level of the drop
+folder plus a folder with the same name holding its masters (subfolders
+included):
+
+    drop/
+        batch_01.csv
+        batch_01/
+            photo one.jpg
+            scan-02.tif
+        processed/      <- CSVs (and run reports) moved here once ingested
+        failed/         <- CSVs that could not be ingested, with the error
+
+watchdog reports every change in the folder. A CSV is ingested once the
+folder has been quiet (no events) for settle seconds and the CSV's size and
+modification time have not changed since the previous check, so a batch
+still being copied is left alone until the copy finishes. Each CSV then runs
+through pipeline.run_ingest() (fuzzy match, OBJS/ links, TN/ thumbnails,
+CSV updates and values.csv) into its own directory under out_root, one batch
+at a time. Only the batch's own folder is searched, so batches that reuse
+master names never link each other's files; a CSV without its folder fails.
+Batch folders stay where they are after the ingest, since OBJS/ links to the
+masters in them.
+
+CSVs already in the drop folder when the watcher starts are picked up too,
+and the top level is rescanned on every check, in case a file system (a
+network share, say) does not deliver events.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+import instrumentation
+import pipeline
+import temp_gc
+import utils
+
+logger = logging.getLogger(__name__)
+
+# Seconds the drop folder must be quiet before a CSV is ingested
+SETTLE_SECONDS = 10.0
+
+# Seconds between readiness checks
+CHECK_INTERVAL = 1.0
+
+# Subfolders of the drop folder that receive finished CSVs
+PROCESSED_DIR = "processed"
+FAILED_DIR = "failed"
+
+# Names of partial or hidden files that do not count as activity
+IGNORED_SUFFIXES = (".part", ".partial", ".tmp", ".crdownload", ".download")
+
+
+class _ActivityHandler(FileSystemEventHandler):
+    """Forwards watchdog events to the watcher."""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        # Reads (opened, closed without writing) are not activity, and a
+        # directory's own "modified" event only repeats its entries' events
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        if event.is_directory and event.event_type == "modified":
+            return
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        self.watcher.record_activity([path for path in paths if path], event.is_directory)
+
+
+class DropFolderWatcher:
+    """
+    Ingests each CSV dropped into a folder once the folder's writes settle.
+    """
+
+    def __init__(self, drop_dir, out_root=temp_gc.TEMP_ROOT, settle=SETTLE_SECONDS, ingest_options=None,
+                 on_result=None):
+        """
+        Initialize the watcher.
+
+        Args:
+            drop_dir (str): The folder to watch
+            out_root (str): Where each batch's ingest directory is created
+            settle (float): Seconds without changes before a CSV is ingested
+            ingest_options (dict): Extra keyword arguments for pipeline.run_ingest
+                (column_name, threshold, mode, derivatives, workers, validate, new_id)
+            on_result (callable): Called with (csv_path, report dict or None, error or None)
+                after each batch
+        """
+        self.drop_dir = os.path.abspath(drop_dir)
+        self.out_root = out_root
+        self.settle = settle
+        # One ID source for every batch, so batches never share IDs or Handle URLs
+        self.ingest_options = {"new_id": pipeline.new_unique_id, **(ingest_options or {})}
+        self.on_result = on_result
+        self._ignored_dirs = [os.path.join(self.drop_dir, name) for name in (PROCESSED_DIR, FAILED_DIR)]
+        self._lock = threading.Lock()
+        self._last_activity = time.monotonic()
+        self._pending = {}  # CSV path -> (size, mtime) at the last check
+        self._stuck = set()  # CSVs that could not be moved out; never retried
+        self._observer = None
+
+    def _ignored(self, path):
+        name = os.path.basename(path)
+        if name.startswith(".") or name.lower().endswith(IGNORED_SUFFIXES) or path in self._stuck:
+            return True
+        return any(path == d or path.startswith(d + os.sep) for d in self._ignored_dirs)
+
+    def _is_batch_csv(self, path):
+        return os.path.dirname(path) == self.drop_dir and path.lower().endswith(".csv")
+
+    def record_activity(self, paths, is_directory=False):
+        """
+        Note a change in the drop folder (called from the watchdog thread).
+
+        Args:
+            paths (list): Paths the event touched
+            is_directory (bool): True for directory events
+        """
+        paths = [os.path.abspath(path) for path in paths]
+        if len(paths) > 1 and self._ignored(paths[-1]):
+            return  # Moved into processed/ or failed/ (by process())
+        relevant = [path for path in paths if not self._ignored(path)]
+        if not relevant:
+            return
+        with self._lock:
+            self._last_activity = time.monotonic()
+            for path in relevant:
+                if not is_directory and self._is_batch_csv(path) and path not in self._pending:
+                    logger.info(f"New CSV in drop folder: {os.path.basename(path)}")
+                    self._pending[path] = None
+
+    def scan(self):
+        """Queue the CSVs in the top level of the drop folder (missed events, startup)."""
+        try:
+            with os.scandir(self.drop_dir) as entries:
+                found = [entry.path for entry in entries
+                         if entry.is_file() and self._is_batch_csv(entry.path) and not self._ignored(entry.path)]
+        except FileNotFoundError:
+            return
+        with self._lock:
+            for path in found:
+                self._pending.setdefault(path, None)
+
+    def ready(self, now=None):
+        """
+        CSVs that can be ingested now: the folder has been quiet for settle
+        seconds and the CSV has not changed since the previous check.
+
+        Returns:
+            list: CSV paths, in name order
+        """
+        now = time.monotonic() if now is None else now
+        ready = []
+        with self._lock:
+            quiet = now - self._last_activity >= self.settle
+            for path, previous in list(self._pending.items()):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    del self._pending[path]  # Moved or deleted before it settled
+                    continue
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if quiet and signature == previous:
+                    ready.append(path)
+                else:
+                    self._pending[path] = signature
+        return sorted(ready)
+
+    def _move(self, csv_path, folder):
+        """Move csv_path into folder, adding a timestamp if the name is taken."""
+        destination_dir = os.path.join(self.drop_dir, folder)
+        os.makedirs(destination_dir, exist_ok=True)
+        destination = os.path.join(destination_dir, os.path.basename(csv_path))
+        if os.path.exists(destination):
+            stem, ext = os.path.splitext(os.path.basename(csv_path))
+            destination = os.path.join(destination_dir, f"{stem}_{datetime.now():%Y%m%d_%H%M%S}{ext}")
+        shutil.move(csv_path, destination)
+        return destination
+
+    def batch_dir(self, csv_path):
+        """The folder holding a batch's masters: drop/<CSV name without .csv>/."""
+        return os.path.join(self.drop_dir, os.path.splitext(os.path.basename(csv_path))[0])
+
+    def process(self, csv_path):
+        """
+        Ingest one CSV and move it to processed/ (or failed/) with a JSON report.
+
+        Returns:
+            dict: The pipeline report, or None if the ingest failed
+        """
+        with self._lock:
+            self._pending.pop(csv_path, None)
+        stem = utils.sanitize_filename(os.path.splitext(os.path.basename(csv_path))[0])
+        out_dir = os.path.join(self.out_root, f"watch_{stem}_{datetime.now():%Y%m%d_%H%M%S}")
+        logger.info(f"Ingesting {os.path.basename(csv_path)} into {out_dir}")
+
+        report, error = None, None
+        batch_dir = self.batch_dir(csv_path)
+        try:
+            if not os.path.isdir(batch_dir):
+                raise FileNotFoundError(f"No batch folder for {os.path.basename(csv_path)}: "
+                                        f"expected its masters in {batch_dir}")
+            with instrumentation.stage("watch", csv=csv_path, out_dir=out_dir) as watch_info:
+                report = pipeline.run_ingest(csv_path, batch_dir, out_dir, **self.ingest_options)
+                watch_info.update(matched=report["matched"], unmatched=len(report["unmatched"]))
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Ingest of {os.path.basename(csv_path)} failed: {error}")
+
+        try:
+            destination = self._move(csv_path, FAILED_DIR if error else PROCESSED_DIR)
+            with open(os.path.splitext(destination)[0] + ".report.json", "w", encoding="utf-8") as f:
+                json.dump({"csv": csv_path, "error": error, "report": report}, f, indent=2, default=str)
+        except OSError as e:
+            logger.error(f"Could not move {csv_path} out of the drop folder, it will not be retried: {e}")
+            self._stuck.add(csv_path)
+        else:
+            logger.info(f"Moved {os.path.basename(csv_path)} to {destination}")
+
+        if self.on_result:
+            self.on_result(csv_path, report, error)
+        return report
+
+    def start(self):
+        """Start watching (events arrive on watchdog's thread) and queue existing CSVs."""
+        os.makedirs(self.drop_dir, exist_ok=True)
+        self._observer = Observer()
+        self._observer.schedule(_ActivityHandler(self), self.drop_dir, recursive=True)
+        self._observer.start()
+        self.scan()
+        logger.info(f"Watching {self.drop_dir} (settle {self.settle:g}s)")
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def run(self, stop_event=None, interval=CHECK_INTERVAL):
+        """
+        Watch and ingest until stop_event is set (or forever).
+
+        Args:
+            stop_event (threading.Event): Set to stop
+            interval (float): Seconds between readiness checks
+        """
+        stop_event = stop_event or threading.Event()
+        self.start()
+        try:
+            while not stop_event.wait(interval):
+                self.scan()
+                for csv_path in self.ready():
+                    if stop_event.is_set():
+                        break
+                    self.process(csv_path)
+        finally:
+            self.stop()